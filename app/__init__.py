@@ -35,6 +35,11 @@ def create_app(config_name='default'):
     # Initialize extensions
     db.init_app(app)
     
+    # Time each request, serve Prometheus metrics and watch database statements
+    from app.services import metrics, query_monitor
+    metrics.init_app(app)
+    query_monitor.init_app(app)
+    
     # Register blueprints
     from app.routes.main import main_bp
     from app.routes.ingredients import ingredients_bp
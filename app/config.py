@@ -13,28 +13,124 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-key-for-development-only')
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
+    PERSIST_UPLOADS = os.environ.get('PERSIST_UPLOADS', 'False').lower() == 'true'  # Keep uploads in UPLOAD_FOLDER
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+    INGREDIENT_BATCH_LIMIT = 500  # Maximum names accepted by /ingredients/batch
+    
+    # Page sizes of the pantry and recipe suggestion lists; clients may ask for up to API_MAX_PAGE_SIZE
+    INGREDIENT_PAGE_SIZE = int(os.environ.get('INGREDIENT_PAGE_SIZE', 50))
+    RECIPE_PAGE_SIZE = int(os.environ.get('RECIPE_PAGE_SIZE', 12))
+    API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 100))
+    # Most recipes a local search ranks; the suggestion pages are cut from these
+    RECIPE_SEARCH_LIMIT = int(os.environ.get('RECIPE_SEARCH_LIMIT', 200))
+    
+    # Image preprocessing before recognition
+    IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', 1024))
+    IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', 85))
+    IMAGE_PREPROCESS_WORKERS = int(os.environ.get('IMAGE_PREPROCESS_WORKERS', 1))
+    IMAGE_PREPROCESS_TIMEOUT = int(os.environ.get('IMAGE_PREPROCESS_TIMEOUT', 10))
     
     # Google Cloud Vision API
     GOOGLE_CLOUD_VISION_API_KEY = os.environ.get('GOOGLE_CLOUD_VISION_API_KEY')
     USE_MOCK_VISION = os.environ.get('USE_MOCK_VISION', 'True').lower() == 'true'
+    # The Vision endpoint is read by app/services/vision_client.py from VISION_API_ENDPOINT
+    # (host:port) and VISION_API_INSECURE, e.g. to point at the load test stand-in
+    
+    # Recognition results are reused for identical images and for near-duplicates
+    # whose perceptual hashes differ by at most this many bits (0 disables matching, at most 11)
+    RECOGNITION_CACHE_ENABLED = os.environ.get('RECOGNITION_CACHE_ENABLED', 'True').lower() == 'true'
+    RECOGNITION_CACHE_HAMMING_THRESHOLD = int(os.environ.get('RECOGNITION_CACHE_HAMMING_THRESHOLD', 6))
+    RECOGNITION_CACHE_SCAN_LIMIT = int(os.environ.get('RECOGNITION_CACHE_SCAN_LIMIT', 5000))
+    RECOGNITION_RESULT_CACHE_SIZE = int(os.environ.get('RECOGNITION_RESULT_CACHE_SIZE', 1024))
+    RECOGNITION_RESULT_CACHE_TTL = int(os.environ.get('RECOGNITION_RESULT_CACHE_TTL', 24 * 60 * 60))
+    
+    # Background recognition jobs for uploads (?async=1 or UPLOAD_ASYNC_DEFAULT)
+    UPLOAD_JOB_WORKERS = int(os.environ.get('UPLOAD_JOB_WORKERS', 2))
+    # Jobs a worker holds at once, queued or running; further uploads get a 503 with Retry-After
+    UPLOAD_JOB_QUEUE_SIZE = int(os.environ.get('UPLOAD_JOB_QUEUE_SIZE', 8))
+    # Seconds without progress after which a queued or running job is reported as failed,
+    # e.g. because the worker holding it restarted
+    UPLOAD_JOB_TIMEOUT = int(os.environ.get('UPLOAD_JOB_TIMEOUT', 600))
+    UPLOAD_ASYNC_DEFAULT = os.environ.get('UPLOAD_ASYNC_DEFAULT', 'False').lower() == 'true'
     
     # Spoonacular API
     SPOONACULAR_API_KEY = os.environ.get('SPOONACULAR_API_KEY')
+    SPOONACULAR_BASE_URL = os.environ.get('SPOONACULAR_BASE_URL', 'https://api.spoonacular.com')
     USE_MOCK_RECIPES = os.environ.get('USE_MOCK_RECIPES', 'True').lower() == 'true'
     
+    # Backend of the recipe search, fusion and recognition caches: 'memory' keeps
+    # a cache per worker, 'sqlite' and 'redis' share one cache across workers
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory').lower()
+    CACHE_SQLITE_PATH = os.environ.get(
+        'CACHE_SQLITE_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'cache.sqlite')
+    )
+    CACHE_SQLITE_MAX_ENTRIES = int(os.environ.get('CACHE_SQLITE_MAX_ENTRIES', 10000))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Upstream HTTP clients: timeouts (seconds), retries of idempotent calls and
+    # the circuit breaker that stops calls to a failing upstream for a cooldown
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10))
+    HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', 2))
+    HTTP_RETRY_BACKOFF = float(os.environ.get('HTTP_RETRY_BACKOFF', 0.3))
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 10))
+    CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get('CIRCUIT_BREAKER_THRESHOLD', 5))
+    CIRCUIT_BREAKER_COOLDOWN = float(os.environ.get('CIRCUIT_BREAKER_COOLDOWN', 30))
+    
+    # Spoonacular points quota, tracked across workers in a local SQLite file;
+    # once it is used up, recipes come from the database cache or mock data
+    SPOONACULAR_QUOTA_ENABLED = os.environ.get('SPOONACULAR_QUOTA_ENABLED', 'True').lower() == 'true'
+    SPOONACULAR_DAILY_POINTS = float(os.environ.get('SPOONACULAR_DAILY_POINTS', 150))
+    SPOONACULAR_QUOTA_DB = os.environ.get(
+        'SPOONACULAR_QUOTA_DB',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'spoonacular_quota.sqlite')
+    )
+    
+    # Recipes fetched from Spoonacular are cached in the database for this many seconds
+    RECIPE_CACHE_TTL = int(os.environ.get('RECIPE_CACHE_TTL', 24 * 60 * 60))
+    
+    # In-process LRU cache of ingredient-set recipe searches
+    RECIPE_SEARCH_CACHE_SIZE = int(os.environ.get('RECIPE_SEARCH_CACHE_SIZE', 256))
+    RECIPE_SEARCH_CACHE_TTL = int(os.environ.get('RECIPE_SEARCH_CACHE_TTL', 300))
+    
+    # Fusion generation searches every cuisine concurrently and uses the ones
+    # that answered within the deadline (seconds)
+    FUSION_SEARCH_WORKERS = int(os.environ.get('FUSION_SEARCH_WORKERS', 4))
+    FUSION_SEARCH_DEADLINE = float(os.environ.get('FUSION_SEARCH_DEADLINE', 8))
+    
+    # Generated fusion recipes are deterministic, so they are cached per worker
+    FUSION_CACHE_SIZE = int(os.environ.get('FUSION_CACHE_SIZE', 512))
+    FUSION_CACHE_TTL = int(os.environ.get('FUSION_CACHE_TTL', 24 * 60 * 60))
+    
+    # Per-request timing in a Server-Timing header and Prometheus metrics at /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING_ENABLED', 'True').lower() == 'true'
+    
+    # Query monitor: warns when one statement shape runs more than QUERY_REPEAT_THRESHOLD
+    # times in a request and logs statements slower than SLOW_QUERY_THRESHOLD_MS
+    QUERY_MONITOR_ENABLED = os.environ.get('QUERY_MONITOR_ENABLED', 'False').lower() == 'true'
+    QUERY_REPEAT_THRESHOLD = int(os.environ.get('QUERY_REPEAT_THRESHOLD', 10))
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+    
     # Database - use SQLite locally, but PostgreSQL on Render
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///fridgetoplate.db')
     # Handle Render's postgres:// vs postgresql:// URL format
     if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
         SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Every request thread (GUNICORN_THREADS) and upload job worker may hold a
+    # connection while it waits on an upstream, so the pool must cover them all
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 30))
+    SQLALCHEMY_ENGINE_OPTIONS = {'pool_size': DB_POOL_SIZE, 'max_overflow': DB_MAX_OVERFLOW}
 
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     TESTING = False
+    QUERY_MONITOR_ENABLED = os.environ.get('QUERY_MONITOR_ENABLED', 'True').lower() == 'true'
 
 
 class TestingConfig(Config):
@@ -42,6 +138,10 @@ class TestingConfig(Config):
     DEBUG = False
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # In-memory SQLite shares one connection and takes no pool size
+    IMAGE_PREPROCESS_WORKERS = 0  # Preprocess inline, without spawning processes
+    SPOONACULAR_QUOTA_ENABLED = False
+    CACHE_BACKEND = 'memory'
     USE_MOCK_VISION = True
     USE_MOCK_RECIPES = True
 
@@ -3,11 +3,19 @@ Ingredient model for the FridgeToPlate application.
 """
 from app import db
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 
 class Ingredient(db.Model):
     """Ingredient model representing food items recognized from images or added manually."""
     
     __tablename__ = 'ingredients'
+    # Pantry pages are read in (created_at, id) order
+    __table_args__ = (db.Index('ix_ingredients_created_at_id', 'created_at', 'id'),)
+    
+    # Columns the JSON API may return
+    FIELDS = ('id', 'name', 'created_at')
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
@@ -17,6 +25,107 @@ class Ingredient(db.Model):
         """String representation of the Ingredient object."""
         return f'<Ingredient {self.name}>'
     
+    @classmethod
+    def names(cls):
+        """
+        Get the name of every ingredient in the pantry, loading only that column.
+        
+        Returns:
+            list: Ingredient names
+        """
+        return [name for (name,) in db.session.query(cls.name)]
+    
+    @classmethod
+    def page(cls, after=None, limit=50, fields=FIELDS):
+        """
+        Get a page of ingredients in the order they were added.
+        
+        Pages are read by keyset: the page starts after the (created_at, id)
+        key of the previous page's last ingredient, so reading deep pages
+        costs the same as the first and ingredients added meanwhile are not
+        skipped or repeated. Only the requested columns are loaded.
+        
+        Args:
+            after (tuple, optional): (created_at, id) of the last ingredient of the previous page
+            limit (int): Maximum ingredients on the page
+            fields (tuple): Columns to return, from FIELDS
+            
+        Returns:
+            tuple: (list of ingredient dictionaries, (created_at, id) of the last one or None on the last page)
+        """
+        query = db.session.query(cls.created_at, cls.id, *(getattr(cls, field) for field in fields))
+        if after is not None:
+            query = query.filter(db.tuple_(cls.created_at, cls.id) > after)
+        rows = query.order_by(cls.created_at, cls.id).limit(limit + 1).all()
+        
+        ingredients = []
+        for row in rows[:limit]:
+            ingredient = dict(zip(fields, row[2:]))
+            if ingredient.get('created_at') is not None:
+                ingredient['created_at'] = ingredient['created_at'].isoformat()
+            ingredients.append(ingredient)
+        
+        next_key = (rows[limit - 1][0], rows[limit - 1][1]) if len(rows) > limit else None
+        return ingredients, next_key
+    
+    @classmethod
+    def add_many(cls, names):
+        """
+        Add several ingredients in one statement, skipping names that already exist.
+        
+        Existing names are found with a single IN query and the rest are
+        inserted together. On SQLite and PostgreSQL the insert uses
+        ON CONFLICT DO NOTHING, so a concurrent insert of the same name is not
+        an error, and RETURNING tells which rows were actually inserted. The
+        caller is responsible for committing.
+        
+        Args:
+            names (iterable): Ingredient names
+            
+        Returns:
+            list: Names inserted by this call, leaving out any added concurrently
+        """
+        names = list(dict.fromkeys(name for name in names if name))
+        if not names:
+            return []
+        
+        existing = {name for (name,) in db.session.query(cls.name).filter(cls.name.in_(names))}
+        missing = [name for name in names if name not in existing]
+        if not missing:
+            return []
+        
+        now = datetime.utcnow()
+        rows = [{'name': name, 'created_at': now} for name in missing]
+        dialect = db.session.get_bind().dialect
+        
+        if dialect.name in ('sqlite', 'postgresql'):
+            insert = sqlite_insert if dialect.name == 'sqlite' else postgresql_insert
+            statement = insert(cls).on_conflict_do_nothing(index_elements=['name'])
+            
+            if dialect.insert_returning:
+                # Rows skipped by the conflict clause are not returned
+                inserted = set(db.session.execute(statement.values(rows).returning(cls.name)).scalars())
+                return [name for name in missing if name in inserted]
+            
+            # SQLite before 3.35 has no RETURNING, so check the row count of each insert
+            return [row['name'] for row in rows if db.session.execute(statement.values([row])).rowcount]
+        
+        # Other databases: insert in a savepoint and fall back to row by row on a race
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(cls), rows)
+            return missing
+        except IntegrityError:
+            inserted = []
+            for row in rows:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(cls), [row])
+                    inserted.append(row['name'])
+                except IntegrityError:
+                    pass
+            return inserted
+    
     def to_dict(self):
         """Convert the Ingredient object to a dictionary."""
         return {
@@ -2,7 +2,8 @@
 Recipe model for the FridgeToPlate application.
 """
 from app import db
-from datetime import datetime
+from datetime import datetime, timedelta
+import json
 
 class Recipe(db.Model):
     """Recipe model representing cooking recipes."""
@@ -19,12 +20,47 @@ class Recipe(db.Model):
     summary = db.Column(db.Text)
     is_fusion = db.Column(db.Boolean, default=False)
     cuisines = db.Column(db.String(200))  # Comma-separated list of cuisines
+    ingredients = db.Column(db.Text)  # JSON-encoded list of ingredient names
+    fetched_at = db.Column(db.DateTime, index=True)  # When the recipe was last fetched upstream
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         """String representation of the Recipe object."""
         return f'<Recipe {self.title}>'
     
+    def is_stale(self, ttl):
+        """
+        Check whether the cached recipe is older than the given TTL.
+        
+        Args:
+            ttl (int): Maximum age in seconds
+            
+        Returns:
+            bool: True if the recipe should be refreshed from upstream
+        """
+        if not self.fetched_at:
+            return True
+        return datetime.utcnow() - self.fetched_at > timedelta(seconds=ttl)
+    
+    def update_from_dict(self, data):
+        """
+        Update the Recipe object from a recipe dictionary.
+        
+        Args:
+            data (dict): Recipe dictionary as returned by the recipe service
+        """
+        self.title = data.get('title') or ''
+        self.image_url = data.get('image_url')
+        self.source_url = data.get('source_url')
+        self.servings = data.get('servings')
+        self.ready_in_minutes = data.get('ready_in_minutes')
+        self.instructions = data.get('instructions')
+        self.summary = data.get('summary')
+        self.is_fusion = data.get('is_fusion', False)
+        self.cuisines = ','.join(data.get('cuisines') or [])
+        self.ingredients = json.dumps(data.get('ingredients') or [])
+        self.fetched_at = datetime.utcnow()
+    
     def to_dict(self):
         """Convert the Recipe object to a dictionary."""
         return {
@@ -38,5 +74,6 @@ class Recipe(db.Model):
             'summary': self.summary,
             'is_fusion': self.is_fusion,
             'cuisines': self.cuisines.split(',') if self.cuisines else [],
+            'ingredients': json.loads(self.ingredients) if self.ingredients else [],
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
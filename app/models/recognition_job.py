@@ -0,0 +1,43 @@
+"""
+Recognition job model for the FridgeToPlate application.
+"""
+from app import db
+from datetime import datetime
+import json
+
+class RecognitionJob(db.Model):
+    """Background ingredient recognition job for uploaded images."""
+    
+    __tablename__ = 'recognition_jobs'
+    
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    
+    id = db.Column(db.String(36), primary_key=True)  # UUID4
+    status = db.Column(db.String(20), nullable=False, default=QUEUED)
+    ingredients = db.Column(db.Text)  # JSON-encoded list of recognized ingredient names
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        """String representation of the RecognitionJob object."""
+        return f'<RecognitionJob {self.id} {self.status}>'
+    
+    @property
+    def is_finished(self):
+        """Whether the job has succeeded or failed."""
+        return self.status in (self.SUCCEEDED, self.FAILED)
+    
+    def to_dict(self):
+        """Convert the RecognitionJob object to a dictionary."""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'ingredients': json.loads(self.ingredients) if self.ingredients else [],
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,44 @@
+"""
+Recognition result model for the FridgeToPlate application.
+"""
+from app import db
+from datetime import datetime
+import json
+
+class RecognitionResult(db.Model):
+    """Cached ingredient recognition result for an uploaded image."""
+    
+    __tablename__ = 'recognition_results'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    content_hash = db.Column(db.String(64), nullable=False, unique=True)  # SHA-256 of the image bytes
+    perceptual_hash = db.Column(db.BigInteger)  # 64-bit dHash stored as a signed integer
+    # The dHash split into four 16-bit bands, most significant first, to find near-duplicates by index
+    hash_band_0 = db.Column(db.Integer, index=True)
+    hash_band_1 = db.Column(db.Integer, index=True)
+    hash_band_2 = db.Column(db.Integer, index=True)
+    hash_band_3 = db.Column(db.Integer, index=True)
+    ingredients = db.Column(db.Text, nullable=False)  # JSON-encoded list of ingredient names
+    hit_count = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    last_hit_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        """String representation of the RecognitionResult object."""
+        return f'<RecognitionResult {self.content_hash[:12]}>'
+    
+    def get_ingredients(self):
+        """Get the cached ingredient names as a list."""
+        return json.loads(self.ingredients) if self.ingredients else []
+    
+    def to_dict(self):
+        """Convert the RecognitionResult object to a dictionary."""
+        return {
+            'id': self.id,
+            'content_hash': self.content_hash,
+            'perceptual_hash': self.perceptual_hash,
+            'ingredients': self.get_ingredients(),
+            'hit_count': self.hit_count,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_hit_at': self.last_hit_at.isoformat() if self.last_hit_at else None
+        }
@@ -4,8 +4,13 @@ Ingredient-related routes for the FridgeToPlate application.
 from flask import Blueprint, render_template, request, jsonify, current_app, redirect, url_for
 import os
 import uuid
+from datetime import datetime
 from werkzeug.utils import secure_filename
-from app.services.image_recognition import recognize_ingredients
+from app.services.upload_jobs import (
+    recognize_uploads, submit_recognition_job, get_recognition_job, JobQueueFull, RETRY_AFTER
+)
+from app.services.normalization import normalize_ingredient, normalize_ingredients
+from app.services.pagination import PaginationError, encode_cursor, decode_cursor, page_size, parse_fields
 from app.models.ingredient import Ingredient
 from app import db
 
@@ -18,20 +23,70 @@ def allowed_file(filename):
 
 @ingredients_bp.route('/')
 def list_ingredients():
-    """Render the ingredients management page."""
-    ingredients = Ingredient.query.all()
-    return render_template('ingredients.html', ingredients=ingredients)
+    """Render the ingredients management page with the first page of the pantry."""
+    # Later pages are loaded from /ingredients/page
+    ingredients, next_key = Ingredient.page(limit=current_app.config.get('INGREDIENT_PAGE_SIZE', 50),
+                                            fields=('id', 'name'))
+    return render_template('ingredients.html', ingredients=ingredients, next_cursor=_ingredient_cursor(next_key))
+
+@ingredients_bp.route('/page')
+def ingredients_page():
+    """Get a page of the pantry, in the order ingredients were added, as JSON."""
+    config = current_app.config
+    
+    try:
+        fields = parse_fields(request.args.get('fields'), Ingredient.FIELDS, Ingredient.FIELDS)
+        after = _ingredient_key(request.args.get('cursor'))
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = page_size(request.args.get('limit', type=int),
+                      config.get('INGREDIENT_PAGE_SIZE', 50), config.get('API_MAX_PAGE_SIZE', 100))
+    ingredients, next_key = Ingredient.page(after=after, limit=limit, fields=fields)
+    
+    return jsonify({
+        'success': True,
+        'ingredients': ingredients,
+        'next_cursor': _ingredient_cursor(next_key)
+    })
 
 @ingredients_bp.route('/add', methods=['POST'])
 def add_ingredient():
     """Add a new ingredient manually."""
-    name = request.form.get('name')
+    name = normalize_ingredient(request.form.get('name') or '')
     if name:
-        ingredient = Ingredient(name=name)
-        db.session.add(ingredient)
+        Ingredient.add_many([name])
         db.session.commit()
     return redirect(url_for('ingredients'))
 
+@ingredients_bp.route('/batch', methods=['POST'])
+def add_ingredients_batch():
+    """Add many ingredients in one transaction."""
+    data = request.get_json(silent=True)
+    
+    if not data or not isinstance(data.get('names'), list):
+        return jsonify({'error': 'A list of names is required'}), 400
+    
+    names = normalize_ingredients(name for name in data['names'] if isinstance(name, str))
+    
+    if not names:
+        return jsonify({'error': 'A list of names is required'}), 400
+    
+    if len(names) > current_app.config.get('INGREDIENT_BATCH_LIMIT', 500):
+        return jsonify({'error': 'Too many ingredients in one request'}), 400
+    
+    if any(len(name) > Ingredient.name.type.length for name in names):
+        return jsonify({'error': 'Ingredient name is too long'}), 400
+    
+    added = Ingredient.add_many(names)
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'added': added,
+        'existing': [name for name in names if name not in added]
+    })
+
 @ingredients_bp.route('/delete/<int:id>', methods=['POST'])
 def delete_ingredient(id):
     """Delete an ingredient."""
@@ -42,37 +97,87 @@ def delete_ingredient(id):
 
 @ingredients_bp.route('/upload', methods=['POST'])
 def upload_image():
-    """Upload an image and recognize ingredients."""
+    """Upload one or more images and recognize ingredients."""
     if 'image' not in request.files:
         return jsonify({'error': 'No file part'}), 400
     
-    file = request.files['image']
-    if file.filename == '':
+    files = request.files.getlist('image')
+    if any(file.filename == '' for file in files):
         return jsonify({'error': 'No selected file'}), 400
     
-    if file and allowed_file(file.filename):
-        # Generate a secure filename with UUID to prevent collisions
-        filename = str(uuid.uuid4()) + '_' + secure_filename(file.filename)
-        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Recognize ingredients in the image
-        ingredients = recognize_ingredients(filepath)
-        
-        # Save recognized ingredients to database
-        for ingredient_name in ingredients:
-            # Check if ingredient already exists
-            existing = Ingredient.query.filter_by(name=ingredient_name).first()
-            if not existing:
-                ingredient = Ingredient(name=ingredient_name)
-                db.session.add(ingredient)
+    if not all(allowed_file(file.filename) for file in files):
+        return jsonify({'error': 'File type not allowed'}), 400
+    
+    # Images are recognized from memory; keeping a copy on disk is optional
+    images = []
+    filenames = []
+    for file in files:
+        content = file.read()
+        images.append(content)
+        filenames.append(file.filename)
         
-        db.session.commit()
+        if current_app.config.get('PERSIST_UPLOADS', False):
+            # Generate a secure filename with UUID to prevent collisions
+            filename = str(uuid.uuid4()) + '_' + secure_filename(file.filename)
+            with open(os.path.join(current_app.config['UPLOAD_FOLDER'], filename), 'wb') as upload_file:
+                upload_file.write(content)
+    
+    # In job mode, recognition runs in the background and the client polls for the result
+    if _wants_async():
+        try:
+            job = submit_recognition_job(images, filenames)
+        except JobQueueFull as e:
+            return jsonify({'error': str(e)}), 503, {'Retry-After': str(RETRY_AFTER)}
         
         return jsonify({
             'success': True,
-            'ingredients': ingredients,
-            'message': f'Recognized {len(ingredients)} ingredients'
-        })
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('ingredients.upload_job_status', job_id=job.id)
+        }), 202
+    
+    ingredients = recognize_uploads(images, filenames)
     
-    return jsonify({'error': 'File type not allowed'}), 400
+    return jsonify({
+        'success': True,
+        'ingredients': ingredients,
+        'message': f'Recognized {len(ingredients)} ingredients'
+    })
+
+@ingredients_bp.route('/jobs/<job_id>')
+def upload_job_status(job_id):
+    """Get the status and result of an upload recognition job."""
+    job = get_recognition_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = job.to_dict()
+    if job.status == job.SUCCEEDED:
+        response['message'] = f"Recognized {len(response['ingredients'])} ingredients"
+    
+    return jsonify(response)
+
+def _ingredient_cursor(key):
+    """Encode the (created_at, id) key of a pantry page's last ingredient as a cursor."""
+    if key is None:
+        return None
+    created_at, ingredient_id = key
+    return encode_cursor({'created_at': created_at.isoformat(), 'id': ingredient_id})
+
+def _ingredient_key(cursor):
+    """Decode a pantry cursor into its (created_at, id) key, or None for the first page."""
+    if not cursor:
+        return None
+    
+    values = decode_cursor(cursor, ('created_at', 'id'))
+    try:
+        return datetime.fromisoformat(values['created_at']), int(values['id'])
+    except (TypeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+def _wants_async():
+    """Check whether the upload should be processed as a background job."""
+    value = request.args.get('async', request.form.get('async'))
+    if value is None:
+        return current_app.config.get('UPLOAD_ASYNC_DEFAULT', False)
+    return value.lower() in ('1', 'true', 'yes')
@@ -2,23 +2,49 @@
 Recipe-related routes for the FridgeToPlate application.
 """
 from flask import Blueprint, render_template, request, jsonify, current_app
-from app.services.recipe_service import get_recipes_by_ingredients, generate_fusion_recipe
+from app.services.recipe_service import (
+    get_recipes_by_ingredients, generate_fusion_recipe, RECIPE_FIELDS, RECIPE_CARD_FIELDS
+)
+from app.services.pagination import PaginationError, page_ranked, page_size, parse_fields, select_fields
 from app.models.ingredient import Ingredient
 
 recipes_bp = Blueprint('recipes', __name__)
 
 @recipes_bp.route('/')
 def list_recipes():
-    """Render the recipes page with suggestions based on available ingredients."""
-    ingredients = Ingredient.query.all()
-    ingredient_names = [ingredient.name for ingredient in ingredients]
+    """Render the recipes page with the first page of suggestions based on available ingredients."""
+    ingredient_names = Ingredient.names()
     
-    # Get recipe suggestions if ingredients are available
-    recipes = []
+    # Get recipe suggestions if ingredients are available; later pages come from /recipes/suggestions
+    recipes, next_cursor = [], None
     if ingredient_names:
-        recipes = get_recipes_by_ingredients(ingredient_names)
+        ranked = get_recipes_by_ingredients(ingredient_names)
+        recipes, next_cursor = page_ranked(ranked, None, current_app.config.get('RECIPE_PAGE_SIZE', 12))
     
-    return render_template('recipes.html', recipes=recipes, ingredients=ingredients)
+    return render_template('recipes.html', recipes=recipes, ingredients=ingredient_names, next_cursor=next_cursor)
+
+@recipes_bp.route('/suggestions')
+def recipe_suggestions():
+    """Get a page of recipe suggestions based on available ingredients as JSON."""
+    config = current_app.config
+    
+    try:
+        fields = parse_fields(request.args.get('fields'), RECIPE_FIELDS, RECIPE_CARD_FIELDS)
+        limit = page_size(request.args.get('limit', type=int),
+                          config.get('RECIPE_PAGE_SIZE', 12), config.get('API_MAX_PAGE_SIZE', 100))
+        
+        # Suggestions are cached per ingredient set, so later pages do not search again
+        ingredient_names = Ingredient.names()
+        ranked = get_recipes_by_ingredients(ingredient_names) if ingredient_names else []
+        recipes, next_cursor = page_ranked(ranked, request.args.get('cursor'), limit)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'success': True,
+        'recipes': [select_fields(recipe, fields) for recipe in recipes],
+        'next_cursor': next_cursor
+    })
 
 @recipes_bp.route('/detail/<int:recipe_id>')
 def recipe_detail(recipe_id):
@@ -41,8 +67,7 @@ def fusion():
         return jsonify({'error': 'Cuisines are required'}), 400
     
     # Get available ingredients
-    ingredients = Ingredient.query.all()
-    ingredient_names = [ingredient.name for ingredient in ingredients]
+    ingredient_names = Ingredient.names()
     
     if not ingredient_names:
         return jsonify({'error': 'No ingredients available'}), 400
@@ -0,0 +1,103 @@
+"""
+In-process caching utilities for the FridgeToPlate application.
+
+This module provides a small thread-safe LRU cache with a per-entry TTL,
+used to memoize expensive service calls within a worker process.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class LRUCache:
+    """Bounded least-recently-used cache whose entries expire after a TTL."""
+    
+    def __init__(self, maxsize=256, ttl=300):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize (int): Maximum number of entries kept before evicting
+            ttl (float): Lifetime of an entry in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key, default=None):
+        """
+        Get a value from the cache.
+        
+        Args:
+            key: Cache key
+            default: Value returned when the key is missing or expired
+            
+        Returns:
+            The cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """
+        Store a value in the cache, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, key=None):
+        """
+        Remove one entry, or every entry if no key is given.
+        
+        Args:
+            key (optional): Cache key to remove
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self):
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: Hit, miss, eviction and expiration counts plus current size
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
@@ -0,0 +1,231 @@
+"""
+Fusion recipe engine for the FridgeToPlate application.
+
+Cuisine data is compiled once into per-cuisine and per-cuisine-pair
+profiles, and instructions are assembled from fixed templates. Choices are
+drawn from a random generator seeded with a hash of the request, so the same
+ingredients and cuisines always give the same recipe and results can be
+cached.
+"""
+import re
+import json
+import random
+import hashlib
+from collections import namedtuple
+from itertools import permutations
+from app.services.cache import LRUCache
+
+# Merged data for an ordered combination of cuisines
+FusionProfile = namedtuple('FusionProfile', ['cuisines', 'ingredients', 'techniques', 'flavors', 'title_suffix', 'summary'])
+
+# Cooking method steps, in priority order; the first sampled technique listed here is used
+METHOD_TEMPLATES = (
+    ('simmer', (
+        "2. Heat oil in a pan and add aromatics.",
+        "3. Add main ingredients and simmer until cooked through."
+    )),
+    ('stir fry', (
+        "2. Heat oil in a wok or large pan until very hot.",
+        "3. Quickly stir fry ingredients in small batches, starting with aromatics."
+    )),
+    ('grill', (
+        "2. Marinate main ingredients with spices and oil.",
+        "3. Grill until cooked through with nice char marks."
+    )),
+)
+
+DEFAULT_METHOD = (
+    "2. Combine ingredients in a suitable cooking vessel.",
+    "3. Cook using your preferred method until done."
+)
+
+FIRST_STEP = "1. Prepare all ingredients."
+SEASON_STEP = "4. Season to taste, aiming for a {flavors} flavor profile."
+LAST_STEP = "5. Garnish with fresh herbs and serve immediately."
+
+SUMMARY_TEMPLATE = "A creative fusion dish combining elements of {cuisines} cuisines, using ingredients you already have."
+
+# Maximum number of ingredients in a generated recipe
+MAX_INGREDIENTS = 10
+
+# Numbered step markers in upstream recipe instructions
+_STEP_PATTERN = re.compile(r'\d+\.')
+
+def fusion_seed(ingredients, cuisines):
+    """
+    Derive a reproducible random seed from a fusion request.
+    
+    Args:
+        ingredients (iterable): Ingredient names
+        cuisines (iterable): Cuisine names
+        
+    Returns:
+        int: 64-bit seed
+    """
+    payload = json.dumps([list(ingredients), list(cuisines)], separators=(',', ':'))
+    return int.from_bytes(hashlib.sha256(payload.encode('utf-8')).digest()[:8], 'big')
+
+def split_steps(instructions):
+    """
+    Split numbered recipe instructions into steps.
+    
+    Args:
+        instructions (str): Instructions such as "1. Boil water. 2. Add pasta."
+        
+    Returns:
+        list: Non-empty step texts without their numbers
+    """
+    return [step.strip() for step in _STEP_PATTERN.split(instructions) if step.strip()]
+
+class FusionEngine:
+    """Deterministic fusion recipe generator with a bounded result cache."""
+    
+    def __init__(self, cuisine_data, cache=None):
+        """
+        Compile the cuisine data.
+        
+        Profiles for every single cuisine and every ordered pair of cuisines
+        are built up front; larger combinations are merged on demand.
+        
+        Args:
+            cuisine_data (dict): Mapping of cuisine name to its ingredients, techniques and flavors
+            cache (optional): Cache of generated recipes with get and set, such as an LRUCache
+        """
+        self._cuisine_data = cuisine_data
+        self._cuisine_names = tuple(cuisine_data)
+        self._profiles = {}
+        
+        for cuisine in self._cuisine_names:
+            self._profiles[(cuisine,)] = self._build_profile((cuisine,))
+        for pair in permutations(self._cuisine_names, 2):
+            self._profiles[pair] = self._build_profile(pair)
+        
+        self.cache = cache if cache is not None else LRUCache(maxsize=512, ttl=24 * 60 * 60)
+    
+    def generate(self, ingredients, cuisines):
+        """
+        Generate a fusion recipe, or return the cached one for the same request.
+        
+        Unknown cuisines are ignored. If none of the requested cuisines are
+        known, two cuisines are picked with the request's seed.
+        
+        Args:
+            ingredients (list): List of available ingredient names
+            cuisines (list): List of cuisine names to combine
+            
+        Returns:
+            dict: Generated fusion recipe
+        """
+        ingredients = tuple(dict.fromkeys(ingredient for ingredient in ingredients if ingredient))
+        cuisines = tuple(cuisines)
+        key = (ingredients, cuisines)
+        
+        recipe = self.cache.get(key)
+        if recipe is None:
+            recipe = self._generate(ingredients, cuisines)
+            self.cache.set(key, recipe)
+        
+        return _copy_recipe(recipe)
+    
+    def _generate(self, ingredients, cuisines):
+        """
+        Generate a fusion recipe.
+        
+        Args:
+            ingredients (tuple): Available ingredient names, without duplicates
+            cuisines (tuple): Requested cuisine names
+            
+        Returns:
+            dict: Generated fusion recipe
+        """
+        rng = random.Random(fusion_seed(ingredients, cuisines))
+        
+        valid_cuisines = tuple(dict.fromkeys(cuisine for cuisine in cuisines if cuisine in self._cuisine_data))
+        if not valid_cuisines:
+            valid_cuisines = tuple(rng.sample(self._cuisine_names, min(2, len(self._cuisine_names))))
+        
+        profile = self._get_profile(valid_cuisines)
+        
+        # Available ingredients first, then cuisine-specific ones up to the limit
+        fusion_ingredients = list(ingredients)
+        seen = set(fusion_ingredients)
+        for ingredient in profile.ingredients:
+            if len(fusion_ingredients) >= MAX_INGREDIENTS:
+                break
+            if ingredient not in seen:
+                fusion_ingredients.append(ingredient)
+                seen.add(ingredient)
+        
+        techniques = rng.sample(profile.techniques, min(3, len(profile.techniques)))
+        flavors = rng.sample(profile.flavors, min(2, len(profile.flavors)))
+        
+        method = next((steps for technique, steps in METHOD_TEMPLATES if technique in techniques), DEFAULT_METHOD)
+        instructions = "\n".join((
+            FIRST_STEP,
+            *method,
+            SEASON_STEP.format(flavors=" and ".join(flavors)),
+            LAST_STEP
+        ))
+        
+        main_ingredients = ", ".join(fusion_ingredients[:3])
+        
+        return {
+            "id": rng.randint(1000, 9999),
+            "title": f"Fusion {main_ingredients.title()} {profile.title_suffix}",
+            "image_url": "https://spoonacular.com/recipeImages/fusion-recipe.jpg",
+            "source_url": "https://fridgetoplate.app/fusion",
+            "servings": 4,
+            "ready_in_minutes": rng.randint(20, 60),
+            "instructions": instructions,
+            "summary": profile.summary,
+            "cuisines": list(profile.cuisines),
+            "ingredients": fusion_ingredients,
+            "is_fusion": True
+        }
+    
+    def _get_profile(self, cuisines):
+        """
+        Get the compiled profile for an ordered combination of cuisines.
+        
+        Args:
+            cuisines (tuple): Known cuisine names
+            
+        Returns:
+            FusionProfile: The profile
+        """
+        profile = self._profiles.get(cuisines)
+        return profile if profile is not None else self._build_profile(cuisines)
+    
+    def _build_profile(self, cuisines):
+        """
+        Merge the data of several cuisines, keeping first-seen order.
+        
+        Args:
+            cuisines (tuple): Known cuisine names
+            
+        Returns:
+            FusionProfile: The merged profile
+        """
+        merged = {'ingredients': {}, 'techniques': {}, 'flavors': {}}
+        for cuisine in cuisines:
+            data = self._cuisine_data[cuisine]
+            for field, values in merged.items():
+                values.update(dict.fromkeys(data.get(field, [])))
+        
+        cuisine_names = " and ".join(cuisines)
+        
+        return FusionProfile(
+            cuisines=cuisines,
+            ingredients=tuple(merged['ingredients']),
+            techniques=tuple(merged['techniques']),
+            flavors=tuple(merged['flavors']),
+            title_suffix=f"({cuisine_names} Style)",
+            summary=SUMMARY_TEMPLATE.format(cuisines=cuisine_names)
+        )
+
+def _copy_recipe(recipe):
+    """Copy a cached recipe so callers can modify it without affecting the cache."""
+    copy = dict(recipe)
+    copy["cuisines"] = list(recipe["cuisines"])
+    copy["ingredients"] = list(recipe["ingredients"])
+    return copy
@@ -0,0 +1,288 @@
+"""
+Upstream HTTP client for the FridgeToPlate application.
+
+Each upstream API gets one client per worker process. A client holds a
+pooled keep-alive requests.Session, applies connect and read timeouts to
+every call, retries idempotent calls with jittered exponential backoff and
+stops calling an upstream that keeps failing until a cooldown has passed.
+"""
+import os
+import time
+import random
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from flask import current_app
+from app.services import metrics
+
+# Child of the application logger; clients are also used from pool threads without an app context
+logger = logging.getLogger(__name__)
+
+# Response statuses worth retrying; anything else is returned to the caller
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_clients = {}
+_clients_pid = None
+_lock = threading.Lock()
+
+class UpstreamUnavailable(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a cooldown and a single half-open probe."""
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=5, cooldown=30):
+        """
+        Initialize the breaker.
+        
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit
+            cooldown (float): Seconds the circuit stays open before a probe call is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+    
+    def allow(self):
+        """
+        Check whether a call may be made.
+        
+        Once the cooldown has passed, one probe call is let through; its
+        outcome closes the circuit or opens it for another cooldown.
+        
+        Returns:
+            bool: True if the call may proceed
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            
+            return False
+    
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+    
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold or after a failed probe."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class UpstreamClient:
+    """Pooled HTTP client for one upstream API."""
+    
+    def __init__(self, name, base_url, connect_timeout=3.05, read_timeout=10, retries=2,
+                 backoff=0.3, pool_size=10, failure_threshold=5, cooldown=30):
+        """
+        Initialize the client.
+        
+        Args:
+            name (str): Upstream name used in log messages
+            base_url (str): URL prefixed to every request path
+            connect_timeout (float): Seconds to wait for a connection
+            read_timeout (float): Seconds to wait between bytes of the response
+            retries (int): Extra attempts for idempotent calls
+            backoff (float): Base delay in seconds, doubled on each retry and jittered
+            pool_size (int): Connections kept alive to the upstream
+            failure_threshold (int): Consecutive failures that open the circuit breaker
+            cooldown (float): Seconds the circuit breaker stays open
+        """
+        self.name = name
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def get(self, path, params=None, deadline=None):
+        """
+        Send a GET request, retrying transient failures.
+        
+        Args:
+            path (str): Request path appended to the base URL
+            params (dict, optional): Query parameters
+            deadline (float, optional): time.monotonic() value by which the call must finish;
+                read timeouts are shortened and retries skipped to meet it
+                
+        Returns:
+            requests.Response: Successful response
+            
+        Raises:
+            UpstreamUnavailable: If the circuit breaker is open
+            requests.RequestException: If the last attempt failed
+        """
+        return self._request('GET', path, params=params, deadline=deadline, idempotent=True)
+    
+    def post(self, path, json=None, params=None, deadline=None):
+        """
+        Send a POST request once, without retries.
+        
+        Args:
+            path (str): Request path appended to the base URL
+            json (optional): JSON request body
+            params (dict, optional): Query parameters
+            deadline (float, optional): time.monotonic() value by which the call must finish
+            
+        Returns:
+            requests.Response: Successful response
+            
+        Raises:
+            UpstreamUnavailable: If the circuit breaker is open
+            requests.RequestException: If the call failed
+        """
+        return self._request('POST', path, params=params, json=json, deadline=deadline, idempotent=False)
+    
+    def stats(self):
+        """
+        Get circuit breaker state.
+        
+        Returns:
+            dict: Breaker state and consecutive failure count
+        """
+        return {'state': self.breaker.state, 'failures': self.breaker.failures}
+    
+    def _request(self, method, path, deadline=None, idempotent=True, **kwargs):
+        """
+        Send a request through the circuit breaker, retrying if idempotent and timing the call.
+        
+        Args:
+            method (str): HTTP method
+            path (str): Request path appended to the base URL
+            deadline (float, optional): time.monotonic() value by which the call must finish
+            idempotent (bool): Whether failed attempts may be retried
+            **kwargs: Extra arguments for requests.Session.request
+            
+        Returns:
+            requests.Response: Successful response
+        """
+        if not self.breaker.allow():
+            metrics.upstream_rejected(self.name)
+            raise UpstreamUnavailable(f"{self.name} circuit breaker is open")
+        
+        with metrics.track_upstream(self.name):
+            return self._send(method, path, deadline, idempotent, **kwargs)
+    
+    def _send(self, method, path, deadline, idempotent, **kwargs):
+        """Send a request, retrying failed attempts if idempotent."""
+        attempts = 1 + (self.retries if idempotent else 0)
+        
+        try:
+            for attempt in range(attempts):
+                read_timeout = self.read_timeout
+                if deadline is not None:
+                    read_timeout = min(read_timeout, max(deadline - time.monotonic(), 0.1))
+                
+                try:
+                    response = self.session.request(
+                        method, f"{self.base_url}{path}",
+                        timeout=(self.connect_timeout, read_timeout), **kwargs
+                    )
+                    if response.status_code in RETRY_STATUSES:
+                        response.raise_for_status()
+                except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                    delay = random.uniform(0, self.backoff * (2 ** attempt))
+                    out_of_time = deadline is not None and time.monotonic() + delay >= deadline
+                    
+                    if attempt == attempts - 1 or out_of_time:
+                        raise
+                    
+                    logger.warning(f"{self.name} {method} {path} failed, retrying in {delay:.2f}s: {str(e)}")
+                    time.sleep(delay)
+                    continue
+                
+                break
+        except BaseException:
+            # Any exit without a response counts, including errors that are not
+            # retried and interrupts, so a half-open probe never leaves the circuit stuck
+            self.breaker.record_failure()
+            raise
+        
+        self.breaker.record_success()
+        # Client errors are the caller's problem and do not count against the upstream
+        response.raise_for_status()
+        return response
+
+def get_client(name, base_url):
+    """
+    Get the client for an upstream, creating it from the app config on first use.
+    
+    Clients are created once per worker process, so connections are never
+    shared with a forked child.
+    
+    Args:
+        name (str): Upstream name
+        base_url (str): URL prefixed to every request path
+        
+    Returns:
+        UpstreamClient: The client
+    """
+    global _clients, _clients_pid
+    
+    pid = os.getpid()
+    client = _clients.get(name) if _clients_pid == pid else None
+    if client is not None:
+        return client
+    
+    with _lock:
+        if _clients_pid != pid:
+            _clients = {}
+            _clients_pid = pid
+        
+        if name not in _clients:
+            config = current_app.config
+            _clients[name] = UpstreamClient(
+                name, base_url,
+                connect_timeout=config.get('HTTP_CONNECT_TIMEOUT', 3.05),
+                read_timeout=config.get('HTTP_READ_TIMEOUT', 10),
+                retries=config.get('HTTP_RETRIES', 2),
+                backoff=config.get('HTTP_RETRY_BACKOFF', 0.3),
+                pool_size=config.get('HTTP_POOL_SIZE', 10),
+                failure_threshold=config.get('CIRCUIT_BREAKER_THRESHOLD', 5),
+                cooldown=config.get('CIRCUIT_BREAKER_COOLDOWN', 30)
+            )
+        
+        return _clients[name]
+
+def get_upstream_stats():
+    """
+    Get circuit breaker state for every upstream client in this worker.
+    
+    Returns:
+        dict: Mapping of upstream name to its breaker state
+    """
+    return {name: client.stats() for name, client in _clients.items()} if _clients_pid == os.getpid() else {}
+
+def _reset_clients():
+    """Forget clients inherited from a parent process."""
+    global _clients, _clients_pid, _lock
+    
+    _clients = {}
+    _clients_pid = None
+    _lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_clients)
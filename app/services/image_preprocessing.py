@@ -0,0 +1,183 @@
+"""
+Image preprocessing service for the FridgeToPlate application.
+
+Uploaded photos are normalized before being sent for recognition: EXIF
+orientation is applied, the image is downscaled to a maximum dimension and
+re-encoded as JPEG. The 64-bit difference hash (dHash) used to match
+near-duplicate uploads is computed from the same decoded image. Decoding runs
+in a process pool so it does not hold the GIL on request threads.
+"""
+import io
+import os
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app
+from PIL import Image, ImageOps
+
+# EXIF tag holding the camera orientation
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Size of the grayscale thumbnail the difference hash is computed from
+DHASH_SIZE = 8
+
+# Bytes to send for recognition and the unsigned 64-bit dHash of the image (None if it could not be hashed)
+PreprocessedImage = namedtuple('PreprocessedImage', ['content', 'perceptual_hash'])
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+def preprocess_image(content):
+    """
+    Downscale and re-encode an image before recognition, and hash it.
+    
+    Work is dispatched to the preprocessing process pool when
+    IMAGE_PREPROCESS_WORKERS is positive, and done inline otherwise. If
+    preprocessing fails the original bytes are returned unchanged, without
+    a hash.
+    
+    Args:
+        content (bytes): Original image bytes
+        
+    Returns:
+        PreprocessedImage: Preprocessed JPEG bytes or the original bytes, and the dHash
+    """
+    max_dimension = current_app.config.get('IMAGE_MAX_DIMENSION', 1024)
+    quality = current_app.config.get('IMAGE_JPEG_QUALITY', 85)
+    
+    try:
+        executor = _get_executor()
+        
+        if executor is None:
+            return _preprocess_image_bytes(content, max_dimension, quality)
+        
+        future = executor.submit(_preprocess_image_bytes, content, max_dimension, quality)
+        return future.result(timeout=current_app.config.get('IMAGE_PREPROCESS_TIMEOUT', 10))
+    
+    except BrokenProcessPool as e:
+        # A pool process died; start a fresh pool on the next call
+        current_app.logger.warning(f"Image preprocessing pool failed, using original image: {str(e)}")
+        _reset_executor()
+        return PreprocessedImage(content, None)
+    
+    except Exception as e:
+        current_app.logger.warning(f"Image preprocessing failed, using original image: {str(e)}")
+        return PreprocessedImage(content, None)
+
+def _preprocess_image_bytes(content, max_dimension, quality):
+    """
+    Apply EXIF orientation, downscale and re-encode an image as JPEG, and hash it.
+    
+    Runs in a worker process, so it must not use the Flask application context.
+    
+    Args:
+        content (bytes): Original image bytes
+        max_dimension (int): Maximum width or height in pixels
+        quality (int): JPEG quality
+        
+    Returns:
+        PreprocessedImage: JPEG bytes, or the original bytes if no change was needed, and the dHash
+    """
+    with Image.open(io.BytesIO(content)) as image:
+        original_format = image.format
+        needs_resize = max(image.size) > max_dimension
+        
+        # Let the JPEG decoder skip detail we would throw away anyway
+        if needs_resize and original_format == 'JPEG':
+            image.draft('RGB', (max_dimension, max_dimension))
+        
+        # Small JPEGs that are already upright are sent as they are
+        needs_rotation = image.getexif().get(EXIF_ORIENTATION_TAG, 1) != 1
+        if original_format == 'JPEG' and not needs_resize and not needs_rotation:
+            # Decode at reduced scale; the hash only needs a tiny thumbnail
+            image.draft('L', (DHASH_SIZE * 16, DHASH_SIZE * 16))
+            return PreprocessedImage(content, _dhash_or_none(image))
+        
+        transposed = ImageOps.exif_transpose(image) if needs_rotation else image
+        
+        if transposed.mode in ('RGBA', 'LA', 'P'):
+            rgba = transposed.convert('RGBA')
+            flattened = Image.new('RGB', rgba.size, (255, 255, 255))
+            flattened.paste(rgba, mask=rgba.getchannel('A'))
+            transposed = flattened
+        elif transposed.mode != 'RGB':
+            transposed = transposed.convert('RGB')
+        
+        transposed.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+        
+        output = io.BytesIO()
+        transposed.save(output, format='JPEG', quality=quality, optimize=True)
+        return PreprocessedImage(output.getvalue(), _dhash_or_none(transposed))
+
+def dhash(image):
+    """
+    Compute the 64-bit difference hash of an image.
+    
+    Each bit records whether a pixel of a 9x8 grayscale thumbnail is brighter
+    than its right-hand neighbour, which is stable under rescaling and
+    re-encoding.
+    
+    Args:
+        image (PIL.Image.Image): Upright image
+        
+    Returns:
+        int: Unsigned 64-bit hash
+    """
+    pixels = list(image.convert('L').resize((DHASH_SIZE + 1, DHASH_SIZE), Image.LANCZOS).getdata())
+    
+    value = 0
+    for row in range(DHASH_SIZE):
+        offset = row * (DHASH_SIZE + 1)
+        for column in range(DHASH_SIZE):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    
+    return value
+
+def _dhash_or_none(image):
+    """Hash an image, or return None if it cannot be decoded; the preprocessed bytes are still usable."""
+    try:
+        return dhash(image)
+    except Exception:
+        return None
+
+def _get_executor():
+    """
+    Get the preprocessing process pool for the current process, creating it on first use.
+    
+    Returns:
+        ProcessPoolExecutor or None: The pool, or None if preprocessing runs inline
+    """
+    global _executor, _executor_pid
+    
+    workers = current_app.config.get('IMAGE_PREPROCESS_WORKERS', 1)
+    if workers <= 0:
+        return None
+    
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+    
+    with _lock:
+        if _executor is None or _executor_pid != pid:
+            # Forking from a threaded worker is unsafe, so pool processes are spawned
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            _executor_pid = pid
+    
+    return _executor
+
+def _reset_executor():
+    """Forget a pool inherited from a parent process."""
+    global _executor, _executor_pid, _lock
+    
+    _executor = None
+    _executor_pid = None
+    _lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
@@ -6,13 +6,12 @@ using Google Cloud Vision API or mock data for development.
 """
 import os
 import io
-import base64
-import json
-import tempfile
 from flask import current_app
 from google.cloud import vision
-from google.oauth2 import service_account
-import json
+from app.services.vision_client import get_vision_client
+from app.services.image_preprocessing import preprocess_image
+from app.services import recognition_cache, metrics
+from app.services.vocabulary import Vocabulary
 
 # Mock data for development without API keys
 MOCK_INGREDIENTS = {
@@ -38,35 +37,77 @@ MOCK_INGREDIENTS = {
     'lemon': ['lemon', 'fruit', 'yellow lemon'],
 }
 
-def recognize_ingredients(image_path):
+# Label words that mark a Vision label as food-related
+FOOD_CATEGORIES = [
+    'food', 'fruit', 'vegetable', 'meat', 'dairy', 'grain', 'spice',
+    'herb', 'beverage', 'dish', 'meal', 'ingredient', 'produce'
+]
+
+# Matcher over ingredient names, variations and categories, built once per process
+_VOCABULARY = Vocabulary(MOCK_INGREDIENTS, FOOD_CATEGORIES)
+
+# Features requested together in a single Vision call per image
+VISION_FEATURES = [
+    vision.Feature(type_=vision.Feature.Type.LABEL_DETECTION),
+    vision.Feature(type_=vision.Feature.Type.OBJECT_LOCALIZATION),
+]
+
+# Maximum number of images Vision accepts in one synchronous batch request
+VISION_BATCH_SIZE = 16
+
+def recognize_ingredients(image, filename=None):
     """
     Recognize ingredients in an image using Google Cloud Vision API or mock data.
     
     Args:
-        image_path (str): Path to the image file
+        image (str, bytes or file-like): Path to the image file, image bytes or a readable binary stream
+        filename (str, optional): Original filename, used by the mock recognizer for in-memory images
         
     Returns:
         list: List of recognized ingredient names
     """
-    # Check if we should use mock data
-    if current_app.config.get('USE_MOCK_VISION', True):
-        return _mock_recognize_ingredients(image_path)
+    with metrics.timed('recognition'):
+        # Check if we should use mock data
+        if current_app.config.get('USE_MOCK_VISION', True):
+            return _mock_recognize_ingredients(_image_name(image, filename))
+        
+        # Use Google Cloud Vision API
+        return _vision_api_recognize_ingredients(image, filename)
+
+def recognize_ingredients_batch(images, filenames=None):
+    """
+    Recognize ingredients in several images, sending them to Vision together.
     
-    # Use Google Cloud Vision API
-    return _vision_api_recognize_ingredients(image_path)
+    Args:
+        images (list): Image paths, image bytes or readable binary streams
+        filenames (list, optional): Original filenames, in the same order as images
+        
+    Returns:
+        list: One list of recognized ingredient names per image, in the same order
+    """
+    filenames = filenames or [None] * len(images)
+    
+    with metrics.timed('recognition'):
+        # Check if we should use mock data
+        if current_app.config.get('USE_MOCK_VISION', True):
+            return [_mock_recognize_ingredients(_image_name(image, filename))
+                    for image, filename in zip(images, filenames)]
+        
+        # Use Google Cloud Vision API
+        return _vision_api_recognize_ingredients_batch(images, filenames)
 
-def _mock_recognize_ingredients(image_path):
+def _mock_recognize_ingredients(image_name):
     """
     Mock implementation of ingredient recognition for development.
     
     Args:
-        image_path (str): Path to the image file
+        image_name (str): Path or filename of the image
         
     Returns:
         list: List of mock ingredient names based on the image filename
     """
     # Extract filename without path and extension
-    filename = os.path.basename(image_path).lower()
+    filename = os.path.basename(image_name).lower()
     
     # Initialize results
     results = []
@@ -85,103 +126,283 @@ def _mock_recognize_ingredients(image_path):
     
     return results
 
-def _vision_api_recognize_ingredients(image_path):
+def _vision_api_recognize_ingredients(image, filename=None):
     """
     Recognize ingredients in an image using Google Cloud Vision API.
     
+    Results are looked up in and written to the recognition cache, so
+    repeated or near-identical uploads do not call the API again.
+    
     Args:
-        image_path (str): Path to the image file
+        image (str, bytes or file-like): Path to the image file, image bytes or a readable binary stream
+        filename (str, optional): Original filename, used if falling back to mock data
         
     Returns:
         list: List of recognized ingredient names
     """
     try:
-        # Get credentials from environment variable
-        credentials_base64 = os.environ.get('GOOGLE_CLOUD_CREDENTIALS_BASE64')
+        content = _read_image(image)
+        use_cache = current_app.config.get('RECOGNITION_CACHE_ENABLED', True)
         
-        if not credentials_base64:
+        # Reuse the result for identical bytes before decoding the image
+        if use_cache:
+            content_hash = recognition_cache.content_hash(content)
+            cached = recognition_cache.lookup(content_hash)
+            if cached is not None:
+                return cached
+        
+        # Downscale the image; the preprocessing worker also hashes it for near-duplicate matching
+        processed = preprocess_image(content)
+        
+        hashes = None
+        if use_cache:
+            hashes = recognition_cache.ImageHashes(content_hash, processed.perceptual_hash)
+            cached = recognition_cache.lookup_similar(hashes)
+            if cached is not None:
+                return cached
+        
+        # Reuse the per-process client built from GOOGLE_CLOUD_CREDENTIALS_BASE64
+        client = get_vision_client()
+        
+        if client is None:
             current_app.logger.warning("Google Cloud credentials not found, using mock data")
-            return _mock_recognize_ingredients(image_path)
-        
-        # Decode the base64 credentials
-        credentials_json = base64.b64decode(credentials_base64).decode('utf-8')
-        
-        # Create a temporary file to store the credentials
-        with tempfile.NamedTemporaryFile(delete=False, mode='w') as temp_file:
-            temp_file.write(credentials_json)
-            temp_file_path = temp_file.name
-        
-        try:
-            # Initialize Vision client with service account credentials
-            credentials = service_account.Credentials.from_service_account_file(temp_file_path)
-            client = vision.ImageAnnotatorClient(credentials=credentials)
-            
-            # Read image file
-            with io.open(image_path, 'rb') as image_file:
-                content = image_file.read()
-            
-            image = vision.Image(content=content)
-            
-            # Perform label detection
-            response = client.label_detection(image=image)
-            labels = response.label_annotations
-            
-            # Filter for food-related labels
-            food_labels = []
-            for label in labels:
-                if _is_food_related(label.description):
-                    food_labels.append(label.description.lower())
-            
-            # If no food items detected, use object detection as fallback
-            if not food_labels:
-                response = client.object_localization(image=image)
-                objects = response.localized_object_annotations
-                
-                for obj in objects:
-                    if _is_food_related(obj.name):
-                        food_labels.append(obj.name.lower())
-            
-            # Map detected labels to known ingredients
-            ingredients = _map_labels_to_ingredients(food_labels)
-            
-            return ingredients
-        
-        finally:
-            # Clean up the temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-                
+            return _mock_recognize_ingredients(_image_name(image, filename))
+        
+        # Request label detection and object localization in one round trip,
+        # sending the downscaled copy of the image
+        vision_image = vision.Image(content=processed.content)
+        with metrics.track_upstream('vision'):
+            response = client.annotate_image({'image': vision_image, 'features': VISION_FEATURES})
+        
+        if response.error.message:
+            raise RuntimeError(response.error.message)
+        
+        ingredients = _ingredients_from_response(response)
+        
+        if hashes is not None:
+            recognition_cache.store(hashes, ingredients)
+        
+        return ingredients
+        
     except Exception as e:
         current_app.logger.error(f"Error using Vision API: {str(e)}")
-        return _mock_recognize_ingredients(image_path)
+        return _mock_recognize_ingredients(_image_name(image, filename))
 
-def _is_food_related(label):
+def _vision_api_recognize_ingredients_batch(images, filenames):
     """
-    Check if a label is related to food.
+    Recognize ingredients in several images with batched Vision API requests.
+    
+    Images found in the recognition cache are answered from it. The rest are
+    sent in chunks of VISION_BATCH_SIZE per request. Images that fail
+    individually fall back to mock data without affecting the others.
     
     Args:
-        label (str): The label to check
+        images (list): Image paths, image bytes or readable binary streams
+        filenames (list): Original filenames, used if falling back to mock data
         
     Returns:
-        bool: True if the label is food-related, False otherwise
+        list: One list of recognized ingredient names per image, in the same order
+    """
+    names = [_image_name(image, filename) for image, filename in zip(images, filenames)]
+    
+    try:
+        results, pending = _lookup_cached_images(images)
+        pending = _preprocess_pending(pending, results)
+        
+        if not pending:
+            return results
+        
+        client = get_vision_client()
+        
+        if client is None:
+            current_app.logger.warning("Google Cloud credentials not found, using mock data")
+            for index, _, _ in pending:
+                results[index] = _mock_recognize_ingredients(names[index])
+            return results
+        
+        for start in range(0, len(pending), VISION_BATCH_SIZE):
+            chunk = pending[start:start + VISION_BATCH_SIZE]
+            annotate_requests = _annotate_requests(chunk)
+            with metrics.track_upstream('vision'):
+                batch_response = client.batch_annotate_images(requests=annotate_requests)
+            _apply_batch_response(chunk, batch_response, results, names)
+        
+        return results
+        
+    except Exception as e:
+        current_app.logger.error(f"Error using Vision API: {str(e)}")
+        return [_mock_recognize_ingredients(name) for name in names]
+
+def _lookup_cached_images(images):
     """
-    food_categories = [
-        'food', 'fruit', 'vegetable', 'meat', 'dairy', 'grain', 'spice', 
-        'herb', 'beverage', 'dish', 'meal', 'ingredient', 'produce'
+    Read images and answer the ones whose exact bytes are in the recognition cache.
+    
+    Args:
+        images (list): Image paths, image bytes or readable binary streams
+        
+    Returns:
+        tuple: Results per image (None where not cached) and (index, content, content hash) tuples still to recognize
+    """
+    use_cache = current_app.config.get('RECOGNITION_CACHE_ENABLED', True)
+    results = [None] * len(images)
+    pending = []
+    
+    for index, image in enumerate(images):
+        content = _read_image(image)
+        content_hash = None
+        
+        if use_cache:
+            content_hash = recognition_cache.content_hash(content)
+            results[index] = recognition_cache.lookup(content_hash)
+        
+        if results[index] is None:
+            pending.append((index, content, content_hash))
+    
+    return results, pending
+
+def _preprocess_pending(pending, results):
+    """
+    Downscale the images still to recognize and answer near-duplicates from the recognition cache.
+    
+    Args:
+        pending (list): (index, content, content hash) tuples from _lookup_cached_images
+        results (list): Results per image, updated in place
+        
+    Returns:
+        list: (index, preprocessed content, hashes) tuples still to recognize
+    """
+    remaining = []
+    
+    for index, content, content_hash in pending:
+        processed = preprocess_image(content)
+        hashes = None
+        
+        if content_hash is not None:
+            hashes = recognition_cache.ImageHashes(content_hash, processed.perceptual_hash)
+            results[index] = recognition_cache.lookup_similar(hashes)
+        
+        if results[index] is None:
+            remaining.append((index, processed.content, hashes))
+    
+    return remaining
+
+def _annotate_requests(chunk):
+    """
+    Build Vision requests for a chunk of preprocessed images.
+    
+    Args:
+        chunk (list): (index, content, hashes) tuples
+        
+    Returns:
+        list: One vision.AnnotateImageRequest per image
+    """
+    return [
+        vision.AnnotateImageRequest(
+            image=vision.Image(content=content),
+            features=VISION_FEATURES
+        )
+        for _, content, _ in chunk
     ]
+
+def _apply_batch_response(chunk, batch_response, results, names):
+    """
+    Store the ingredients of a batch response, caching them per image.
+    
+    Images that failed individually fall back to mock data.
+    
+    Args:
+        chunk (list): (index, content, hashes) tuples the batch was built from
+        batch_response (vision.BatchAnnotateImagesResponse): Response for the chunk
+        results (list): Results per image, updated in place
+        names (list): Image names, used if falling back to mock data
+    """
+    for (index, _, hashes), response in zip(chunk, batch_response.responses):
+        if response.error.message:
+            current_app.logger.error(f"Error using Vision API: {response.error.message}")
+            results[index] = _mock_recognize_ingredients(names[index])
+            continue
+        
+        results[index] = _ingredients_from_response(response)
+        if hashes is not None:
+            recognition_cache.store(hashes, results[index])
+
+def _read_image(image):
+    """
+    Get the bytes of an image given as a path, bytes or a binary stream.
     
-    label_lower = label.lower()
+    Args:
+        image (str, bytes or file-like): Path to the image file, image bytes or a readable binary stream
+        
+    Returns:
+        bytes: Original image bytes
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image)
     
-    # Check if label contains any food category
-    if any(category in label_lower for category in food_categories):
-        return True
+    if hasattr(image, 'read'):
+        if hasattr(image, 'seek'):
+            image.seek(0)
+        return image.read()
     
-    # Check if label is a known ingredient
-    for ingredient in MOCK_INGREDIENTS.keys():
-        if ingredient in label_lower:
-            return True
+    with io.open(image, 'rb') as image_file:
+        return image_file.read()
+
+def _image_name(image, filename=None):
+    """
+    Get a name for an image, used by the mock recognizer.
     
-    return False
+    Args:
+        image (str, bytes or file-like): Path to the image file, image bytes or a readable binary stream
+        filename (str, optional): Original filename
+        
+    Returns:
+        str: The filename, the path, or an empty string for anonymous images
+    """
+    if filename:
+        return filename
+    
+    if isinstance(image, (str, os.PathLike)):
+        return os.fspath(image)
+    
+    name = getattr(image, 'filename', None) or getattr(image, 'name', None)
+    return name if isinstance(name, str) else ''
+
+def _ingredients_from_response(response):
+    """
+    Extract ingredient names from a combined label/object Vision response.
+    
+    Args:
+        response (vision.AnnotateImageResponse): Response for a single image
+        
+    Returns:
+        list: List of recognized ingredient names
+    """
+    # Filter for food-related labels
+    food_labels = []
+    for label in response.label_annotations:
+        if _is_food_related(label.description):
+            food_labels.append(label.description.lower())
+    
+    # If no food items detected, use object detection as fallback
+    if not food_labels:
+        for obj in response.localized_object_annotations:
+            if _is_food_related(obj.name):
+                food_labels.append(obj.name.lower())
+    
+    # Map detected labels to known ingredients
+    return _map_labels_to_ingredients(food_labels)
+
+def _is_food_related(label):
+    """
+    Check if a label is related to food.
+    
+    Args:
+        label (str): The label to check
+        
+    Returns:
+        bool: True if the label is food-related, False otherwise
+    """
+    return _VOCABULARY.match(label).is_food
 
 def _map_labels_to_ingredients(labels):
     """
@@ -196,9 +417,6 @@ def _map_labels_to_ingredients(labels):
     ingredients = set()
     
     for label in labels:
-        # Check if label directly matches a known ingredient
-        for ingredient, variations in MOCK_INGREDIENTS.items():
-            if label in variations or ingredient in label:
-                ingredients.add(ingredient)
+        ingredients.update(_VOCABULARY.match(label).ingredients)
     
     return list(ingredients)
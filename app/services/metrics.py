@@ -0,0 +1,526 @@
+"""
+Request instrumentation for the FridgeToPlate application.
+
+Every request collects the time it spends in database queries, upstream API
+calls, ingredient recognition and template rendering. The breakdown is sent
+back in a Server-Timing header, so it shows up in the browser's network
+panel and in load test responses. Phases can overlap: recognition includes
+its Vision calls, and concurrent upstream calls are summed.
+
+With the query monitor enabled (see query_monitor.py), repeated statement
+shapes and slow statements are reported as issues alongside the phases.
+
+Request and upstream latencies are also aggregated into histograms and
+counters, served in the Prometheus text format at /metrics together with
+the circuit breaker states, the recipe search, fusion and recognition cache
+counters and Spoonacular request coalescing and quota. Metrics live in each
+worker process, and every sample carries a worker label, so a scrape
+through gunicorn reports the worker that answered it. Scrapes only read
+in-process counters, so they never query a shared cache or the quota file.
+
+Request timings are found through a context variable. Work handed to a
+thread pool during a request is attributed to it when submitted with
+contextvars.copy_context().run.
+"""
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import Response, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+# Buckets of the number of database statements run by a request
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Order of the Server-Timing entries; phases nobody recorded are left out
+PHASES = ('db', 'upstream', 'recognition', 'template')
+
+# Descriptions of the Server-Timing entries, given the number of timed events
+_PHASE_DESCRIPTIONS = {
+    'db': 'queries: {}',
+    'upstream': 'calls: {}',
+    'recognition': 'calls: {}',
+    'template': 'templates: {}'
+}
+
+_current = ContextVar('request_timings', default=None)
+
+class Counter:
+    """Monotonic counter with labels."""
+    
+    def __init__(self, name, documentation, labelnames):
+        """
+        Initialize the counter.
+        
+        Args:
+            name (str): Metric name
+            documentation (str): HELP text
+            labelnames (tuple): Label names, in the order values are given
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *labelvalues, amount=1):
+        """
+        Increase the counter.
+        
+        Args:
+            *labelvalues: One value per label name
+            amount (float): Amount added
+        """
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+    
+    def clear(self):
+        """Forget all values."""
+        with self._lock:
+            self._values = {}
+    
+    def render(self, extra_labels):
+        """
+        Render the counter in the Prometheus text format.
+        
+        Args:
+            extra_labels (dict): Labels added to every sample
+            
+        Returns:
+            list: Lines of text
+        """
+        with self._lock:
+            values = sorted(self._values.items())
+        
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in values:
+            labels = _format_labels(dict(zip(self.labelnames, labelvalues), **extra_labels))
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Histogram of observed values with labels and fixed buckets."""
+    
+    def __init__(self, name, documentation, labelnames, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+        
+        Args:
+            name (str): Metric name
+            documentation (str): HELP text
+            labelnames (tuple): Label names, in the order values are given
+            buckets (tuple): Sorted upper bounds of the buckets
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # Label values -> [count per bucket plus one for +Inf, sum]
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, *labelvalues):
+        """
+        Record an observation.
+        
+        Args:
+            value (float): Observed value
+            *labelvalues: One value per label name
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+    
+    def clear(self):
+        """Forget all observations."""
+        with self._lock:
+            self._values = {}
+    
+    def render(self, extra_labels):
+        """
+        Render the histogram in the Prometheus text format.
+        
+        Args:
+            extra_labels (dict): Labels added to every sample
+            
+        Returns:
+            list: Lines of text
+        """
+        with self._lock:
+            values = sorted((labelvalues, list(counts), total) for labelvalues, (counts, total) in self._values.items())
+        
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, counts, total in values:
+            labels = dict(zip(self.labelnames, labelvalues), **extra_labels)
+            
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                bucket_labels = _format_labels(dict(labels, le=_format_value(bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+REQUESTS = Counter(
+    'fridgetoplate_http_requests_total', 'HTTP requests served.', ('endpoint', 'method', 'status')
+)
+REQUEST_SECONDS = Histogram(
+    'fridgetoplate_http_request_duration_seconds', 'Time taken to serve HTTP requests.', ('endpoint', 'method')
+)
+PHASE_SECONDS = Histogram(
+    'fridgetoplate_http_request_phase_seconds',
+    'Time HTTP requests spent per phase, observed for requests that entered the phase.',
+    ('endpoint', 'phase')
+)
+QUERIES = Histogram(
+    'fridgetoplate_http_request_queries', 'Database statements run per HTTP request.', ('endpoint',),
+    buckets=QUERY_BUCKETS
+)
+QUERY_ISSUES = Counter(
+    'fridgetoplate_http_request_query_issues_total',
+    'Repeated statement shapes and slow statements found by the query monitor.',
+    ('endpoint', 'issue')
+)
+UPSTREAM_REQUESTS = Counter(
+    'fridgetoplate_upstream_requests_total',
+    'Upstream API calls by outcome; rejected calls were refused by an open circuit breaker.',
+    ('upstream', 'outcome')
+)
+UPSTREAM_SECONDS = Histogram(
+    'fridgetoplate_upstream_request_duration_seconds',
+    'Time taken by upstream API calls, including retries.',
+    ('upstream',)
+)
+
+METRICS = (REQUESTS, REQUEST_SECONDS, PHASE_SECONDS, QUERIES, QUERY_ISSUES, UPSTREAM_REQUESTS, UPSTREAM_SECONDS)
+
+class RequestTimings:
+    """Time spent per phase by one request."""
+    
+    def __init__(self):
+        """Start timing a request."""
+        self.start = time.perf_counter()
+        self.durations = {}
+        self.counts = {}
+        self.template_starts = []
+        # Statement shape -> executions, and issue -> occurrences, kept by the query monitor
+        self.statements = {}
+        self.issues = {}
+        self._lock = threading.Lock()
+    
+    def add(self, phase, seconds):
+        """
+        Add time spent in a phase.
+        
+        Args:
+            phase (str): Phase name
+            seconds (float): Time spent
+        """
+        with self._lock:
+            self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+            self.counts[phase] = self.counts.get(phase, 0) + 1
+    
+    def count_statement(self, shape):
+        """
+        Count an execution of a statement shape.
+        
+        Args:
+            shape (str): Normalized statement
+            
+        Returns:
+            int: Executions of the shape so far in this request
+        """
+        with self._lock:
+            count = self.statements[shape] = self.statements.get(shape, 0) + 1
+        return count
+    
+    def flag(self, issue):
+        """
+        Note an issue found while serving the request.
+        
+        Args:
+            issue (str): Issue name
+        """
+        with self._lock:
+            self.issues[issue] = self.issues.get(issue, 0) + 1
+    
+    def server_timing(self, total):
+        """
+        Format the timings as a Server-Timing header value.
+        
+        Args:
+            total (float): Seconds the request took
+            
+        Returns:
+            str: Header value with durations in milliseconds
+        """
+        entries = []
+        for phase in PHASES:
+            if phase in self.durations:
+                description = _PHASE_DESCRIPTIONS[phase].format(self.counts[phase])
+                entries.append(f'{phase};dur={self.durations[phase] * 1000:.1f};desc="{description}"')
+        for issue, count in sorted(self.issues.items()):
+            entries.append(f'{issue};desc="count: {count}"')
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ', '.join(entries)
+
+def current_timings():
+    """
+    Get the timings of the current request.
+    
+    Returns:
+        RequestTimings or None: The timings, or None outside an instrumented request
+    """
+    return _current.get()
+
+def record(phase, seconds):
+    """
+    Add time to a phase of the current request, if there is one.
+    
+    Args:
+        phase (str): Phase name
+        seconds (float): Time spent
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+@contextmanager
+def timed(phase):
+    """
+    Time a block as part of a phase of the current request.
+    
+    Args:
+        phase (str): Phase name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+@contextmanager
+def track_upstream(name):
+    """
+    Time a call to an upstream API, counting its outcome.
+    
+    The call is also added to the upstream phase of the current request.
+    
+    Args:
+        name (str): Upstream name
+    """
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_SECONDS.observe(elapsed, name)
+        UPSTREAM_REQUESTS.inc(name, outcome)
+        record('upstream', elapsed)
+
+def upstream_rejected(name):
+    """
+    Count an upstream call refused by an open circuit breaker.
+    
+    Args:
+        name (str): Upstream name
+    """
+    UPSTREAM_REQUESTS.inc(name, 'rejected')
+
+def render_metrics():
+    """
+    Render every metric of this worker in the Prometheus text format.
+    
+    Returns:
+        str: Exposition text
+    """
+    # Imported here because the HTTP client and recipe service report their calls to this module
+    from app.services.http_client import get_upstream_stats
+    from app.services.recipe_service import get_recipe_search_cache_stats, get_fusion_cache_stats, get_spoonacular_stats
+    from app.services.recognition_cache import get_recognition_cache_stats
+    
+    worker = {'worker': str(os.getpid())}
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render(worker))
+    
+    lines.extend(_render_samples(
+        'fridgetoplate_upstream_circuit_open', 'Whether the upstream circuit breaker refuses calls.', 'gauge',
+        [({'upstream': name}, int(stats['state'] != 'closed')) for name, stats in sorted(get_upstream_stats().items())],
+        worker
+    ))
+    
+    caches = [
+        ('recipe_search', get_recipe_search_cache_stats()),
+        ('fusion', get_fusion_cache_stats()),
+        ('recognition', get_recognition_cache_stats())
+    ]
+    lines.extend(_render_samples(
+        'fridgetoplate_cache_hits_total', 'Lookups answered by a cache in this worker.', 'counter',
+        [({'cache': name}, stats['hits']) for name, stats in caches], worker
+    ))
+    lines.extend(_render_samples(
+        'fridgetoplate_cache_misses_total', 'Lookups a cache could not answer in this worker.', 'counter',
+        [({'cache': name}, stats['misses']) for name, stats in caches], worker
+    ))
+    lines.extend(_render_samples(
+        'fridgetoplate_cache_entries', 'Entries held by an in-process cache of this worker.', 'gauge',
+        [({'cache': name}, stats['size']) for name, stats in caches if stats.get('size') is not None], worker
+    ))
+    
+    spoonacular = get_spoonacular_stats()
+    lines.extend(_render_samples(
+        'fridgetoplate_spoonacular_calls_total', 'Spoonacular calls made, or coalesced into an identical call in flight.', 'counter',
+        [({'outcome': 'executed'}, spoonacular['executions']), ({'outcome': 'coalesced'}, spoonacular['coalesced'])],
+        worker
+    ))
+    lines.extend(_render_samples(
+        'fridgetoplate_spoonacular_in_flight', 'Distinct Spoonacular calls in flight.', 'gauge',
+        [({}, spoonacular['in_flight'])], worker
+    ))
+    if spoonacular['quota_left'] is not None:
+        lines.extend(_render_samples(
+            'fridgetoplate_spoonacular_quota_points',
+            "Spoonacular quota points left, shared by all workers, as of this worker's last call.", 'gauge',
+            [({}, spoonacular['quota_left'])], worker
+        ))
+    
+    return '\n'.join(lines) + '\n'
+
+def init_app(app):
+    """
+    Instrument an application and add its /metrics endpoint.
+    
+    Args:
+        app (Flask): Application to instrument
+    """
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    
+    server_timing = app.config.get('SERVER_TIMING_ENABLED', True)
+    
+    @app.before_request
+    def start_request_timing():
+        request.environ['fridgetoplate.timings_token'] = _current.set(RequestTimings())
+    
+    @app.after_request
+    def finish_request_timing(response):
+        timings = _current.get()
+        if timings is None:
+            return response
+        
+        total = time.perf_counter() - timings.start
+        endpoint = request.endpoint or 'none'
+        
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        REQUEST_SECONDS.observe(total, endpoint, request.method)
+        for phase, seconds in timings.durations.items():
+            PHASE_SECONDS.observe(seconds, endpoint, phase)
+        QUERIES.observe(timings.counts.get('db', 0), endpoint)
+        for issue, count in timings.issues.items():
+            QUERY_ISSUES.inc(endpoint, issue, amount=count)
+        
+        if server_timing:
+            response.headers['Server-Timing'] = timings.server_timing(total)
+        return response
+    
+    @app.teardown_request
+    def clear_request_timing(exc):
+        # Pool threads serve many requests, so timings must not outlive theirs
+        token = request.environ.pop('fridgetoplate.timings_token', None)
+        if token is not None:
+            _current.reset(token)
+    
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    
+    with app.app_context():
+        from app import db
+        event.listen(db.engine, 'before_cursor_execute', _query_started)
+        event.listen(db.engine, 'after_cursor_execute', _query_finished)
+    
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+def metrics_view():
+    """Serve this worker's metrics to Prometheus."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def _template_started(sender, template, context, **extra):
+    """Note when rendering of a template starts."""
+    timings = _current.get()
+    if timings is not None:
+        timings.template_starts.append(time.perf_counter())
+
+def _template_finished(sender, template, context, **extra):
+    """Add the time a template took to render."""
+    timings = _current.get()
+    if timings is not None and timings.template_starts:
+        timings.add('template', time.perf_counter() - timings.template_starts.pop())
+
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    """Note when a query starts."""
+    context._fridgetoplate_query_start = time.perf_counter()
+
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    """Add the time a query took."""
+    start = getattr(context, '_fridgetoplate_query_start', None)
+    if start is not None:
+        record('db', time.perf_counter() - start)
+
+def _render_samples(name, documentation, kind, samples, extra_labels):
+    """
+    Render samples read from another module in the Prometheus text format.
+    
+    Args:
+        name (str): Metric name
+        documentation (str): HELP text
+        kind (str): Metric type
+        samples (list): (labels, value) tuples
+        extra_labels (dict): Labels added to every sample
+        
+    Returns:
+        list: Lines of text
+    """
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(dict(labels, **extra_labels))} {_format_value(value)}")
+    return lines
+
+def _format_labels(labels):
+    """Format labels as {name="value",...} with Prometheus escaping."""
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+def _format_value(value):
+    """Format a sample value or bucket bound."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _reset_metrics():
+    """Forget metrics inherited from a parent process."""
+    for metric in METRICS:
+        metric.clear()
+        metric._lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_metrics)
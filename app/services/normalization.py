@@ -0,0 +1,107 @@
+"""
+Ingredient name normalization for the FridgeToPlate application.
+
+Ingredient names arrive as Vision labels, manual entries and upstream
+recipe data, in any capitalization and in singular or plural form. This
+module maps them to one canonical key so that the pantry, recipe lookups
+and caches all agree on what counts as the same ingredient.
+
+Only spelling variants and true synonyms are merged. Distinct ingredients
+of one kind, such as salmon and tuna or cheddar and mozzarella, keep their
+own names.
+"""
+import re
+from functools import lru_cache
+
+# Different names for the same ingredient, by singular form
+SYNONYMS = {
+    'scallion': 'green onion',
+    'spring onion': 'green onion',
+    'garbanzo bean': 'chickpea',
+    'aubergine': 'eggplant',
+    'courgette': 'zucchini',
+    'capsicum': 'bell pepper',
+    'sweet pepper': 'bell pepper',
+    'coriander leaf': 'cilantro',
+    'rocket': 'arugula',
+    'minced beef': 'ground beef',
+}
+
+# Plurals that do not follow the suffix rules
+IRREGULAR_PLURALS = {
+    'leaves': 'leaf',
+    'loaves': 'loaf',
+    'halves': 'half',
+    'cookies': 'cookie',
+    'brownies': 'brownie',
+    'smoothies': 'smoothie',
+    'anchovies': 'anchovy',
+}
+
+# Words ending in "s" that are already singular
+UNINFLECTED = {'asparagus', 'brussels', 'couscous', 'hummus', 'molasses', 'swiss', 'citrus', 'octopus', 'quinoa'}
+
+_WHITESPACE = re.compile(r'\s+')
+_EDGE_PUNCTUATION = re.compile(r"^[^\w]+|[^\w]+$")
+
+@lru_cache(maxsize=4096)
+def normalize_ingredient(name):
+    """
+    Get the canonical form of an ingredient name.
+    
+    The name is lower-cased, trimmed and whitespace-collapsed, each word is
+    singularized, and known synonyms are mapped to their canonical name.
+    
+    Args:
+        name (str): Ingredient name as entered or recognized
+        
+    Returns:
+        str: Canonical ingredient name, or an empty string for blank input
+    """
+    name = _EDGE_PUNCTUATION.sub('', _WHITESPACE.sub(' ', name.lower()).strip())
+    if not name:
+        return ''
+    
+    name = ' '.join(singularize(word) for word in name.split(' '))
+    return SYNONYMS.get(name, name)
+
+def normalize_ingredients(names):
+    """
+    Normalize a list of ingredient names, dropping blanks and duplicates.
+    
+    Args:
+        names (iterable): Ingredient names
+        
+    Returns:
+        list: Canonical names in first-seen order
+    """
+    return list(dict.fromkeys(
+        normalized for normalized in (normalize_ingredient(name) for name in names if name) if normalized
+    ))
+
+def singularize(word):
+    """
+    Convert a plural English food word to its singular form.
+    
+    Args:
+        word (str): Lower-case word
+        
+    Returns:
+        str: Singular form of the word
+    """
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    
+    if word in UNINFLECTED or len(word) <= 3 or word.endswith(('ss', 'us', 'is')):
+        return word
+    
+    if word.endswith('ies') and len(word) > 4:
+        return word[:-3] + 'y'
+    
+    if word.endswith(('oes', 'ches', 'shes', 'xes', 'zes', 'sses')):
+        return word[:-2]
+    
+    if word.endswith('s'):
+        return word[:-1]
+    
+    return word
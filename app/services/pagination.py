@@ -0,0 +1,145 @@
+"""
+Cursor pagination helpers for the FridgeToPlate JSON endpoints.
+
+Pages are addressed by opaque cursors rather than offsets: a cursor holds
+the sort key of the last item of a page, so the next page starts right
+after it even if items were added or removed in between. Page sizes are
+bounded, and responses carry only the fields the client asked for.
+"""
+import json
+import base64
+import binascii
+
+class PaginationError(ValueError):
+    """Raised for a malformed cursor or an unknown field; the message is safe to return to clients."""
+
+def encode_cursor(values):
+    """
+    Encode a sort key as an opaque cursor.
+    
+    Args:
+        values (dict): JSON-serializable sort key of the last item of a page
+        
+    Returns:
+        str: URL-safe cursor
+    """
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, keys):
+    """
+    Decode a cursor made by encode_cursor.
+    
+    Args:
+        cursor (str): Cursor from a previous page
+        keys (tuple): Keys the cursor must contain
+        
+    Returns:
+        dict: The sort key
+        
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (binascii.Error, ValueError):
+        raise PaginationError('Invalid cursor')
+    
+    if not isinstance(values, dict) or any(key not in values for key in keys):
+        raise PaginationError('Invalid cursor')
+    
+    return values
+
+def page_size(requested, default, maximum):
+    """
+    Bound a requested page size.
+    
+    Args:
+        requested (int or None): Size asked for by the client
+        default (int): Size used if none was asked for
+        maximum (int): Largest size served
+        
+    Returns:
+        int: Page size between 1 and maximum
+    """
+    if requested is None:
+        requested = default
+    return max(1, min(requested, maximum))
+
+def parse_fields(value, allowed, default):
+    """
+    Parse a comma-separated fields parameter.
+    
+    Args:
+        value (str or None): Fields asked for by the client
+        allowed (tuple): Fields that may be asked for
+        default (tuple): Fields returned if none were asked for
+        
+    Returns:
+        tuple: Requested fields, in the order given
+        
+    Raises:
+        PaginationError: If a field is not allowed
+    """
+    if not value:
+        return tuple(default)
+    
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    
+    return fields or tuple(default)
+
+def page_ranked(items, cursor, limit):
+    """
+    Get a page of a ranked list of items with an 'id' key.
+    
+    The cursor holds the position and ID of the last item served. If the
+    ranking changed since, the next page continues after that item's new
+    position, or after the old position if the item is gone.
+    
+    Args:
+        items (list): Ranked items
+        cursor (str or None): Cursor from the previous page, or None for the first page
+        limit (int): Page size
+        
+    Returns:
+        tuple: (items on the page, cursor of the next page or None on the last page)
+        
+    Raises:
+        PaginationError: If the cursor is malformed
+    """
+    start = 0
+    if cursor:
+        after = decode_cursor(cursor, ('position', 'id'))
+        position = after['position']
+        if not isinstance(position, int) or position < 0:
+            raise PaginationError('Invalid cursor')
+        
+        if position < len(items) and items[position].get('id') == after['id']:
+            start = position + 1
+        else:
+            ids = [item.get('id') for item in items]
+            start = ids.index(after['id']) + 1 if after['id'] in ids else position + 1
+    
+    page = items[start:start + limit]
+    if start + limit >= len(items):
+        return page, None
+    
+    last = start + limit - 1
+    return page, encode_cursor({'position': last, 'id': items[last].get('id')})
+
+def select_fields(item, fields):
+    """
+    Keep only the requested fields of an item.
+    
+    Args:
+        item (dict): Item to trim
+        fields (tuple): Fields to keep
+        
+    Returns:
+        dict: Item with just those fields, missing ones set to None
+    """
+    return {field: item.get(field) for field in fields}
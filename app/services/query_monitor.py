@@ -0,0 +1,167 @@
+"""
+Database query monitor for the FridgeToPlate application.
+
+An optional layer of SQLAlchemy event hooks, enabled with
+QUERY_MONITOR_ENABLED, that catches database regressions during
+development:
+
+- statements that run more than QUERY_REPEAT_THRESHOLD times with the same
+  shape in one request, the usual sign of an N+1 query, are logged once per
+  request;
+- statements taking at least SLOW_QUERY_THRESHOLD_MS milliseconds are
+  logged with the shape of their bound parameters, never their values.
+
+Findings are added to the request timings kept by metrics.py, so they show
+up in the Server-Timing header and in /metrics next to the statement count.
+Detecting repeated statements needs those timings, so it only works with
+METRICS_ENABLED; slow statements are logged either way.
+"""
+import re
+import time
+import logging
+from functools import lru_cache
+from flask import request, has_request_context
+from sqlalchemy import event
+from app.services import metrics
+
+# Child of the application logger; statements also run in pool threads
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+# A parenthesized list of two or more placeholders in any DBAPI paramstyle
+_PLACEHOLDER_LIST = re.compile(
+    r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))+\s*\)'
+)
+_REPEATED_LISTS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+
+class QueryMonitor:
+    """Counts statement shapes per request and logs repeated and slow statements."""
+    
+    def __init__(self, repeat_threshold=10, slow_threshold=0.1):
+        """
+        Initialize the monitor.
+        
+        Args:
+            repeat_threshold (int): Executions of one shape allowed per request before warning
+            slow_threshold (float): Seconds from which a statement is logged as slow
+        """
+        self.repeat_threshold = repeat_threshold
+        self.slow_threshold = slow_threshold
+    
+    def attach(self, engine):
+        """
+        Listen to the statements run by an engine.
+        
+        Args:
+            engine (sqlalchemy.engine.Engine): Engine to monitor
+        """
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+    
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Note when a statement starts."""
+        context._query_monitor_start = time.perf_counter()
+    
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Count the statement and log it if repeated too often or slow."""
+        start = getattr(context, '_query_monitor_start', None)
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        shape = statement_shape(statement)
+        timings = metrics.current_timings()
+        
+        if timings is not None:
+            count = timings.count_statement(shape)
+            if count == self.repeat_threshold + 1:
+                timings.flag('repeated_statement')
+                logger.warning(
+                    f"Statement ran more than {self.repeat_threshold} times in {_endpoint()}, "
+                    f"possible N+1 query: {shape}"
+                )
+        
+        if elapsed >= self.slow_threshold:
+            if timings is not None:
+                timings.flag('slow_query')
+            logger.warning(
+                f"Slow statement in {_endpoint()} took {elapsed * 1000:.1f}ms: {shape} "
+                f"parameters {parameter_shape(parameters, executemany)}"
+            )
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement):
+    """
+    Reduce a statement to its shape.
+    
+    Literals become placeholders and lists of placeholders, such as IN
+    lists and multi-row VALUES, collapse to one marker, so statements that
+    only differ in their values or list lengths have the same shape.
+    
+    Args:
+        statement (str): SQL statement as sent to the database
+        
+    Returns:
+        str: Normalized statement
+    """
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(...)', shape)
+    return _REPEATED_LISTS.sub('(...)', shape)
+
+def parameter_shape(parameters, executemany=False):
+    """
+    Describe bound parameters by their types, without their values.
+    
+    Runs of parameters of the same type are counted, e.g. (str x 40, int).
+    
+    Args:
+        parameters: Parameters as passed to the DBAPI cursor
+        executemany (bool): Whether parameters holds one set per execution
+        
+    Returns:
+        str: Parameter shape
+    """
+    if executemany:
+        parameters = list(parameters)
+        if not parameters:
+            return '[]'
+        return f"[{len(parameters)} x {parameter_shape(parameters[0])}]"
+    
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{name}: {type(value).__name__}" for name, value in parameters.items()) + '}'
+    
+    runs = []
+    for value in parameters or ():
+        type_name = type(value).__name__
+        if runs and runs[-1][0] == type_name:
+            runs[-1][1] += 1
+        else:
+            runs.append([type_name, 1])
+    
+    return '(' + ', '.join(name if count == 1 else f"{name} x {count}" for name, count in runs) + ')'
+
+def init_app(app):
+    """
+    Monitor the application's database statements if QUERY_MONITOR_ENABLED is set.
+    
+    Args:
+        app (Flask): Application to monitor
+    """
+    if not app.config.get('QUERY_MONITOR_ENABLED', False):
+        return
+    
+    monitor = QueryMonitor(
+        repeat_threshold=app.config.get('QUERY_REPEAT_THRESHOLD', 10),
+        slow_threshold=app.config.get('SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+    )
+    
+    with app.app_context():
+        from app import db
+        monitor.attach(db.engine)
+
+def _endpoint():
+    """Name the endpoint being served, for log messages."""
+    if has_request_context():
+        return request.endpoint or request.path
+    return 'background work'
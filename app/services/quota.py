@@ -0,0 +1,160 @@
+"""
+Upstream API quota limiter for the FridgeToPlate application.
+
+Spoonacular bills requests in points against a daily quota. This module
+keeps a token bucket per upstream in a small local SQLite file, so every
+worker process on the host draws from the same budget. Each take runs in
+an immediate transaction, which SQLite serializes across processes.
+"""
+import os
+import time
+import sqlite3
+from app.services.http_client import UpstreamUnavailable
+
+class QuotaExceeded(UpstreamUnavailable):
+    """Raised instead of calling an upstream whose quota is used up."""
+
+class QuotaLimiter:
+    """Token-bucket limiter shared by all processes through a SQLite file."""
+    
+    def __init__(self, path, capacity, refill_per_second):
+        """
+        Initialize the limiter.
+        
+        Args:
+            path (str): SQLite database file holding the buckets
+            capacity (float): Maximum tokens a bucket holds
+            refill_per_second (float): Tokens added back per second
+        """
+        self.path = path
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        # Bucket name -> tokens seen by this process at its last read or take
+        self._seen = {}
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        connection = self._connect()
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS quota_buckets ('
+                'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+        finally:
+            connection.close()
+    
+    def try_acquire(self, name, cost=1.0):
+        """
+        Take tokens from a bucket if enough are available.
+        
+        Args:
+            name (str): Bucket name
+            cost (float): Tokens to take
+            
+        Returns:
+            bool: True if the tokens were taken
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            tokens = self._refilled(connection, name)
+            acquired = tokens >= cost
+            if acquired:
+                tokens -= cost
+            self._save(connection, name, tokens)
+            connection.execute('COMMIT')
+            self._seen[name] = tokens
+            return acquired
+        except Exception:
+            # BEGIN itself may have failed, e.g. on a lock timeout; only undo a transaction that started
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+    
+    def sync(self, name, remaining):
+        """
+        Lower a bucket to the quota the upstream reports as remaining.
+        
+        The bucket is never raised, since other workers may have spent
+        tokens the upstream has not counted yet.
+        
+        Args:
+            name (str): Bucket name
+            remaining (float): Quota left according to the upstream
+        """
+        connection = self._connect()
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            tokens = self._refilled(connection, name)
+            tokens = max(min(tokens, remaining), 0.0)
+            self._save(connection, name, tokens)
+            connection.execute('COMMIT')
+            self._seen[name] = tokens
+        except Exception:
+            # BEGIN itself may have failed, e.g. on a lock timeout; only undo a transaction that started
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+    
+    def available(self, name):
+        """
+        Get the tokens currently in a bucket.
+        
+        Args:
+            name (str): Bucket name
+            
+        Returns:
+            float: Available tokens
+        """
+        connection = self._connect()
+        try:
+            tokens = self._seen[name] = self._refilled(connection, name)
+            return tokens
+        finally:
+            connection.close()
+    
+    def last_seen(self, name):
+        """
+        Get the tokens this process last saw in a bucket, without reading the file.
+        
+        Other processes may have taken tokens since, and refills are not added.
+        
+        Args:
+            name (str): Bucket name
+            
+        Returns:
+            float or None: Tokens after this process's last take, sync or read, or None before any
+        """
+        return self._seen.get(name)
+    
+    def _connect(self):
+        """Open a connection; each call uses its own, so processes and threads never share one."""
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+    
+    def _refilled(self, connection, name):
+        """Read a bucket and add the tokens earned since it was last updated."""
+        row = connection.execute(
+            'SELECT tokens, updated_at FROM quota_buckets WHERE name = ?', (name,)
+        ).fetchone()
+        
+        if row is None:
+            return float(self.capacity)
+        
+        tokens, updated_at = row
+        elapsed = max(time.time() - updated_at, 0.0)
+        return min(self.capacity, tokens + elapsed * self.refill_per_second)
+    
+    def _save(self, connection, name, tokens):
+        """Store a bucket's tokens as of now."""
+        connection.execute(
+            'INSERT INTO quota_buckets (name, tokens, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at',
+            (name, tokens, time.time())
+        )
@@ -0,0 +1,104 @@
+"""
+Inverted-index recipe matcher for the FridgeToPlate application.
+
+This module indexes a local recipe catalog by ingredient so that a pantry
+query only touches recipes sharing at least one ingredient with it.
+"""
+import heapq
+from collections import defaultdict
+
+class RecipeIndex:
+    """Index from ingredient name to the recipes that use it."""
+    
+    def __init__(self, recipes=(), normalize=str.lower):
+        """
+        Build the index.
+        
+        Args:
+            recipes (iterable): Recipe dictionaries with 'id' and 'ingredients' keys
+            normalize (callable): Maps an ingredient name to its index key, for catalog and queries alike
+        """
+        self._normalize = normalize
+        self._recipes = []
+        self._sizes = []
+        self._by_id = {}
+        self._postings = defaultdict(list)
+        
+        for recipe in recipes:
+            self.add(recipe)
+    
+    def __len__(self):
+        """Number of indexed recipes."""
+        return len(self._recipes)
+    
+    def add(self, recipe):
+        """
+        Add a recipe to the index.
+        
+        Args:
+            recipe (dict): Recipe dictionary with 'id' and 'ingredients' keys
+        """
+        position = len(self._recipes)
+        ingredients = {self._normalize(ingredient) for ingredient in recipe.get('ingredients', []) if ingredient}
+        
+        self._recipes.append(recipe)
+        self._sizes.append(len(ingredients))
+        self._by_id[recipe['id']] = recipe
+        
+        for ingredient in ingredients:
+            self._postings[ingredient].append(position)
+    
+    def get(self, recipe_id):
+        """
+        Look up a recipe by ID.
+        
+        Args:
+            recipe_id (int): Recipe ID
+            
+        Returns:
+            dict or None: The indexed recipe dictionary
+        """
+        return self._by_id.get(recipe_id)
+    
+    def search(self, ingredients, limit=None):
+        """
+        Rank recipes by the share of their ingredients found in the pantry.
+        
+        Only recipes sharing at least one ingredient with the query are scored.
+        Ties keep catalog order. The indexed dictionaries are returned as-is,
+        so callers must not modify them.
+        
+        Args:
+            ingredients (iterable): Available ingredient names
+            limit (int, optional): Return only the top ``limit`` recipes
+            
+        Returns:
+            list: Matching recipe dictionaries, best match first
+        """
+        return [recipe for recipe, _ in self.search_scored(ingredients, limit)]
+    
+    def search_scored(self, ingredients, limit=None):
+        """
+        Rank recipes like ``search`` and include their match scores.
+        
+        Args:
+            ingredients (iterable): Available ingredient names
+            limit (int, optional): Return only the top ``limit`` recipes
+            
+        Returns:
+            list: (recipe dictionary, match score) tuples, best match first
+        """
+        counts = defaultdict(int)
+        for ingredient in {self._normalize(ingredient) for ingredient in ingredients if ingredient}:
+            for position in self._postings.get(ingredient, ()):
+                counts[position] += 1
+        
+        sizes = self._sizes
+        scored = ((count / sizes[position], -position) for position, count in counts.items())
+        
+        if limit is None:
+            ranked = sorted(scored, reverse=True)
+        else:
+            ranked = heapq.nlargest(limit, scored)
+        
+        return [(self._recipes[-negative_position], score) for score, negative_position in ranked]
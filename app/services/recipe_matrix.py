@@ -0,0 +1,129 @@
+"""
+Vectorized recipe scoring for the FridgeToPlate application.
+
+This module stores a recipe catalog as a sparse recipe x ingredient matrix
+so that one or many pantries can be scored with a single sparse matrix
+product instead of looping over recipes in Python.
+"""
+import numpy as np
+from scipy import sparse
+
+class RecipeMatrix:
+    """Sparse binary recipe x ingredient matrix with batch top-k scoring."""
+    
+    def __init__(self, recipes, normalize=str.lower):
+        """
+        Build the matrix.
+        
+        Args:
+            recipes (iterable): Recipe dictionaries with 'id' and 'ingredients' keys
+            normalize (callable): Maps an ingredient name to its vocabulary key, for catalog and pantries alike
+        """
+        self._normalize = normalize
+        self.vocabulary = {}
+        recipe_ids = []
+        indptr = [0]
+        indices = []
+        
+        for recipe in recipes:
+            columns = {
+                self.vocabulary.setdefault(self._normalize(ingredient), len(self.vocabulary))
+                for ingredient in recipe.get('ingredients', []) if ingredient
+            }
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+            recipe_ids.append(recipe['id'])
+        
+        self.recipe_ids = np.asarray(recipe_ids)
+        data = np.ones(len(indices), dtype=np.float32)
+        matrix = sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(recipe_ids), len(self.vocabulary))
+        )
+        
+        # Transposed once so that pantries @ matrix gives pantry x recipe match counts
+        self._matrix = matrix.T.tocsr()
+        
+        sizes = np.diff(matrix.indptr).astype(np.float32)
+        self._inverse_sizes = np.divide(1.0, sizes, out=np.zeros_like(sizes), where=sizes > 0)
+    
+    def __len__(self):
+        """Number of recipes in the matrix."""
+        return len(self.recipe_ids)
+    
+    def pantry_matrix(self, pantries):
+        """
+        Encode pantries as a sparse pantry x ingredient matrix.
+        
+        Ingredients missing from the catalog vocabulary are ignored.
+        
+        Args:
+            pantries (list): List of ingredient name lists
+            
+        Returns:
+            scipy.sparse.csr_matrix: Binary pantry x ingredient matrix
+        """
+        indptr = [0]
+        indices = []
+        
+        for pantry in pantries:
+            columns = {
+                self.vocabulary[name]
+                for name in (self._normalize(ingredient) for ingredient in pantry if ingredient)
+                if name in self.vocabulary
+            }
+            indices.extend(sorted(columns))
+            indptr.append(len(indices))
+        
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(pantries), len(self.vocabulary))
+        )
+    
+    def score(self, pantries):
+        """
+        Score every pantry against every recipe.
+        
+        The score is the share of a recipe's ingredients found in the pantry.
+        
+        Args:
+            pantries (list): List of ingredient name lists
+            
+        Returns:
+            scipy.sparse.csr_matrix: Pantry x recipe score matrix, zero where nothing matches
+        """
+        counts = self.pantry_matrix(pantries) @ self._matrix
+        return sparse.csr_matrix(counts.multiply(self._inverse_sizes[np.newaxis, :]))
+    
+    def top_k(self, pantries, k=10):
+        """
+        Get the best matching recipes for each pantry.
+        
+        Ties are broken by catalog order.
+        
+        Args:
+            pantries (list): List of ingredient name lists
+            k (int): Number of recipes to return per pantry
+            
+        Returns:
+            list: One (recipe IDs, scores) pair of NumPy arrays per pantry, best match first
+        """
+        scores = self.score(pantries)
+        results = []
+        
+        for row in range(scores.shape[0]):
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            positions = scores.indices[start:end]
+            values = scores.data[start:end]
+            
+            if len(values) > k:
+                # Keep every candidate tied with the k-th best score before ordering
+                threshold = np.partition(values, len(values) - k)[len(values) - k]
+                keep = values >= threshold
+                positions, values = positions[keep], values[keep]
+            
+            order = np.lexsort((positions, -values))[:k]
+            results.append((self.recipe_ids[positions[order]], values[order]))
+        
+        return results
@@ -4,10 +4,49 @@ Recipe service for the FridgeToPlate application.
 This module provides functionality to get recipe suggestions based on ingredients
 and generate fusion recipes combining different cuisines.
 """
-import requests
+import os
+import time
 import random
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
 from flask import current_app
 import json
+from app import db
+from app.models.recipe import Recipe
+from app.services.shared_cache import get_cache
+from app.services.recipe_index import RecipeIndex
+from app.services.fusion_engine import FusionEngine, fusion_seed, split_steps
+from app.services.http_client import get_client, UpstreamUnavailable
+from app.services.single_flight import SingleFlight
+from app.services.quota import QuotaLimiter, QuotaExceeded
+from app.services.normalization import normalize_ingredient, normalize_ingredients
+
+SPOONACULAR_BASE_URL = "https://api.spoonacular.com"
+
+# Recipe fields the JSON API may return, and the ones a recipe card shows
+RECIPE_FIELDS = (
+    'id', 'title', 'image_url', 'source_url', 'servings', 'ready_in_minutes',
+    'instructions', 'summary', 'cuisines', 'ingredients'
+)
+RECIPE_CARD_FIELDS = ('id', 'title', 'image_url', 'summary', 'servings', 'ready_in_minutes')
+
+# Per-process cache of ingredient-set searches, created on first use from config
+_search_cache = None
+
+# Per-process fusion engine, created on first use from config
+_fusion_engine = None
+
+# Coalesces identical concurrent Spoonacular calls within this worker
+_spoonacular_flight = SingleFlight()
+
+# Spoonacular quota limiter shared by all workers, created on first use from config
+_quota_limiter = None
+
+# Per-process thread pool for concurrent fusion searches
+_fusion_executor = None
+_fusion_pid = None
+_fusion_lock = threading.Lock()
 
 # Mock data for development without API keys
 MOCK_RECIPES = [
@@ -117,10 +156,23 @@ CUISINE_DATA = {
     }
 }
 
+# Ingredient index over the mock catalog
+_MOCK_RECIPE_INDEX = RecipeIndex(MOCK_RECIPES, normalize=normalize_ingredient)
+
+# Sparse scoring matrix over the mock catalog, built on first batch request
+_mock_recipe_matrix = None
+
 def get_recipes_by_ingredients(ingredients, recipe_id=None):
     """
     Get recipe suggestions based on available ingredients.
     
+    Ingredient names are normalized to their canonical form first, so that
+    plurals and synonyms share one search. Searches are memoized in the
+    recipe search cache, keyed by the canonical ingredient set and the
+    backend in use; with a shared CACHE_BACKEND all workers share entries.
+    Local recipes served because Spoonacular failed are not cached, so the
+    next search tries Spoonacular again.
+    
     Args:
         ingredients (list): List of ingredient names
         recipe_id (int, optional): Specific recipe ID to retrieve
@@ -128,12 +180,115 @@ def get_recipes_by_ingredients(ingredients, recipe_id=None):
     Returns:
         list or dict: List of recipe dictionaries or a single recipe dictionary if recipe_id is provided
     """
-    # Check if we should use mock data
-    if current_app.config.get('USE_MOCK_RECIPES', True):
-        return _mock_get_recipes(ingredients, recipe_id)
+    use_mock = current_app.config.get('USE_MOCK_RECIPES', True)
+    
+    if recipe_id:
+        if use_mock:
+            return _mock_get_recipes(ingredients, recipe_id)
+        recipe, _ = _spoonacular_get_recipes(ingredients, recipe_id)
+        return recipe
+    
+    cache = _get_search_cache()
+    cache_key = _search_cache_key(ingredients, use_mock)
+    ingredients = list(cache_key[1])
     
-    # Use Spoonacular API
-    return _spoonacular_get_recipes(ingredients, recipe_id)
+    recipes = cache.get(cache_key)
+    if recipes is None:
+        # Check if we should use mock data, otherwise use Spoonacular API
+        if use_mock:
+            recipes, cacheable = _mock_get_recipes(ingredients), True
+        else:
+            recipes, cacheable = _spoonacular_get_recipes(ingredients)
+        
+        if cacheable:
+            cache.set(cache_key, recipes)
+    
+    return list(recipes)
+
+def get_recipe_search_cache_stats():
+    """
+    Get hit and miss counters for the recipe search cache.
+    
+    Returns:
+        dict: Cache statistics for the current worker process
+    """
+    return _get_search_cache().stats()
+
+def invalidate_recipe_search_cache(ingredients=None, backend=None):
+    """
+    Invalidate cached recipe searches.
+    
+    Args:
+        ingredients (list, optional): Ingredient set to invalidate. Clears the whole cache if omitted.
+        backend (str, optional): 'mock' or 'spoonacular', the backend of the entry to invalidate.
+            Defaults to the configured backend.
+    """
+    cache = _get_search_cache()
+    
+    if ingredients is None:
+        cache.invalidate()
+        return
+    
+    if backend is None:
+        backend = 'mock' if current_app.config.get('USE_MOCK_RECIPES', True) else 'spoonacular'
+    cache.invalidate(_search_cache_key(ingredients, backend == 'mock'))
+
+def _search_cache_key(ingredients, use_mock):
+    """
+    Build the search cache key for an ingredient list.
+    
+    Args:
+        ingredients (list): List of ingredient names
+        use_mock (bool): Whether the mock backend is in use
+        
+    Returns:
+        tuple: Backend name and the sorted canonical ingredient names
+    """
+    return ('mock' if use_mock else 'spoonacular', tuple(sorted(normalize_ingredients(ingredients))))
+
+def _get_search_cache():
+    """
+    Get the recipe search cache, creating it from the app config on first use.
+    
+    Returns:
+        LRUCache or SharedCache: The recipe search cache
+    """
+    global _search_cache
+    
+    if _search_cache is None:
+        _search_cache = get_cache(
+            'recipe_search',
+            maxsize=current_app.config.get('RECIPE_SEARCH_CACHE_SIZE', 256),
+            ttl=current_app.config.get('RECIPE_SEARCH_CACHE_TTL', 300)
+        )
+    
+    return _search_cache
+
+def score_pantries(pantries, limit=10):
+    """
+    Score many pantries against the local recipe catalog at once.
+    
+    Intended for batch jobs such as nightly recommendations. Scoring uses a
+    sparse recipe x ingredient matrix, so all pantries are scored with one
+    matrix product.
+    
+    Args:
+        pantries (list): List of ingredient name lists
+        limit (int): Number of recipes to return per pantry
+        
+    Returns:
+        list: One list of (recipe ID, match score) tuples per pantry, best match first
+    """
+    global _mock_recipe_matrix
+    
+    if _mock_recipe_matrix is None:
+        from app.services.recipe_matrix import RecipeMatrix
+        _mock_recipe_matrix = RecipeMatrix(MOCK_RECIPES, normalize=normalize_ingredient)
+    
+    return [
+        list(zip(recipe_ids.tolist(), scores.tolist()))
+        for recipe_ids, scores in _mock_recipe_matrix.top_k(pantries, limit)
+    ]
 
 def generate_fusion_recipe(ingredients, cuisines):
     """
@@ -146,6 +301,8 @@ def generate_fusion_recipe(ingredients, cuisines):
     Returns:
         dict: Generated fusion recipe
     """
+    ingredients = normalize_ingredients(ingredients)
+    
     # Check if we should use mock data
     if current_app.config.get('USE_MOCK_RECIPES', True):
         return _mock_generate_fusion(ingredients, cuisines)
@@ -166,198 +323,264 @@ def _mock_get_recipes(ingredients, recipe_id=None):
     """
     # If recipe_id is provided, return that specific recipe
     if recipe_id:
-        for recipe in MOCK_RECIPES:
-            if recipe['id'] == recipe_id:
-                return recipe
-        return None
-    
-    # Filter recipes based on ingredients
-    matching_recipes = []
-    
-    for recipe in MOCK_RECIPES:
-        # Count how many ingredients match
-        matching_count = sum(1 for ing in recipe['ingredients'] if ing in ingredients)
-        
-        # If at least one ingredient matches, include the recipe
-        if matching_count > 0:
-            # Add a match score to sort by later
-            recipe_copy = recipe.copy()
-            recipe_copy['match_score'] = matching_count / len(recipe['ingredients'])
-            matching_recipes.append(recipe_copy)
-    
-    # Sort by match score (highest first)
-    matching_recipes.sort(key=lambda x: x['match_score'], reverse=True)
+        return _MOCK_RECIPE_INDEX.get(recipe_id)
     
-    # Remove the match_score before returning
-    for recipe in matching_recipes:
-        if 'match_score' in recipe:
-            del recipe['match_score']
-    
-    return matching_recipes
+    # Rank recipes sharing at least one ingredient by match score (highest first),
+    # keeping only the best ones so large pantries do not sort the whole catalog
+    return _MOCK_RECIPE_INDEX.search(ingredients, limit=current_app.config.get('RECIPE_SEARCH_LIMIT', 200))
 
 def _spoonacular_get_recipes(ingredients, recipe_id=None):
     """
-    Get recipe suggestions using Spoonacular API.
+    Get recipe suggestions using Spoonacular API, falling back to local recipes.
     
     Args:
         ingredients (list): List of ingredient names
         recipe_id (int, optional): Specific recipe ID to retrieve
         
     Returns:
-        list or dict: List of recipe dictionaries or a single recipe dictionary if recipe_id is provided
+        tuple: List of recipe dictionaries, or a single recipe dictionary if recipe_id is provided,
+            and whether it came from Spoonacular rather than the local fallback
     """
     api_key = current_app.config.get('SPOONACULAR_API_KEY')
     
     if not api_key:
         current_app.logger.warning("Spoonacular API key not found, using mock data")
-        return _mock_get_recipes(ingredients, recipe_id)
+        return _mock_get_recipes(ingredients, recipe_id), False
     
     try:
-        base_url = "https://api.spoonacular.com"
-        
         # If recipe_id is provided, get that specific recipe
         if recipe_id:
-            endpoint = f"/recipes/{recipe_id}/information"
-            params = {
-                "apiKey": api_key,
-                "includeNutrition": False
-            }
-            
-            response = requests.get(f"{base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            
-            recipe_data = response.json()
-            
-            # Format the response to match our model
-            recipe = {
-                "id": recipe_data.get("id"),
-                "title": recipe_data.get("title"),
-                "image_url": recipe_data.get("image"),
-                "source_url": recipe_data.get("sourceUrl"),
-                "servings": recipe_data.get("servings"),
-                "ready_in_minutes": recipe_data.get("readyInMinutes"),
-                "instructions": recipe_data.get("instructions"),
-                "summary": recipe_data.get("summary"),
-                "cuisines": recipe_data.get("cuisines", []),
-                "ingredients": [ingredient.get("name") for ingredient in recipe_data.get("extendedIngredients", [])]
-            }
-            
-            return recipe
+            recipes = _spoonacular_get_recipe_details([recipe_id], api_key)
+            return (recipes[0] if recipes else None), True
         
         # Otherwise, search for recipes by ingredients
-        endpoint = "/recipes/findByIngredients"
-        params = {
-            "apiKey": api_key,
-            "ingredients": ",".join(ingredients),
-            "number": 10,
-            "ranking": 2,  # Maximize used ingredients
-            "ignorePantry": True
-        }
-        
-        response = requests.get(f"{base_url}{endpoint}", params=params)
-        response.raise_for_status()
-        
-        recipes_data = response.json()
+        recipes_data = _spoonacular_request(*_spoonacular_upstream(), *_find_by_ingredients_request(ingredients, api_key))
         recipe_ids = [recipe.get("id") for recipe in recipes_data]
         
-        # Get detailed information for each recipe
-        recipes = []
-        for recipe_id in recipe_ids:
-            recipe = _spoonacular_get_recipes([], recipe_id)
-            if recipe:
-                recipes.append(recipe)
+        # Get detailed information for all recipes in a single request
+        return _spoonacular_get_recipe_details(recipe_ids, api_key), True
         
-        return recipes
+    except UpstreamUnavailable as e:
+        current_app.logger.warning(f"Spoonacular unavailable, using local recipes: {str(e)}")
+        return _mock_get_recipes(ingredients, recipe_id), False
         
     except Exception as e:
         current_app.logger.error(f"Error using Spoonacular API: {str(e)}")
-        return _mock_get_recipes(ingredients, recipe_id)
+        return _mock_get_recipes(ingredients, recipe_id), False
 
-def _mock_generate_fusion(ingredients, cuisines):
+def _spoonacular_get_recipe_details(recipe_ids, api_key):
     """
-    Mock implementation of fusion recipe generation for development.
+    Get detailed recipe information, reading through the Recipe table.
+    
+    Recipes cached in the database are served directly while they are younger
+    than ``RECIPE_CACHE_TTL``. Missing or stale recipes are fetched from
+    Spoonacular in a single bulk request and written back to the table. If the
+    refresh fails but every requested recipe has a stale copy, the stale copies
+    are served instead. If Spoonacular is unavailable or out of quota, whichever
+    recipes have a cached copy are served.
     
     Args:
-        ingredients (list): List of available ingredient names
-        cuisines (list): List of cuisine names to combine
+        recipe_ids (list): List of Spoonacular recipe IDs
+        api_key (str): Spoonacular API key
         
     Returns:
-        dict: Generated fusion recipe
+        list: List of recipe dictionaries in the same order as recipe_ids
     """
-    # Ensure we have valid cuisines
-    valid_cuisines = [c for c in cuisines if c in CUISINE_DATA]
+    recipe_ids = [recipe_id for recipe_id in recipe_ids if recipe_id is not None]
+    if not recipe_ids:
+        return []
     
-    if not valid_cuisines:
-        valid_cuisines = random.sample(list(CUISINE_DATA.keys()), min(2, len(CUISINE_DATA)))
+    cached, stale_ids = _load_cached_recipes(recipe_ids)
     
-    # Get cuisine data for the selected cuisines
-    cuisine_ingredients = []
-    cuisine_techniques = []
-    cuisine_flavors = []
+    fetched = {}
+    if stale_ids:
+        try:
+            fetched = {recipe["id"]: recipe for recipe in _spoonacular_fetch_recipe_details(stale_ids, api_key)}
+        except Exception as e:
+            _check_recipe_details_fallback(e, recipe_ids, cached)
+        else:
+            _cache_recipes(fetched.values(), cached)
     
-    for cuisine in valid_cuisines:
-        cuisine_data = CUISINE_DATA.get(cuisine, {})
-        cuisine_ingredients.extend(cuisine_data.get("ingredients", []))
-        cuisine_techniques.extend(cuisine_data.get("techniques", []))
-        cuisine_flavors.extend(cuisine_data.get("flavors", []))
+    return _merge_recipe_details(recipe_ids, cached, fetched)
+
+def _load_cached_recipes(recipe_ids):
+    """
+    Load cached Recipe rows and find the ones that need refreshing.
     
-    # Filter ingredients based on what's available
-    available_ingredients = [ing for ing in ingredients if ing]
-    fusion_ingredients = []
+    Args:
+        recipe_ids (list): List of Spoonacular recipe IDs
+        
+    Returns:
+        tuple: Recipe rows keyed by ID, and the IDs missing or older than RECIPE_CACHE_TTL
+    """
+    ttl = current_app.config.get('RECIPE_CACHE_TTL', 24 * 60 * 60)
+    cached = {recipe.id: recipe for recipe in Recipe.query.filter(Recipe.id.in_(recipe_ids)).all()}
+    stale_ids = [recipe_id for recipe_id in recipe_ids
+                 if recipe_id not in cached or cached[recipe_id].is_stale(ttl)]
+    return cached, stale_ids
+
+def _check_recipe_details_fallback(error, recipe_ids, cached):
+    """
+    Decide whether cached recipes can stand in after a failed refresh.
     
-    # Add available ingredients first
-    for ing in available_ingredients:
-        if ing not in fusion_ingredients:
-            fusion_ingredients.append(ing)
+    Args:
+        error (Exception): The refresh error
+        recipe_ids (list): Requested recipe IDs
+        cached (dict): Cached Recipe rows keyed by ID
+        
+    Raises:
+        Exception: The refresh error, if cached copies cannot be served instead
+    """
+    degrade = isinstance(error, UpstreamUnavailable) and cached
+    if not degrade and any(recipe_id not in cached for recipe_id in recipe_ids):
+        raise error
+    current_app.logger.warning(f"Serving cached recipes after Spoonacular error: {str(error)}")
+
+def _merge_recipe_details(recipe_ids, cached, fetched):
+    """
+    Combine fresh and cached recipes in the requested order.
     
-    # Add some cuisine-specific ingredients
-    for ing in cuisine_ingredients:
-        if ing not in fusion_ingredients and len(fusion_ingredients) < 10:
-            fusion_ingredients.append(ing)
+    Args:
+        recipe_ids (list): Requested recipe IDs
+        cached (dict): Cached Recipe rows keyed by ID
+        fetched (dict): Freshly fetched recipe dictionaries keyed by ID
+        
+    Returns:
+        list: Recipe dictionaries, skipping IDs that are neither fetched nor cached
+    """
+    recipes = []
+    for recipe_id in recipe_ids:
+        if recipe_id in fetched:
+            recipes.append(fetched[recipe_id])
+        elif recipe_id in cached:
+            recipes.append(cached[recipe_id].to_dict())
     
-    # Generate a fusion recipe name
-    cuisine_names = " and ".join(valid_cuisines)
-    main_ingredients = ", ".join(fusion_ingredients[:3])
-    recipe_title = f"Fusion {main_ingredients.title()} ({cuisine_names} Style)"
+    return recipes
+
+def _spoonacular_fetch_recipe_details(recipe_ids, api_key):
+    """
+    Fetch detailed recipe information for several recipes in one round trip.
     
-    # Generate instructions
-    techniques = random.sample(cuisine_techniques, min(3, len(cuisine_techniques)))
-    flavors = random.sample(cuisine_flavors, min(2, len(cuisine_flavors)))
+    Uses the ``/recipes/informationBulk`` endpoint instead of calling
+    ``/recipes/{id}/information`` once per recipe.
     
-    instructions = f"1. Prepare all ingredients.\n"
+    Args:
+        recipe_ids (list): List of Spoonacular recipe IDs
+        api_key (str): Spoonacular API key
+        
+    Returns:
+        list: List of recipe dictionaries in the same order as recipe_ids
+    """
+    recipes_data = _spoonacular_request(*_spoonacular_upstream(), *_information_bulk_request(recipe_ids, api_key))
+    return _recipes_from_bulk(recipe_ids, recipes_data)
+
+def _recipes_from_bulk(recipe_ids, recipes_data):
+    """
+    Format an informationBulk response in the requested order.
     
-    if "simmer" in techniques:
-        instructions += f"2. Heat oil in a pan and add aromatics.\n"
-        instructions += f"3. Add main ingredients and simmer until cooked through.\n"
-    elif "stir fry" in techniques:
-        instructions += f"2. Heat oil in a wok or large pan until very hot.\n"
-        instructions += f"3. Quickly stir fry ingredients in small batches, starting with aromatics.\n"
-    elif "grill" in techniques:
-        instructions += f"2. Marinate main ingredients with spices and oil.\n"
-        instructions += f"3. Grill until cooked through with nice char marks.\n"
-    else:
-        instructions += f"2. Combine ingredients in a suitable cooking vessel.\n"
-        instructions += f"3. Cook using your preferred method until done.\n"
+    Args:
+        recipe_ids (list): Requested recipe IDs
+        recipes_data (list): Recipe information returned by Spoonacular
+        
+    Returns:
+        list: List of recipe dictionaries in the same order as recipe_ids
+    """
+    # The bulk endpoint does not guarantee ordering, so restore the requested order
+    recipes_by_id = {recipe_data.get("id"): recipe_data for recipe_data in recipes_data}
     
-    instructions += f"4. Season to taste, aiming for a {' and '.join(flavors)} flavor profile.\n"
-    instructions += f"5. Garnish with fresh herbs and serve immediately."
+    return [
+        _format_spoonacular_recipe(recipes_by_id[recipe_id])
+        for recipe_id in recipe_ids
+        if recipe_id in recipes_by_id
+    ]
+
+def _cache_recipes(recipes, cached):
+    """
+    Store upstream recipes in the Recipe table.
     
-    # Create the fusion recipe
-    fusion_recipe = {
-        "id": random.randint(1000, 9999),
-        "title": recipe_title,
-        "image_url": "https://spoonacular.com/recipeImages/fusion-recipe.jpg",
-        "source_url": "https://fridgetoplate.app/fusion",
-        "servings": 4,
-        "ready_in_minutes": random.randint(20, 60),
-        "instructions": instructions,
-        "summary": f"A creative fusion dish combining elements of {cuisine_names} cuisines, using ingredients you already have.",
-        "cuisines": valid_cuisines,
-        "ingredients": fusion_ingredients,
-        "is_fusion": True
+    Args:
+        recipes (iterable): Recipe dictionaries to store
+        cached (dict): Existing Recipe rows keyed by ID, updated in place
+    """
+    try:
+        for data in recipes:
+            recipe = cached.get(data["id"])
+            if recipe is None:
+                recipe = Recipe(id=data["id"])
+                db.session.add(recipe)
+            recipe.update_from_dict(data)
+        
+        db.session.commit()
+    except Exception as e:
+        # Another worker may have cached the same recipe concurrently
+        db.session.rollback()
+        current_app.logger.warning(f"Could not cache recipes: {str(e)}")
+
+def _format_spoonacular_recipe(recipe_data):
+    """
+    Format a Spoonacular recipe response to match our model.
+    
+    Args:
+        recipe_data (dict): Recipe information returned by Spoonacular
+        
+    Returns:
+        dict: Recipe dictionary
+    """
+    return {
+        "id": recipe_data.get("id"),
+        "title": recipe_data.get("title"),
+        "image_url": recipe_data.get("image"),
+        "source_url": recipe_data.get("sourceUrl"),
+        "servings": recipe_data.get("servings"),
+        "ready_in_minutes": recipe_data.get("readyInMinutes"),
+        "instructions": recipe_data.get("instructions"),
+        "summary": recipe_data.get("summary"),
+        "cuisines": recipe_data.get("cuisines", []),
+        "ingredients": [ingredient.get("name") for ingredient in recipe_data.get("extendedIngredients", [])]
     }
+
+def _mock_generate_fusion(ingredients, cuisines):
+    """
+    Mock implementation of fusion recipe generation for development.
     
-    return fusion_recipe
+    Recipes are generated deterministically by the fusion engine, so repeat
+    requests are served from its cache.
+    
+    Args:
+        ingredients (list): List of available ingredient names
+        cuisines (list): List of cuisine names to combine
+        
+    Returns:
+        dict: Generated fusion recipe
+    """
+    return _get_fusion_engine().generate(ingredients, cuisines)
+
+def _get_fusion_engine():
+    """
+    Get the fusion engine, creating it from the app config on first use.
+    
+    Returns:
+        FusionEngine: The per-process fusion engine
+    """
+    global _fusion_engine
+    
+    if _fusion_engine is None:
+        _fusion_engine = FusionEngine(CUISINE_DATA, cache=get_cache(
+            'fusion',
+            maxsize=current_app.config.get('FUSION_CACHE_SIZE', 512),
+            ttl=current_app.config.get('FUSION_CACHE_TTL', 24 * 60 * 60)
+        ))
+    
+    return _fusion_engine
+
+def get_fusion_cache_stats():
+    """
+    Get hit and miss counters for the fusion recipe cache.
+    
+    Returns:
+        dict: Cache statistics for the current worker process
+    """
+    return _get_fusion_engine().cache.stats()
 
 def _spoonacular_generate_fusion(ingredients, cuisines):
     """
@@ -377,82 +600,373 @@ def _spoonacular_generate_fusion(ingredients, cuisines):
         return _mock_generate_fusion(ingredients, cuisines)
     
     try:
-        # First, get recipes for each cuisine
-        cuisine_recipes = []
-        
-        for cuisine in cuisines:
-            base_url = "https://api.spoonacular.com"
-            endpoint = "/recipes/complexSearch"
-            params = {
-                "apiKey": api_key,
-                "cuisine": cuisine,
-                "includeIngredients": ",".join(ingredients),
-                "number": 3,
-                "addRecipeInformation": True
-            }
-            
-            response = requests.get(f"{base_url}{endpoint}", params=params)
-            response.raise_for_status()
-            
-            results = response.json().get("results", [])
-            cuisine_recipes.extend(results)
+        # First, get recipes for each cuisine, searching all cuisines at once
+        cuisine_recipes = _spoonacular_search_cuisines(ingredients, cuisines, api_key)
         
         if not cuisine_recipes:
             current_app.logger.warning("No recipes found for fusion, using mock data")
             return _mock_generate_fusion(ingredients, cuisines)
         
-        # Extract techniques, ingredients, and flavors from the recipes
-        all_ingredients = []
-        all_instructions = []
-        
-        for recipe in cuisine_recipes:
-            # Extract ingredients
-            for ingredient in recipe.get("extendedIngredients", []):
-                all_ingredients.append(ingredient.get("name"))
-            
-            # Extract instructions
-            all_instructions.append(recipe.get("instructions", ""))
-        
-        # Create a fusion recipe
-        cuisine_names = " and ".join(cuisines)
-        main_ingredients = ", ".join(ingredients[:3])
-        recipe_title = f"Fusion {main_ingredients.title()} ({cuisine_names} Style)"
-        
-        # Generate instructions by combining elements from different recipes
-        instructions = "This fusion recipe combines elements from multiple cuisines:\n\n"
-        
-        # Add some instructions from each recipe
-        for i, recipe_instructions in enumerate(all_instructions):
-            if recipe_instructions:
-                # Extract a few steps from each recipe
-                import re
-                steps = re.split(r'\d+\.', recipe_instructions)
-                steps = [s.strip() for s in steps if s.strip()]
-                
-                if steps:
-                    selected_steps = random.sample(steps, min(2, len(steps)))
-                    instructions += f"From {cuisines[i % len(cuisines)]} cuisine:\n"
-                    for j, step in enumerate(selected_steps):
-                        instructions += f"{j+1}. {step}\n"
-                    instructions += "\n"
-        
-        # Create the fusion recipe
-        fusion_recipe = {
-            "id": random.randint(1000, 9999),
-            "title": recipe_title,
-            "image_url": cuisine_recipes[0].get("image") if cuisine_recipes else "https://spoonacular.com/recipeImages/fusion-recipe.jpg",
-            "source_url": "https://fridgetoplate.app/fusion",
-            "servings": 4,
-            "ready_in_minutes": random.randint(30, 60),
-            "instructions": instructions,
-            "summary": f"A creative fusion dish combining elements of {cuisine_names} cuisines, using ingredients you already have.",
-            "cuisines": cuisines,
-            "ingredients": list(set(all_ingredients)),
-            "is_fusion": True
-        }
-        
-        return fusion_recipe
+        return _build_spoonacular_fusion(ingredients, cuisines, cuisine_recipes)
         
     except Exception as e:
         current_app.logger.error(f"Error generating fusion recipe: {str(e)}")
         return _mock_generate_fusion(ingredients, cuisines)
+
+def _build_spoonacular_fusion(ingredients, cuisines, cuisine_recipes):
+    """
+    Build a fusion recipe from the recipes found for each cuisine.
+    
+    Args:
+        ingredients (list): List of available ingredient names
+        cuisines (list): Requested cuisine names
+        cuisine_recipes (list): (cuisine name, recipe data) tuples
+        
+    Returns:
+        dict: Generated fusion recipe
+    """
+    # Extract techniques, ingredients, and flavors from the recipes
+    all_ingredients = []
+    all_instructions = []
+    
+    for _, recipe in cuisine_recipes:
+        # Extract ingredients
+        for ingredient in recipe.get("extendedIngredients", []):
+            all_ingredients.append(ingredient.get("name"))
+        
+        # Extract instructions
+        all_instructions.append(recipe.get("instructions", ""))
+    
+    # Cuisines that answered before the deadline
+    answered = list(dict.fromkeys(cuisine for cuisine, _ in cuisine_recipes))
+    
+    # Choices are seeded by the request, so the same upstream results give the same recipe
+    rng = random.Random(fusion_seed(ingredients, cuisines))
+    
+    # Create a fusion recipe
+    cuisine_names = " and ".join(answered)
+    main_ingredients = ", ".join(ingredients[:3])
+    recipe_title = f"Fusion {main_ingredients.title()} ({cuisine_names} Style)"
+    
+    # Generate instructions by combining a few steps from each recipe
+    sections = ["This fusion recipe combines elements from multiple cuisines:\n"]
+    
+    for (cuisine, _), recipe_instructions in zip(cuisine_recipes, all_instructions):
+        steps = split_steps(recipe_instructions) if recipe_instructions else []
+        
+        if steps:
+            selected_steps = rng.sample(steps, min(2, len(steps)))
+            lines = [f"From {cuisine} cuisine:"]
+            lines.extend(f"{j+1}. {step}" for j, step in enumerate(selected_steps))
+            sections.append("\n".join(lines) + "\n")
+    
+    instructions = "\n".join(sections)
+    
+    # Create the fusion recipe
+    fusion_recipe = {
+        "id": rng.randint(1000, 9999),
+        "title": recipe_title,
+        "image_url": cuisine_recipes[0][1].get("image") or "https://spoonacular.com/recipeImages/fusion-recipe.jpg",
+        "source_url": "https://fridgetoplate.app/fusion",
+        "servings": 4,
+        "ready_in_minutes": rng.randint(30, 60),
+        "instructions": instructions,
+        "summary": f"A creative fusion dish combining elements of {cuisine_names} cuisines, using ingredients you already have.",
+        "cuisines": answered,
+        "ingredients": list(dict.fromkeys(all_ingredients)),
+        "is_fusion": True
+    }
+    
+    return fusion_recipe
+
+def _spoonacular_search_cuisines(ingredients, cuisines, api_key):
+    """
+    Search Spoonacular for recipes of several cuisines concurrently.
+    
+    All searches share one deadline of FUSION_SEARCH_DEADLINE seconds. Results
+    of the cuisines that answered in time are kept, in the order the cuisines
+    were given; late or failed searches are logged and left out.
+    
+    Args:
+        ingredients (list): List of available ingredient names
+        cuisines (list): List of cuisine names
+        api_key (str): Spoonacular API key
+        
+    Returns:
+        list: (cuisine name, recipe data) tuples
+    """
+    timeout = current_app.config.get('FUSION_SEARCH_DEADLINE', 8)
+    executor = _get_fusion_executor()
+    client, limiter = _spoonacular_upstream()
+    
+    start = time.monotonic()
+    deadline = start + timeout
+    # Searches run in the request's context, so their calls count towards its timings
+    futures = [
+        executor.submit(contextvars.copy_context().run, _spoonacular_search_cuisine,
+                        client, limiter, cuisine, ingredients, api_key, deadline)
+        for cuisine in cuisines
+    ]
+    wait(futures, timeout=timeout)
+    
+    cuisine_recipes = []
+    for cuisine, future in zip(cuisines, futures):
+        if not future.done():
+            # Searches still running end on their own request timeout
+            future.cancel()
+            current_app.logger.warning(f"Fusion search for {cuisine} cuisine missed the {timeout}s deadline")
+        elif future.exception() is not None:
+            current_app.logger.warning(f"Fusion search for {cuisine} cuisine failed: {str(future.exception())}")
+        else:
+            cuisine_recipes.extend((cuisine, recipe) for recipe in future.result())
+    
+    current_app.logger.debug(f"Fusion searches for {len(cuisines)} cuisines took {time.monotonic() - start:.2f}s")
+    return cuisine_recipes
+
+def _spoonacular_search_cuisine(client, limiter, cuisine, ingredients, api_key, deadline):
+    """
+    Search Spoonacular for recipes of one cuisine.
+    
+    Runs in a pool thread, so it must not use the Flask application context.
+    
+    Args:
+        client (UpstreamClient): Spoonacular client
+        limiter (QuotaLimiter): Spoonacular quota limiter, or None
+        cuisine (str): Cuisine name
+        ingredients (list): List of available ingredient names
+        api_key (str): Spoonacular API key
+        deadline (float): time.monotonic() value by which the search must finish
+        
+    Returns:
+        list: Recipe data returned by complexSearch
+    """
+    endpoint, params = _complex_search_request(cuisine, ingredients, api_key)
+    return _spoonacular_request(client, limiter, endpoint, params, deadline).get("results", [])
+
+def _get_fusion_executor():
+    """
+    Get the fusion search thread pool for the current process, creating it on first use.
+    
+    Returns:
+        ThreadPoolExecutor: The pool
+    """
+    global _fusion_executor, _fusion_pid
+    
+    pid = os.getpid()
+    if _fusion_executor is not None and _fusion_pid == pid:
+        return _fusion_executor
+    
+    with _fusion_lock:
+        if _fusion_executor is None or _fusion_pid != pid:
+            _fusion_executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('FUSION_SEARCH_WORKERS', 4),
+                thread_name_prefix='fusion-search'
+            )
+            _fusion_pid = pid
+    
+    return _fusion_executor
+
+def _reset_fusion_executor():
+    """Forget a pool inherited from a parent process."""
+    global _fusion_executor, _fusion_pid, _fusion_lock
+    
+    _fusion_executor = None
+    _fusion_pid = None
+    _fusion_lock = threading.Lock()
+
+def _spoonacular_client():
+    """
+    Get the pooled Spoonacular client for the current process.
+    
+    Returns:
+        UpstreamClient: The client
+    """
+    return get_client('spoonacular', current_app.config.get('SPOONACULAR_BASE_URL', SPOONACULAR_BASE_URL))
+
+def _get_quota_limiter():
+    """
+    Get the Spoonacular quota limiter, creating it from the app config on first use.
+    
+    The bucket holds SPOONACULAR_DAILY_POINTS points and refills evenly over a day.
+    
+    Returns:
+        QuotaLimiter or None: The limiter, or None if quota tracking is disabled
+    """
+    global _quota_limiter
+    
+    if not current_app.config.get('SPOONACULAR_QUOTA_ENABLED', True):
+        return None
+    
+    if _quota_limiter is None:
+        daily_points = current_app.config.get('SPOONACULAR_DAILY_POINTS', 150)
+        _quota_limiter = QuotaLimiter(
+            current_app.config['SPOONACULAR_QUOTA_DB'],
+            capacity=daily_points,
+            refill_per_second=daily_points / (24 * 60 * 60)
+        )
+    
+    return _quota_limiter
+
+def _spoonacular_upstream():
+    """
+    Get what a Spoonacular call needs, resolved in the application context.
+    
+    Returns:
+        tuple: (UpstreamClient, QuotaLimiter or None)
+    """
+    return _spoonacular_client(), _get_quota_limiter()
+
+def _spoonacular_request(client, limiter, endpoint, params, deadline=None):
+    """
+    Call a Spoonacular endpoint, coalescing identical concurrent calls.
+    
+    Safe to use from pool threads, since it does not touch the application
+    context. The parsed response may be shared with other callers, so it must
+    not be modified.
+    
+    Args:
+        client (UpstreamClient): Spoonacular client
+        limiter (QuotaLimiter): Spoonacular quota limiter, or None
+        endpoint (str): Endpoint path
+        params (dict): Query parameters, including the API key
+        deadline (float, optional): time.monotonic() value by which the call must finish
+        
+    Returns:
+        The parsed JSON response
+        
+    Raises:
+        QuotaExceeded: If the daily quota is used up
+    """
+    key = (endpoint, tuple(sorted((name, str(value)) for name, value in params.items() if name != "apiKey")))
+    return _spoonacular_flight.do(key, _spoonacular_call, client, limiter, endpoint, params, deadline)
+
+def _spoonacular_call(client, limiter, endpoint, params, deadline):
+    """
+    Charge the quota for a Spoonacular call and make it.
+    
+    Args:
+        client (UpstreamClient): Spoonacular client
+        limiter (QuotaLimiter): Spoonacular quota limiter, or None
+        endpoint (str): Endpoint path
+        params (dict): Query parameters, including the API key
+        deadline (float): time.monotonic() value by which the call must finish, or None
+        
+    Returns:
+        The parsed JSON response
+    """
+    _charge_quota(limiter, endpoint, params)
+    response = client.get(endpoint, params=params, deadline=deadline)
+    _sync_quota(limiter, response.headers)
+    return response.json()
+
+def _charge_quota(limiter, endpoint, params):
+    """
+    Take the points a Spoonacular call costs from the quota.
+    
+    Args:
+        limiter (QuotaLimiter): Spoonacular quota limiter, or None
+        endpoint (str): Endpoint path
+        params (dict): Query parameters
+        
+    Raises:
+        QuotaExceeded: If the daily quota is used up
+    """
+    if limiter is not None and not limiter.try_acquire("spoonacular", _spoonacular_cost(endpoint, params)):
+        raise QuotaExceeded("Spoonacular daily quota is used up")
+
+def _sync_quota(limiter, headers):
+    """
+    Lower the quota to the points Spoonacular reports as left today.
+    
+    Args:
+        limiter (QuotaLimiter): Spoonacular quota limiter, or None
+        headers (Mapping): Response headers
+    """
+    remaining = headers.get("X-API-Quota-Left")
+    if limiter is not None and remaining is not None:
+        try:
+            limiter.sync("spoonacular", float(remaining))
+        except ValueError:
+            pass
+
+def _find_by_ingredients_request(ingredients, api_key):
+    """
+    Build a findByIngredients request.
+    
+    Returns:
+        tuple: Endpoint path and query parameters
+    """
+    return "/recipes/findByIngredients", {
+        "apiKey": api_key,
+        "ingredients": ",".join(ingredients),
+        "number": 10,
+        "ranking": 2,  # Maximize used ingredients
+        "ignorePantry": True
+    }
+
+def _information_bulk_request(recipe_ids, api_key):
+    """
+    Build an informationBulk request.
+    
+    Returns:
+        tuple: Endpoint path and query parameters
+    """
+    return "/recipes/informationBulk", {
+        "apiKey": api_key,
+        "ids": ",".join(str(recipe_id) for recipe_id in recipe_ids),
+        "includeNutrition": False
+    }
+
+def _complex_search_request(cuisine, ingredients, api_key):
+    """
+    Build a complexSearch request for one cuisine.
+    
+    Returns:
+        tuple: Endpoint path and query parameters
+    """
+    return "/recipes/complexSearch", {
+        "apiKey": api_key,
+        "cuisine": cuisine,
+        "includeIngredients": ",".join(ingredients),
+        "number": 3,
+        "addRecipeInformation": True
+    }
+
+def _spoonacular_cost(endpoint, params):
+    """
+    Estimate the quota points a Spoonacular call costs, following its published pricing.
+    
+    Args:
+        endpoint (str): Endpoint path
+        params (dict): Query parameters
+        
+    Returns:
+        float: Points charged for the call
+    """
+    number = int(params.get("number", 10))
+    
+    if endpoint == "/recipes/informationBulk":
+        return 1 + 0.5 * (len(str(params["ids"]).split(",")) - 1)
+    
+    if endpoint == "/recipes/complexSearch":
+        return 1 + number * (0.01 + (0.025 if params.get("addRecipeInformation") else 0))
+    
+    return 1 + 0.01 * number
+
+def get_spoonacular_stats():
+    """
+    Get request coalescing counters and the remaining Spoonacular quota.
+    
+    Nothing is read from the quota file, so /metrics can call this on every
+    scrape. The quota is the one this worker saw at its last Spoonacular call,
+    and is left out until the worker has made one.
+    
+    Returns:
+        dict: Coalescing counters for this worker and quota points left (None if not known)
+    """
+    stats = _spoonacular_flight.stats()
+    stats['quota_left'] = _quota_limiter.last_seen("spoonacular") if _quota_limiter is not None else None
+    return stats
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_fusion_executor)
@@ -0,0 +1,259 @@
+"""
+Recognition result cache for the FridgeToPlate application.
+
+Recognized ingredients are stored per image, keyed by the SHA-256 of the
+uploaded bytes. Exact matches are looked up before the image is decoded, and
+are also kept in the configured cache backend, so repeat uploads of the same
+bytes are answered without a database query.
+
+The 64-bit difference hash (dHash) computed while preprocessing an image is
+stored as well, so near-identical reshoots within a configurable Hamming
+distance reuse an earlier result instead of calling the Vision API again.
+The hash is also stored as four 16-bit bands: two hashes within 7 bits of
+each other differ by at most one bit in some band, so near-duplicates are
+found through the band indexes instead of scanning stored results.
+"""
+import json
+import hashlib
+import threading
+from itertools import combinations
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import or_
+from app import db
+from app.models.recognition_result import RecognitionResult
+from app.services.shared_cache import get_cache
+
+# Hashes identifying an image in the cache: SHA-256 hex digest and unsigned 64-bit dHash (or None)
+ImageHashes = namedtuple('ImageHashes', ['content_hash', 'perceptual_hash'])
+
+# Bands the perceptual hash is split into for indexed near-duplicate lookups
+HASH_BANDS = 4
+HASH_BAND_BITS = 64 // HASH_BANDS
+
+# Largest Hamming threshold honoured. Lookups probe every band value within
+# threshold // HASH_BANDS bits, which grows combinatorially; 11 bits keeps it
+# to 137 values per band and is already loose for near-duplicate photos.
+MAX_HAMMING_THRESHOLD = 11
+
+_stats = {'exact_hits': 0, 'near_hits': 0, 'misses': 0}
+_stats_lock = threading.Lock()
+
+# Exact-match results in front of the database, created on first use from config
+_result_cache = None
+
+def content_hash(content):
+    """
+    Compute the exact-match key of an image.
+    
+    Args:
+        content (bytes): Original image bytes
+        
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(content).hexdigest()
+
+def lookup(content_hash):
+    """
+    Find a cached recognition result for identical image bytes.
+    
+    The result cache is tried first, then the database. Hits answered by
+    the result cache do not update the stored hit count. Misses are not
+    counted here, since the image may still match lookup_similar.
+    
+    Args:
+        content_hash (str): SHA-256 hex digest of the image bytes
+        
+    Returns:
+        list or None: Cached ingredient names, or None on a miss
+    """
+    cache = _get_result_cache()
+    ingredients = cache.get(content_hash)
+    if ingredients is not None:
+        _record('exact_hits')
+        return list(ingredients)
+    
+    result = RecognitionResult.query.filter_by(content_hash=content_hash).first()
+    
+    if result is not None:
+        _record('exact_hits')
+        ingredients = _touch(result)
+        cache.set(content_hash, ingredients)
+        return ingredients
+    
+    return None
+
+def lookup_similar(hashes):
+    """
+    Find a cached recognition result for a near-identical image.
+    
+    The stored result with the closest perceptual hash within
+    RECOGNITION_CACHE_HAMMING_THRESHOLD bits, capped at MAX_HAMMING_THRESHOLD,
+    wins. On a hit the image's own
+    bytes are stored too, so the next identical upload is an exact hit.
+    
+    Args:
+        hashes (ImageHashes): Hashes of an image that missed lookup
+        
+    Returns:
+        list or None: Cached ingredient names, or None on a miss
+    """
+    threshold = min(current_app.config.get('RECOGNITION_CACHE_HAMMING_THRESHOLD', 6), MAX_HAMMING_THRESHOLD)
+    if hashes.perceptual_hash is not None and threshold > 0:
+        result = _find_nearest(hashes.perceptual_hash, threshold)
+        if result is not None:
+            _record('near_hits')
+            ingredients = _touch(result)
+            store(hashes, ingredients)
+            return ingredients
+    
+    _record('misses')
+    return None
+
+def store(hashes, ingredients):
+    """
+    Store a recognition result.
+    
+    Args:
+        hashes (ImageHashes): Hashes of the image
+        ingredients (list): Recognized ingredient names
+    """
+    try:
+        db.session.add(RecognitionResult(
+            content_hash=hashes.content_hash,
+            perceptual_hash=_to_signed(hashes.perceptual_hash) if hashes.perceptual_hash is not None else None,
+            ingredients=json.dumps(ingredients),
+            **_band_values(hashes.perceptual_hash)
+        ))
+        db.session.commit()
+        _get_result_cache().set(hashes.content_hash, list(ingredients))
+    except Exception as e:
+        # A concurrent upload of the same image may have stored it first
+        db.session.rollback()
+        current_app.logger.warning(f"Could not cache recognition result: {str(e)}")
+
+def get_recognition_cache_stats():
+    """
+    Get recognition cache counters for this worker.
+    
+    Only in-process counters are read, so /metrics can call this on every scrape.
+    
+    Returns:
+        dict: Exact, near-duplicate and total hits, and misses
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    
+    stats['hits'] = stats['exact_hits'] + stats['near_hits']
+    return stats
+
+def _get_result_cache():
+    """
+    Get the exact-match result cache, creating it from the app config on first use.
+    
+    Returns:
+        LRUCache or SharedCache: Cache of ingredient lists by content hash
+    """
+    global _result_cache
+    
+    if _result_cache is None:
+        _result_cache = get_cache(
+            'recognition',
+            maxsize=current_app.config.get('RECOGNITION_RESULT_CACHE_SIZE', 1024),
+            ttl=current_app.config.get('RECOGNITION_RESULT_CACHE_TTL', 24 * 60 * 60)
+        )
+    
+    return _result_cache
+
+def _find_nearest(perceptual_hash, threshold):
+    """
+    Find the stored result with the closest perceptual hash.
+    
+    Candidates are the results that share a band with the hash, allowing as
+    many differing bits per band as the threshold guarantees for at least
+    one band, capped at the RECOGNITION_CACHE_SCAN_LIMIT most recent.
+    
+    Args:
+        perceptual_hash (int): Unsigned 64-bit dHash of the image
+        threshold (int): Maximum Hamming distance in bits
+        
+    Returns:
+        RecognitionResult or None: The closest result within the threshold
+    """
+    radius = threshold // HASH_BANDS
+    columns = [getattr(RecognitionResult, f'hash_band_{band}') for band in range(HASH_BANDS)]
+    bands = _bands(perceptual_hash)
+    
+    candidates = (
+        db.session.query(RecognitionResult.id, RecognitionResult.perceptual_hash)
+        .filter(or_(*(column.in_(_neighbours(band, radius)) for column, band in zip(columns, bands))))
+        .order_by(RecognitionResult.created_at.desc())
+        .limit(current_app.config.get('RECOGNITION_CACHE_SCAN_LIMIT', 5000))
+        .all()
+    )
+    
+    best_id, best_distance = None, threshold + 1
+    for result_id, candidate in candidates:
+        distance = bin(perceptual_hash ^ _to_unsigned(candidate)).count('1')
+        if distance < best_distance:
+            best_id, best_distance = result_id, distance
+    
+    return db.session.get(RecognitionResult, best_id) if best_id is not None else None
+
+def _bands(perceptual_hash):
+    """Split an unsigned 64-bit hash into HASH_BANDS bands, most significant first."""
+    mask = (1 << HASH_BAND_BITS) - 1
+    return [(perceptual_hash >> (HASH_BAND_BITS * (HASH_BANDS - 1 - band))) & mask for band in range(HASH_BANDS)]
+
+def _band_values(perceptual_hash):
+    """Get the hash band columns of a result, all None if the image has no hash."""
+    bands = _bands(perceptual_hash) if perceptual_hash is not None else [None] * HASH_BANDS
+    return {f'hash_band_{band}': value for band, value in enumerate(bands)}
+
+def _neighbours(value, radius):
+    """List the band values within radius bits of a band value, including itself."""
+    values = [value]
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(HASH_BAND_BITS), distance):
+            flipped = value
+            for bit in bits:
+                flipped ^= 1 << bit
+            values.append(flipped)
+    return values
+
+def _touch(result):
+    """
+    Record a hit on a stored result.
+    
+    Args:
+        result (RecognitionResult): The matching result
+        
+    Returns:
+        list: The cached ingredient names
+    """
+    ingredients = result.get_ingredients()
+    
+    try:
+        result.hit_count = RecognitionResult.hit_count + 1
+        result.last_hit_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Could not update recognition cache hit count: {str(e)}")
+    
+    return ingredients
+
+def _record(counter):
+    """Increment a per-process cache counter."""
+    with _stats_lock:
+        _stats[counter] += 1
+
+def _to_signed(value):
+    """Convert an unsigned 64-bit integer to the signed form stored in the database."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _to_unsigned(value):
+    """Convert a stored signed 64-bit integer back to its unsigned form."""
+    return value & 0xFFFFFFFFFFFFFFFF
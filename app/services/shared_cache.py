@@ -0,0 +1,330 @@
+"""
+Cache backends shared across worker processes for the FridgeToPlate application.
+
+Services ask get_cache() for a namespaced cache. With the default memory
+backend each worker keeps its own LRUCache; with the sqlite or redis backend
+every worker on the host reads and writes the same entries, so hit rates do
+not drop as workers are added and invalidation reaches every worker. All
+caches offer the same get/set/invalidate/stats interface as LRUCache.
+"""
+import os
+import json
+import time
+import pickle
+import sqlite3
+import threading
+from flask import current_app
+from app.services.cache import LRUCache
+
+_backend = None
+_backend_pid = None
+_backend_lock = threading.Lock()
+
+class SQLiteBackend:
+    """Cache entries in a local SQLite file in WAL mode, shared by every process on the host."""
+    
+    def __init__(self, path, max_entries=10000):
+        """
+        Initialize the backend.
+        
+        Args:
+            path (str): SQLite database file
+            max_entries (int): Entries kept before the ones closest to expiry are pruned
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)')
+    
+    def get(self, namespace, key):
+        """
+        Get a stored value.
+        
+        Returns:
+            tuple: (found, value)
+        """
+        row = self._connection().execute(
+            'SELECT value FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())
+        ).fetchone()
+        return (True, pickle.loads(row[0])) if row is not None else (False, None)
+    
+    def set(self, namespace, key, value, ttl):
+        """Store a value for ttl seconds."""
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+            (namespace, key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + ttl)
+        )
+        
+        # Prune now and then rather than on every write
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._prune(connection)
+    
+    def delete(self, namespace, key):
+        """Remove one entry."""
+        self._connection().execute('DELETE FROM cache_entries WHERE namespace = ? AND key = ?', (namespace, key))
+    
+    def clear(self, namespace):
+        """Remove every entry of a namespace."""
+        self._connection().execute('DELETE FROM cache_entries WHERE namespace = ?', (namespace,))
+    
+    def size(self, namespace):
+        """Count live entries of a namespace."""
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?', (namespace, time.time())
+        ).fetchone()[0]
+    
+    def _prune(self, connection):
+        """Drop expired entries, then the ones closest to expiry beyond max_entries."""
+        connection.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (time.time(),))
+        connection.execute(
+            'DELETE FROM cache_entries WHERE rowid IN ('
+            'SELECT rowid FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+    
+    def _connection(self):
+        """Get this thread's connection, opened on first use in each process."""
+        pid = os.getpid()
+        
+        # A forked child inherits the parent's thread-local connection, which must not be shared
+        if getattr(self._local, 'pid', None) != pid:
+            # Autocommit; every statement is its own short transaction
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = pid
+        
+        return self._local.connection
+
+class RedisBackend:
+    """Cache entries in Redis, shared by every process that can reach the server."""
+    
+    def __init__(self, url, prefix='fridgetoplate'):
+        """
+        Initialize the backend.
+        
+        Args:
+            url (str): Redis URL, e.g. redis://localhost:6379/0
+            prefix (str): Prefix of every key written by the backend
+        """
+        # Optional dependency, only needed when CACHE_BACKEND is redis
+        import redis
+        
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+    
+    def get(self, namespace, key):
+        """
+        Get a stored value.
+        
+        Returns:
+            tuple: (found, value)
+        """
+        data = self.client.get(self._key(namespace, key))
+        return (True, pickle.loads(data)) if data is not None else (False, None)
+    
+    def set(self, namespace, key, value, ttl):
+        """Store a value for ttl seconds."""
+        self.client.set(self._key(namespace, key), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=int(ttl * 1000))
+    
+    def delete(self, namespace, key):
+        """Remove one entry."""
+        self.client.delete(self._key(namespace, key))
+    
+    def clear(self, namespace):
+        """Remove every entry of a namespace."""
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:{namespace}:*", count=500))
+        for start in range(0, len(keys), 500):
+            self.client.unlink(*keys[start:start + 500])
+    
+    def size(self, namespace):
+        """Count entries of a namespace."""
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}:{namespace}:*", count=500))
+    
+    def _key(self, namespace, key):
+        """Build the Redis key of an entry."""
+        return f"{self.prefix}:{namespace}:{key}"
+
+class SharedCache:
+    """Namespaced view of a shared backend with the same interface as LRUCache."""
+    
+    def __init__(self, backend, namespace, ttl=300):
+        """
+        Initialize the cache.
+        
+        Args:
+            backend (SQLiteBackend or RedisBackend): Storage shared by all workers
+            namespace (str): Namespace of this cache's entries
+            ttl (float): Lifetime of an entry in seconds
+        """
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        """
+        Get a value from the cache.
+        
+        Backend errors are logged and treated as misses.
+        
+        Args:
+            key: Cache key made of strings, numbers, booleans, lists and tuples
+            default: Value returned when the key is missing or expired
+            
+        Returns:
+            The cached value or default
+        """
+        try:
+            found, value = self.backend.get(self.namespace, _encode_key(key))
+        except Exception as e:
+            self._count('errors')
+            current_app.logger.warning(f"Cache read from {self.namespace} failed: {str(e)}")
+            found, value = False, None
+        
+        self._count('hits' if found else 'misses')
+        return value if found else default
+    
+    def set(self, key, value):
+        """
+        Store a value in the cache. Backend errors are logged and ignored.
+        
+        Args:
+            key: Cache key
+            value: Picklable value to store
+        """
+        try:
+            self.backend.set(self.namespace, _encode_key(key), value, self.ttl)
+        except Exception as e:
+            self._count('errors')
+            current_app.logger.warning(f"Cache write to {self.namespace} failed: {str(e)}")
+    
+    def invalidate(self, key=None):
+        """
+        Remove one entry, or every entry of the namespace if no key is given.
+        
+        The change is seen by every worker sharing the backend.
+        
+        Args:
+            key (optional): Cache key to remove
+        """
+        if key is None:
+            self.backend.clear(self.namespace)
+        else:
+            self.backend.delete(self.namespace, _encode_key(key))
+    
+    def stats(self):
+        """
+        Get cache counters.
+        
+        Only in-process counters are read; use size() for the shared entry count.
+        
+        Returns:
+            dict: Hit, miss and error counts for this worker
+        """
+        with self._lock:
+            stats = {'hits': self.hits, 'misses': self.misses, 'errors': self.errors}
+        
+        stats['backend'] = type(self.backend).__name__
+        return stats
+    
+    def size(self):
+        """
+        Count the namespace's entries in the shared backend.
+        
+        This queries the backend (a COUNT on SQLite, a key scan on Redis).
+        
+        Returns:
+            int: Number of entries
+        """
+        return self.backend.size(self.namespace)
+    
+    def _count(self, counter):
+        """Increment a per-worker counter."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+def get_cache(namespace, maxsize=256, ttl=300):
+    """
+    Create a cache for a namespace using the configured backend.
+    
+    CACHE_BACKEND selects 'memory' (a per-worker LRUCache, the default),
+    'sqlite' (a WAL-mode file at CACHE_SQLITE_PATH) or 'redis' (the server
+    at CACHE_REDIS_URL). maxsize only bounds the memory backend; the shared
+    backends are bounded as a whole.
+    
+    Args:
+        namespace (str): Namespace of the cache's entries
+        maxsize (int): Maximum entries for the memory backend
+        ttl (float): Lifetime of an entry in seconds
+        
+    Returns:
+        LRUCache or SharedCache: The cache
+    """
+    if current_app.config.get('CACHE_BACKEND', 'memory') == 'memory':
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    
+    return SharedCache(_get_backend(), namespace, ttl)
+
+def _get_backend():
+    """
+    Get the shared cache backend for the current process, creating it on first use.
+    
+    Returns:
+        SQLiteBackend or RedisBackend: The backend
+    """
+    global _backend, _backend_pid
+    
+    pid = os.getpid()
+    if _backend is not None and _backend_pid == pid:
+        return _backend
+    
+    with _backend_lock:
+        if _backend is None or _backend_pid != pid:
+            config = current_app.config
+            name = config.get('CACHE_BACKEND', 'memory')
+            
+            if name == 'sqlite':
+                _backend = SQLiteBackend(config['CACHE_SQLITE_PATH'], config.get('CACHE_SQLITE_MAX_ENTRIES', 10000))
+            elif name == 'redis':
+                _backend = RedisBackend(config['CACHE_REDIS_URL'])
+            else:
+                raise ValueError(f"Unknown cache backend: {name}")
+            
+            _backend_pid = pid
+    
+    return _backend
+
+def _encode_key(key):
+    """Serialize a cache key to a stable string."""
+    return json.dumps(key, separators=(',', ':'), sort_keys=True)
+
+def _reset_backend():
+    """Forget a backend (and its connections) inherited from a parent process."""
+    global _backend, _backend_pid, _backend_lock
+    
+    _backend = None
+    _backend_pid = None
+    _backend_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_backend)
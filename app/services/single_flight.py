@@ -0,0 +1,84 @@
+"""
+Request coalescing for the FridgeToPlate application.
+
+When several threads of a worker ask for the same upstream resource at
+once, only the first one calls the upstream; the others wait for its result
+instead of sending identical requests.
+"""
+import threading
+
+class _Call:
+    """An in-flight call and the outcome shared with its waiters."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution."""
+    
+    def __init__(self):
+        """Initialize the group."""
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+    
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Call a function, or wait for the in-flight call with the same key.
+        
+        Waiters receive the same result object as the caller that ran the
+        function, so results must be treated as read-only. If the function
+        raises, every waiter gets the same exception.
+        
+        Args:
+            key: Hashable key identifying identical calls
+            fn (callable): Function to call
+            *args: Positional arguments for fn
+            **kwargs: Keyword arguments for fn
+            
+        Returns:
+            The function's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self):
+        """
+        Get coalescing counters.
+        
+        Returns:
+            dict: Calls executed, calls that waited on another, and calls in flight
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
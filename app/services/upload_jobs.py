@@ -0,0 +1,205 @@
+"""
+Upload recognition service for the FridgeToPlate application.
+
+This module recognizes ingredients in uploaded images and stores them in
+the pantry, either inside the request or as a background job run by a
+per-worker thread pool. Job state lives in the database so that any worker
+can answer status requests.
+
+Each queued job holds its images in memory, so a worker only takes
+UPLOAD_JOB_QUEUE_SIZE jobs at a time. Jobs that make no progress for
+UPLOAD_JOB_TIMEOUT seconds, such as those lost when their worker restarted,
+are reported as failed.
+"""
+import os
+import json
+import uuid
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app import db
+from app.models.ingredient import Ingredient
+from app.models.recognition_job import RecognitionJob
+from app.services.image_recognition import recognize_ingredients, recognize_ingredients_batch
+from app.services.normalization import normalize_ingredients
+
+# Seconds clients are asked to wait before retrying when the job queue is full
+RETRY_AFTER = 5
+
+_executor = None
+_executor_pid = None
+_slots = None
+_lock = threading.Lock()
+
+class JobQueueFull(Exception):
+    """Raised instead of queuing a job when this worker already holds UPLOAD_JOB_QUEUE_SIZE jobs."""
+
+def recognize_uploads(images, filenames=None):
+    """
+    Recognize ingredients in uploaded images and add them to the pantry.
+    
+    Args:
+        images (list): Image bytes, readable binary streams or paths to saved image files
+        filenames (list, optional): Original filenames, in the same order as images
+        
+    Returns:
+        list: Recognized ingredient names in canonical form, without duplicates
+    """
+    filenames = filenames or [None] * len(images)
+    
+    # Recognize ingredients in the images, batching several images into one request
+    if len(images) == 1:
+        recognized = recognize_ingredients(images[0], filenames[0])
+    else:
+        recognized = [name for image_ingredients in recognize_ingredients_batch(images, filenames) for name in image_ingredients]
+    
+    return _save_recognized(recognized)
+
+def _save_recognized(recognized):
+    """
+    Normalize recognized ingredient names and add them to the pantry.
+    
+    Args:
+        recognized (iterable): Recognized ingredient names
+        
+    Returns:
+        list: Ingredient names in canonical form, without duplicates
+    """
+    ingredients = normalize_ingredients(recognized)
+    
+    # Save recognized ingredients to database, skipping ones already in the pantry
+    Ingredient.add_many(ingredients)
+    db.session.commit()
+    
+    return ingredients
+
+def submit_recognition_job(images, filenames=None):
+    """
+    Queue a background job recognizing ingredients in uploaded images.
+    
+    Images are handed to the pool as they are, so in-memory uploads must be
+    bytes rather than request streams, which are closed when the request ends.
+    
+    Args:
+        images (list): Image bytes or paths to saved image files
+        filenames (list, optional): Original filenames, in the same order as images
+        
+    Returns:
+        RecognitionJob: The queued job
+        
+    Raises:
+        JobQueueFull: If this worker already holds UPLOAD_JOB_QUEUE_SIZE jobs
+    """
+    executor, slots = _get_executor()
+    if not slots.acquire(blocking=False):
+        raise JobQueueFull("Too many recognition jobs queued")
+    
+    try:
+        job = RecognitionJob(id=str(uuid.uuid4()), status=RecognitionJob.QUEUED)
+        db.session.add(job)
+        db.session.commit()
+        
+        app = current_app._get_current_object()
+        executor.submit(_run_recognition_job, app, job.id, list(images), filenames, slots)
+    except BaseException:
+        slots.release()
+        raise
+    
+    return job
+
+def get_recognition_job(job_id):
+    """
+    Get a recognition job by ID.
+    
+    A queued or running job not updated for UPLOAD_JOB_TIMEOUT seconds was
+    lost, for example by a worker restart, and is marked as failed.
+    
+    Args:
+        job_id (str): Job ID
+        
+    Returns:
+        RecognitionJob or None: The job
+    """
+    job = db.session.get(RecognitionJob, job_id)
+    
+    timeout = timedelta(seconds=current_app.config.get('UPLOAD_JOB_TIMEOUT', 600))
+    if job is not None and not job.is_finished and job.updated_at < datetime.utcnow() - timeout:
+        job.status = RecognitionJob.FAILED
+        job.error = 'Job did not finish in time'
+        db.session.commit()
+    
+    return job
+
+def _run_recognition_job(app, job_id, images, filenames, slots):
+    """
+    Run a recognition job in a pool thread, freeing its queue slot when done.
+    
+    Args:
+        app (Flask): Application used to push an app context
+        job_id (str): Job ID
+        images (list): Image bytes or paths to saved image files
+        filenames (list): Original filenames, or None
+        slots (threading.BoundedSemaphore): Queue slots of the pool
+    """
+    try:
+        _recognize_job(app, job_id, images, filenames)
+    finally:
+        slots.release()
+
+def _recognize_job(app, job_id, images, filenames):
+    """Recognize a job's images and store the outcome on the job."""
+    with app.app_context():
+        job = db.session.get(RecognitionJob, job_id)
+        job.status = RecognitionJob.RUNNING
+        db.session.commit()
+        
+        try:
+            ingredients = recognize_uploads(images, filenames)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Recognition job {job_id} failed: {str(e)}")
+            job = db.session.get(RecognitionJob, job_id)
+            job.status = RecognitionJob.FAILED
+            job.error = str(e)
+        else:
+            job.status = RecognitionJob.SUCCEEDED
+            job.ingredients = json.dumps(ingredients)
+        
+        db.session.commit()
+
+def _get_executor():
+    """
+    Get the job thread pool for the current process, creating it on first use.
+    
+    Returns:
+        tuple: The ThreadPoolExecutor and the BoundedSemaphore of its queue slots
+    """
+    global _executor, _executor_pid, _slots
+    
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor, _slots
+    
+    with _lock:
+        if _executor is None or _executor_pid != pid:
+            _slots = threading.BoundedSemaphore(current_app.config.get('UPLOAD_JOB_QUEUE_SIZE', 8))
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('UPLOAD_JOB_WORKERS', 2),
+                thread_name_prefix='recognition-job'
+            )
+            _executor_pid = pid
+    
+    return _executor, _slots
+
+def _reset_executor():
+    """Forget a pool inherited from a parent process."""
+    global _executor, _executor_pid, _slots, _lock
+    
+    _executor = None
+    _executor_pid = None
+    _slots = None
+    _lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor)
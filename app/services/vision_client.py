@@ -0,0 +1,119 @@
+"""
+Google Cloud Vision client provider for the FridgeToPlate application.
+
+The Vision client owns a gRPC channel, so it is created lazily once per
+worker process and reused across requests. Credentials are built in memory
+from the GOOGLE_CLOUD_CREDENTIALS_BASE64 environment variable.
+
+VISION_API_ENDPOINT (host:port) overrides the Google endpoint. With
+VISION_API_INSECURE=True the channel is plaintext and anonymous
+credentials are used if none are configured, for local stand-ins such as
+the one in loadtest/.
+"""
+import os
+import base64
+import json
+import threading
+import grpc
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import vision
+from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcTransport
+from google.oauth2 import service_account
+
+_client = None
+_client_pid = None
+_credentials = None
+_credentials_pid = None
+_lock = threading.Lock()
+
+def get_vision_client():
+    """
+    Get the Vision client for the current process, creating it on first use.
+    
+    Returns:
+        vision.ImageAnnotatorClient or None: The shared client, or None if no credentials are configured
+    """
+    global _client, _client_pid
+    
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    
+    with _lock:
+        # A client inherited from a parent process must not be reused after fork
+        if _client is None or _client_pid != pid:
+            credentials = _get_credentials()
+            if credentials is None:
+                return None
+            
+            endpoint, insecure = _endpoint()
+            if insecure:
+                _client = vision.ImageAnnotatorClient(
+                    transport=ImageAnnotatorGrpcTransport(channel=grpc.insecure_channel(endpoint))
+                )
+            else:
+                _client = vision.ImageAnnotatorClient(credentials=credentials, client_options=_client_options(endpoint))
+            _client_pid = pid
+    
+    return _client
+
+def reset_vision_client():
+    """Drop the cached client so the next call to get_vision_client creates a new one."""
+    global _client, _client_pid, _credentials, _credentials_pid, _lock
+    
+    _client = None
+    _client_pid = None
+    _credentials = None
+    _credentials_pid = None
+    _lock = threading.Lock()
+
+def _get_credentials():
+    """
+    Get the credentials for the current process, loading them on first use.
+    
+    Returns:
+        service_account.Credentials or None: Credentials, or None if the variable is not set
+    """
+    global _credentials, _credentials_pid
+    
+    pid = os.getpid()
+    if _credentials is None or _credentials_pid != pid:
+        _credentials = _load_credentials()
+        _credentials_pid = pid
+    
+    return _credentials
+
+def _load_credentials():
+    """
+    Build service account credentials from the environment without touching disk.
+    
+    Returns:
+        service_account.Credentials or None: Credentials, or None if the variable is not set
+    """
+    credentials_base64 = os.environ.get('GOOGLE_CLOUD_CREDENTIALS_BASE64')
+    
+    if not credentials_base64:
+        # A plaintext stand-in does not check credentials
+        return AnonymousCredentials() if _endpoint()[1] else None
+    
+    info = json.loads(base64.b64decode(credentials_base64).decode('utf-8'))
+    return service_account.Credentials.from_service_account_info(info)
+
+def _endpoint():
+    """
+    Read the Vision endpoint override from the environment.
+    
+    Returns:
+        tuple: Endpoint (host:port) or None for the default, and whether the channel is plaintext
+    """
+    endpoint = os.environ.get('VISION_API_ENDPOINT') or None
+    insecure = endpoint is not None and os.environ.get('VISION_API_INSECURE', 'False').lower() == 'true'
+    return endpoint, insecure
+
+def _client_options(endpoint):
+    """Build client options for an endpoint override, or None for the default endpoint."""
+    return {'api_endpoint': endpoint} if endpoint else None
+
+# gunicorn forks workers from the master; make sure children never share the parent's channel
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reset_vision_client)
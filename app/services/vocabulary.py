@@ -0,0 +1,135 @@
+"""
+Ingredient vocabulary matching for the FridgeToPlate application.
+
+Vision labels are mapped to ingredients with an Aho-Corasick automaton
+built once over every ingredient name and food category, so a label is
+scanned in a single pass however large the vocabulary is. Results are
+memoized per label.
+"""
+from collections import deque, namedtuple
+from functools import lru_cache
+
+# Result of matching one label against the vocabulary
+LabelMatch = namedtuple('LabelMatch', ['ingredients', 'is_food'])
+
+class AhoCorasick:
+    """Automaton finding every occurrence of a set of patterns in one pass over a text."""
+    
+    def __init__(self, patterns):
+        """
+        Build the automaton.
+        
+        Args:
+            patterns (dict): Mapping of pattern string to the value reported when it occurs
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        
+        for pattern, value in patterns.items():
+            self._add(pattern, value)
+        
+        self._build_failure_links()
+    
+    def _add(self, pattern, value):
+        """Add a pattern to the trie."""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        
+        self._output[state] = self._output[state] + (value,)
+    
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge outputs along them."""
+        # Children of the root fail back to the root, which is the default
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def find_all(self, text):
+        """
+        Find the values of every pattern occurring in a text.
+        
+        Args:
+            text (str): Text to scan
+            
+        Returns:
+            set: Values of the patterns found, including overlapping occurrences
+        """
+        found = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        
+        return found
+
+class Vocabulary:
+    """Ingredient and food category vocabulary used to interpret Vision labels."""
+    
+    def __init__(self, ingredients, categories, cache_size=4096):
+        """
+        Build the vocabulary.
+        
+        Args:
+            ingredients (dict): Mapping of ingredient name to its known variations
+            categories (iterable): Food category words
+            cache_size (int): Number of label matches to memoize
+        """
+        patterns = {category: ('category', category) for category in categories}
+        for ingredient in ingredients:
+            patterns[ingredient] = ('ingredient', ingredient)
+        
+        self._automaton = AhoCorasick(patterns)
+        
+        # Labels equal to a variation map to every ingredient listing it
+        self._variations = {}
+        for ingredient, variations in ingredients.items():
+            for variation in variations:
+                self._variations.setdefault(variation, set()).add(ingredient)
+        
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+    
+    def _match(self, label):
+        """
+        Match a label against the vocabulary.
+        
+        A label is food-related if it contains a category or ingredient name.
+        It maps to every ingredient whose name it contains, and to every
+        ingredient that lists it as a variation.
+        
+        Args:
+            label (str): Vision label
+            
+        Returns:
+            LabelMatch: Matched ingredient names and whether the label is food-related
+        """
+        label = label.lower()
+        hits = self._automaton.find_all(label)
+        
+        contained = {name for kind, name in hits if kind == 'ingredient'}
+        ingredients = frozenset(contained | self._variations.get(label, set()))
+        
+        return LabelMatch(ingredients, bool(hits))
@@ -0,0 +1,5 @@
+"""
+Microbenchmarks for the FridgeToPlate service hot paths.
+
+Run them with ``python -m benchmarks.run``; see benchmarks/run.py.
+"""
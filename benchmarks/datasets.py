@@ -0,0 +1,212 @@
+"""
+Synthetic data sets for the FridgeToPlate benchmarks.
+
+Every generator is seeded, so a given size always produces the same data
+and results stay comparable between commits.
+"""
+import random
+from datetime import datetime
+from app.models.ingredient import Ingredient
+from app.models.recipe import Recipe
+from app.services.image_recognition import MOCK_INGREDIENTS, FOOD_CATEGORIES
+from app.services.recipe_service import CUISINE_DATA
+
+# Syllables combined into made-up ingredient names
+SYLLABLES = (
+    'ba', 'ca', 'da', 'fe', 'gi', 'ho', 'ju', 'ka', 'le', 'mi', 'no', 'pa',
+    'qui', 'ra', 'so', 'ta', 'vu', 'wa', 'xe', 'yo', 'za', 'ber', 'lin', 'mon'
+)
+
+# Distinct ingredients recipes are drawn from, like a real ingredient universe
+CATALOG_VOCABULARY_SIZE = 2000
+
+# Labels Vision returns that are not food
+NON_FOOD_LABELS = ('Tableware', 'Wood', 'Kitchen', 'Countertop', 'Plastic', 'Container', 'Still life photography')
+
+def ingredient_names(count, seed=0):
+    """
+    Generate unique ingredient names, starting with the real mock ingredients.
+    
+    Args:
+        count (int): Number of names
+        seed (int): Random seed
+        
+    Returns:
+        list: Ingredient names
+    """
+    rng = random.Random(seed)
+    names = list(MOCK_INGREDIENTS)[:count]
+    seen = set(names)
+    
+    while len(names) < count:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if rng.random() < 0.3:
+            name = f"{''.join(rng.choice(SYLLABLES) for _ in range(2))} {name}"
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    
+    return names
+
+def recipe_catalog(count, seed=0):
+    """
+    Generate recipe dictionaries shaped like the recipe service's.
+    
+    Ingredients follow a skewed distribution over CATALOG_VOCABULARY_SIZE
+    names, so common pantry items appear in many recipes.
+    
+    Args:
+        count (int): Number of recipes
+        seed (int): Random seed
+        
+    Returns:
+        list: Recipe dictionaries
+    """
+    rng = random.Random(seed)
+    vocabulary = ingredient_names(CATALOG_VOCABULARY_SIZE, seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    cuisines = list(CUISINE_DATA)
+    
+    recipes = []
+    for recipe_id in range(1, count + 1):
+        ingredients = list(dict.fromkeys(rng.choices(vocabulary, weights, k=rng.randint(4, 12))))
+        recipes.append({
+            "id": recipe_id,
+            "title": f"Recipe {recipe_id}",
+            "image_url": f"https://example.com/recipes/{recipe_id}.jpg",
+            "source_url": f"https://example.com/recipes/{recipe_id}",
+            "servings": rng.randint(1, 8),
+            "ready_in_minutes": rng.randint(10, 120),
+            "instructions": "\n".join(f"{step}. Do step {step}." for step in range(1, 6)),
+            "summary": f"Synthetic recipe number {recipe_id}.",
+            "cuisines": rng.sample(cuisines, rng.randint(1, 2)),
+            "ingredients": ingredients
+        })
+    
+    return recipes
+
+def pantries(count, seed=0):
+    """
+    Generate pantry queries over the catalog vocabulary, favouring common ingredients.
+    
+    Args:
+        count (int): Number of pantries
+        seed (int): Random seed
+        
+    Returns:
+        list: Lists of ingredient names
+    """
+    rng = random.Random(seed + 1)
+    vocabulary = ingredient_names(CATALOG_VOCABULARY_SIZE, seed)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return [list(dict.fromkeys(rng.choices(vocabulary, weights, k=rng.randint(3, 10)))) for _ in range(count)]
+
+def vocabulary(count, seed=0):
+    """
+    Generate an ingredient vocabulary in the MOCK_INGREDIENTS format.
+    
+    Args:
+        count (int): Number of ingredients
+        seed (int): Random seed
+        
+    Returns:
+        dict: Mapping of ingredient name to its variations
+    """
+    rng = random.Random(seed)
+    result = {}
+    
+    for name in ingredient_names(count, seed):
+        if name in MOCK_INGREDIENTS:
+            result[name] = list(MOCK_INGREDIENTS[name])
+        else:
+            result[name] = [name, rng.choice(FOOD_CATEGORIES), f"fresh {name}"]
+    
+    return result
+
+def vision_labels(ingredients, count, seed=0):
+    """
+    Generate Vision label lists mixing ingredient, variation, category and non-food labels.
+    
+    Args:
+        ingredients (dict): Vocabulary the labels are drawn from
+        count (int): Number of label lists, one per image
+        seed (int): Random seed
+        
+    Returns:
+        list: Lists of label strings
+    """
+    rng = random.Random(seed + 2)
+    names = list(ingredients)
+    
+    def label():
+        kind = rng.random()
+        name = rng.choice(names)
+        if kind < 0.35:
+            return name.title()
+        if kind < 0.55:
+            return rng.choice(ingredients[name]).title()
+        if kind < 0.7:
+            return f"{name.title()} {rng.choice(('Dish', 'Produce', 'Slice'))}"
+        if kind < 0.8:
+            return rng.choice(FOOD_CATEGORIES).title()
+        return rng.choice(NON_FOOD_LABELS)
+    
+    return [[label() for _ in range(rng.randint(5, 15))] for _ in range(count)]
+
+def cuisine_data(count, seed=0):
+    """
+    Generate fusion cuisine data with count ingredients spread over the known cuisines.
+    
+    Args:
+        count (int): Total number of cuisine ingredients
+        seed (int): Random seed
+        
+    Returns:
+        dict: Mapping of cuisine name to its ingredients, techniques and flavors
+    """
+    names = ingredient_names(count, seed)
+    cuisines = list(CUISINE_DATA)
+    
+    return {
+        cuisine: {
+            "ingredients": names[index::len(cuisines)] or names[:1],
+            "techniques": data["techniques"],
+            "flavors": data["flavors"]
+        }
+        for index, (cuisine, data) in enumerate(CUISINE_DATA.items())
+    }
+
+def ingredient_rows(count, seed=0):
+    """
+    Generate transient Ingredient rows.
+    
+    Args:
+        count (int): Number of rows
+        seed (int): Random seed
+        
+    Returns:
+        list: Ingredient instances, not attached to a session
+    """
+    now = datetime(2024, 1, 1)
+    return [Ingredient(id=index, name=name, created_at=now) for index, name in enumerate(ingredient_names(count, seed), 1)]
+
+def recipe_rows(count, seed=0):
+    """
+    Generate transient Recipe rows.
+    
+    Args:
+        count (int): Number of rows
+        seed (int): Random seed
+        
+    Returns:
+        list: Recipe instances, not attached to a session
+    """
+    now = datetime(2024, 1, 1)
+    rows = []
+    
+    for data in recipe_catalog(count, seed):
+        recipe = Recipe(id=data["id"], created_at=now)
+        recipe.update_from_dict(data)
+        rows.append(recipe)
+    
+    return rows
@@ -0,0 +1,350 @@
+"""
+Benchmark runner for the FridgeToPlate service hot paths.
+
+Each benchmark runs against seeded synthetic data at every requested size
+and reports the time per operation. Results are written as JSON so runs on
+different commits can be compared:
+
+    python -m benchmarks.run --output before.json
+    git checkout my-branch
+    python -m benchmarks.run --output after.json --compare before.json
+
+Benchmarks that swap a module's catalog or vocabulary restore it afterwards.
+They run in an application context with the default configuration, without
+a database.
+"""
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from flask import Flask
+from app.config import Config
+from app.services import recipe_service, image_recognition
+from app.services.cache import LRUCache
+from app.services.fusion_engine import FusionEngine
+from app.services.normalization import normalize_ingredient
+from app.services.recipe_index import RecipeIndex
+from app.services.vocabulary import Vocabulary
+from benchmarks import datasets
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+
+# Operations timed together in one call of a batched benchmark
+BATCH = 50
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    """
+    Register a benchmark.
+    
+    The decorated function takes a data size and returns a callable running
+    a batch of operations and the number of operations in a batch.
+    
+    Args:
+        name (str): Benchmark name used in results
+    """
+    def register(factory):
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+@contextmanager
+def patched(module, attribute, value):
+    """Temporarily replace a module attribute."""
+    original = getattr(module, attribute)
+    setattr(module, attribute, value)
+    try:
+        yield
+    finally:
+        setattr(module, attribute, original)
+
+@benchmark('recipes.mock_search')
+def bench_mock_search(size):
+    """Rank a catalog of the given size against pantry queries."""
+    index = RecipeIndex(datasets.recipe_catalog(size), normalize=normalize_ingredient)
+    queries = datasets.pantries(BATCH)
+    
+    def run():
+        with patched(recipe_service, '_MOCK_RECIPE_INDEX', index):
+            for ingredients in queries:
+                recipe_service._mock_get_recipes(ingredients)
+    
+    return run, len(queries)
+
+@benchmark('recipes.mock_get_by_id')
+def bench_mock_get_by_id(size):
+    """Look up recipes by ID in a catalog of the given size."""
+    index = RecipeIndex(datasets.recipe_catalog(size), normalize=normalize_ingredient)
+    recipe_ids = [1 + (i * 7919) % size for i in range(BATCH)]
+    
+    def run():
+        with patched(recipe_service, '_MOCK_RECIPE_INDEX', index):
+            for recipe_id in recipe_ids:
+                recipe_service._mock_get_recipes([], recipe_id)
+    
+    return run, len(recipe_ids)
+
+@benchmark('recipes.index_build')
+def bench_index_build(size):
+    """Index a catalog of the given size."""
+    catalog = datasets.recipe_catalog(size)
+    
+    def run():
+        RecipeIndex(catalog, normalize=normalize_ingredient)
+    
+    return run, 1
+
+@benchmark('fusion.mock_generate')
+def bench_mock_generate(size):
+    """Generate uncached fusion recipes from cuisine data of the given size."""
+    engine = FusionEngine(datasets.cuisine_data(size), cache=LRUCache(maxsize=BATCH))
+    cuisines = list(recipe_service.CUISINE_DATA)
+    requests = [(pantry, [cuisines[i % len(cuisines)], cuisines[(i + 3) % len(cuisines)]])
+                for i, pantry in enumerate(datasets.pantries(BATCH))]
+    
+    def run():
+        # Every request misses the cache, so this times generation itself
+        engine.cache.invalidate()
+        with patched(recipe_service, '_fusion_engine', engine):
+            for ingredients, request_cuisines in requests:
+                recipe_service._mock_generate_fusion(ingredients, request_cuisines)
+    
+    return run, len(requests)
+
+@benchmark('fusion.mock_generate_cached')
+def bench_mock_generate_cached(size):
+    """Serve repeat fusion requests from the engine cache."""
+    engine = FusionEngine(datasets.cuisine_data(size), cache=LRUCache(maxsize=BATCH))
+    cuisines = list(recipe_service.CUISINE_DATA)
+    requests = [(pantry, cuisines[:2]) for pantry in datasets.pantries(BATCH)]
+    
+    def run():
+        with patched(recipe_service, '_fusion_engine', engine):
+            for ingredients, request_cuisines in requests:
+                recipe_service._mock_generate_fusion(ingredients, request_cuisines)
+    
+    return run, len(requests)
+
+@benchmark('recognition.map_labels')
+def bench_map_labels(size):
+    """Map Vision labels to ingredients with a cold label cache."""
+    ingredients = datasets.vocabulary(size)
+    vocabulary = Vocabulary(ingredients, image_recognition.FOOD_CATEGORIES)
+    images = datasets.vision_labels(ingredients, BATCH)
+    
+    def run():
+        # Labels are memoized per vocabulary; start cold so matching is timed
+        vocabulary.match.cache_clear()
+        with patched(image_recognition, '_VOCABULARY', vocabulary):
+            for labels in images:
+                image_recognition._map_labels_to_ingredients(labels)
+    
+    return run, len(images)
+
+@benchmark('recognition.map_labels_cached')
+def bench_map_labels_cached(size):
+    """Map Vision labels to ingredients with a warm label cache."""
+    ingredients = datasets.vocabulary(size)
+    vocabulary = Vocabulary(ingredients, image_recognition.FOOD_CATEGORIES)
+    images = datasets.vision_labels(ingredients, BATCH)
+    
+    def run():
+        with patched(image_recognition, '_VOCABULARY', vocabulary):
+            for labels in images:
+                image_recognition._map_labels_to_ingredients(labels)
+    
+    return run, len(images)
+
+@benchmark('recognition.is_food_related')
+def bench_is_food_related(size):
+    """Classify Vision labels as food with a cold label cache."""
+    ingredients = datasets.vocabulary(size)
+    vocabulary = Vocabulary(ingredients, image_recognition.FOOD_CATEGORIES)
+    labels = [label for labels in datasets.vision_labels(ingredients, BATCH) for label in labels]
+    
+    def run():
+        vocabulary.match.cache_clear()
+        with patched(image_recognition, '_VOCABULARY', vocabulary):
+            for label in labels:
+                image_recognition._is_food_related(label)
+    
+    return run, len(labels)
+
+@benchmark('recognition.vocabulary_build')
+def bench_vocabulary_build(size):
+    """Build a vocabulary of the given size."""
+    ingredients = datasets.vocabulary(size)
+    
+    def run():
+        Vocabulary(ingredients, image_recognition.FOOD_CATEGORIES)
+    
+    return run, 1
+
+@benchmark('models.ingredient_to_dict')
+def bench_ingredient_to_dict(size):
+    """Serialize Ingredient rows."""
+    rows = datasets.ingredient_rows(size)
+    
+    def run():
+        for row in rows:
+            row.to_dict()
+    
+    return run, len(rows)
+
+@benchmark('models.recipe_to_dict')
+def bench_recipe_to_dict(size):
+    """Serialize Recipe rows."""
+    rows = datasets.recipe_rows(size)
+    
+    def run():
+        for row in rows:
+            row.to_dict()
+    
+    return run, len(rows)
+
+def measure(run, ops, repeat, min_time):
+    """
+    Time a benchmark callable.
+    
+    The callable is run enough times per sample to take at least min_time
+    seconds, with garbage collection paused as timeit does.
+    
+    Args:
+        run (callable): Runs one batch of operations
+        ops (int): Operations per batch
+        repeat (int): Number of samples
+        min_time (float): Minimum seconds per sample
+        
+    Returns:
+        dict: Per-operation times in microseconds and the loops per sample
+    """
+    # Warm up and calibrate
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    loops = max(1, int(min_time / first)) if first > 0 else 1
+    
+    samples = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                run()
+            samples.append((time.perf_counter() - start) / (loops * ops) * 1e6)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    
+    return {
+        'min_us': min(samples),
+        'median_us': statistics.median(samples),
+        'mean_us': statistics.fmean(samples),
+        'ops_per_batch': ops,
+        'loops': loops,
+        'repeat': repeat
+    }
+
+def run_benchmarks(names, sizes, repeat, min_time):
+    """
+    Run benchmarks at every size.
+    
+    Args:
+        names (list): Benchmark names
+        sizes (list): Data sizes
+        repeat (int): Samples per measurement
+        min_time (float): Minimum seconds per sample
+        
+    Returns:
+        list: One result dictionary per benchmark and size
+    """
+    results = []
+    
+    for name in names:
+        for size in sizes:
+            run, ops = BENCHMARKS[name](size)
+            result = {'benchmark': name, 'size': size, **measure(run, ops, repeat, min_time)}
+            results.append(result)
+            print(f"{name:32} {size:>7}  {result['median_us']:12.2f} us/op", file=sys.stderr)
+    
+    return results
+
+def environment():
+    """Describe the machine and commit the results were taken on."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'timestamp': datetime.now(timezone.utc).isoformat()
+    }
+
+def compare(results, baseline):
+    """
+    Print the median time of each result relative to a baseline run to stderr.
+    
+    Args:
+        results (list): Current results
+        baseline (dict): Loaded baseline JSON
+    """
+    previous = {(result['benchmark'], result['size']): result for result in baseline['results']}
+    
+    print(f"\n{'benchmark':32} {'size':>7}  {'baseline us':>12}  {'current us':>12}  {'ratio':>7}", file=sys.stderr)
+    for result in results:
+        before = previous.get((result['benchmark'], result['size']))
+        if before is None:
+            continue
+        ratio = result['median_us'] / before['median_us'] if before['median_us'] else float('inf')
+        print(f"{result['benchmark']:32} {result['size']:>7}  {before['median_us']:12.2f}  "
+              f"{result['median_us']:12.2f}  {ratio:6.2f}x", file=sys.stderr)
+
+def main(argv=None):
+    """Parse arguments, run the benchmarks and write the results."""
+    parser = argparse.ArgumentParser(description='Benchmark FridgeToPlate service hot paths.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Catalog and vocabulary sizes (default: %(default)s)')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None,
+                        help='Run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=5, help='Samples per measurement (default: %(default)s)')
+    parser.add_argument('--min-time', type=float, default=0.1,
+                        help='Minimum seconds per sample (default: %(default)s)')
+    parser.add_argument('--output', help='Write JSON results to this file instead of stdout')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against')
+    args = parser.parse_args(argv)
+    
+    # Services read settings such as RECIPE_SEARCH_LIMIT from the app config
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    with app.app_context():
+        results = run_benchmarks(args.only or list(BENCHMARKS), args.sizes, args.repeat, args.min_time)
+    report = {'environment': environment(), 'results': results}
+    
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(results, json.load(baseline))
+
+if __name__ == '__main__':
+    main()
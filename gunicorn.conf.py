@@ -1,14 +1,21 @@
 # Gunicorn configuration file for FridgeToPlate application
 # This file is used when deploying to Render
 
+import os
+
 # Bind to 0.0.0.0:$PORT
 bind = "0.0.0.0:$PORT"
 
 # Worker configuration
-workers = 2
-threads = 2
-worker_class = "sync"
-worker_connections = 1000
+# Most requests wait on Spoonacular or Vision, so each worker serves many at once:
+#   gthread (default): GUNICORN_THREADS request threads per worker; size the
+#                      database pool (DB_POOL_SIZE, DB_MAX_OVERFLOW) to match
+#   gevent:            GUNICORN_WORKER_CONNECTIONS greenlets per worker (needs gevent)
+#   sync:              one request per worker at a time
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
 timeout = 30
 keepalive = 2
 
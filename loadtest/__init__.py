@@ -0,0 +1,8 @@
+"""
+Local load testing for the FridgeToPlate application.
+
+Stand-ins for Spoonacular (HTTP) and Google Cloud Vision (gRPC) with
+configurable latency, jitter and error rates let the upstream-bound routes
+run under load without touching the internet or spending quota. Start a
+whole run with ``python -m loadtest.driver``; see loadtest/driver.py.
+"""
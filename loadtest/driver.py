@@ -0,0 +1,433 @@
+"""
+Load driver for the FridgeToPlate upstream-bound routes.
+
+Starts the Spoonacular and Vision stand-ins and the application in
+separate processes, seeds the pantry, then keeps a fixed number of
+requests in flight against the recipe list, fusion and upload routes for a
+set duration. It reports throughput, error counts and p50/p95/p99 latency
+per route, and can write them as JSON together with the settings used.
+
+    python -m loadtest.driver --duration 30 --concurrency 100 \\
+        --server gunicorn --workers 2 --worker-class gthread --threads 32 \\
+        --spoonacular-latency-ms 150 --vision-latency-ms 400 --output run.json
+
+--target app serves create_app() through run.py; --target wsgi serves the
+standalone wsgi.py, whose routes are named differently. --app-url skips
+starting the application and uses one that is already running with the
+stand-ins' URLs in its environment.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+from io import BytesIO
+import httpx
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Method and path of each route, per application
+ROUTES = {
+    'app': {
+        'recipes': ('GET', '/recipes/'),
+        'fusion': ('POST', '/recipes/fusion'),
+        'upload': ('POST', '/ingredients/upload')
+    },
+    'wsgi': {
+        'recipes': ('GET', '/recipes'),
+        'fusion': ('POST', '/fusion'),
+        'upload': ('POST', '/capture')
+    }
+}
+
+APP_MODULES = {'app': 'run:app', 'wsgi': 'wsgi:app'}
+
+PANTRY = ['tomato', 'onion', 'garlic', 'pasta', 'chicken', 'rice', 'bell pepper', 'cheese']
+
+CUISINES = ['Italian', 'Mexican', 'Indian', 'Chinese', 'Japanese', 'Thai']
+
+def free_port():
+    """Find a free TCP port on the loopback interface."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, process, timeout=30):
+    """
+    Wait until a local port accepts connections.
+    
+    Args:
+        port (int): Port to connect to
+        process (subprocess.Popen): Process expected to open the port
+        timeout (float): Seconds to wait
+        
+    Raises:
+        RuntimeError: If the process exits or the port does not open in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with status {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    
+    raise RuntimeError(f"Port {port} did not open within {timeout}s")
+
+def start(command, env=None, log=None):
+    """Start a helper process from the repository root."""
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+def fault_arguments(latency_ms, jitter_ms, error_rate):
+    """Build the command line options of a stand-in's fault model."""
+    return ['--latency-ms', str(latency_ms), '--jitter-ms', str(jitter_ms), '--error-rate', str(error_rate)]
+
+def app_environment(args, workdir, spoonacular_url, vision_endpoint):
+    """
+    Build the environment of the application process.
+    
+    Args:
+        args (argparse.Namespace): Driver options
+        workdir (str): Scratch directory for the database and quota files
+        spoonacular_url (str): Base URL of the Spoonacular stand-in
+        vision_endpoint (str): host:port of the Vision stand-in
+        
+    Returns:
+        dict: Environment variables
+    """
+    env = dict(os.environ)
+    env.update({
+        'FLASK_CONFIG': 'production',
+        'SECRET_KEY': 'loadtest',
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        'USE_MOCK_RECIPES': 'False',
+        'USE_MOCK_VISION': 'False',
+        'SPOONACULAR_API_KEY': 'loadtest',
+        'SPOONACULAR_BASE_URL': spoonacular_url,
+        'SPOONACULAR_QUOTA_DB': os.path.join(workdir, 'quota.sqlite'),
+        'SPOONACULAR_DAILY_POINTS': '100000000',
+        'CACHE_SQLITE_PATH': os.path.join(workdir, 'cache.sqlite'),
+        'VISION_API_ENDPOINT': vision_endpoint,
+        'VISION_API_INSECURE': 'True',
+        'GUNICORN_WORKERS': str(args.workers),
+        'GUNICORN_WORKER_CLASS': args.worker_class,
+        'GUNICORN_THREADS': str(args.threads),
+        'GUNICORN_WORKER_CONNECTIONS': str(args.worker_connections)
+    })
+    
+    if args.cold:
+        # Every request goes upstream instead of being answered from a cache
+        env.update({
+            'RECIPE_SEARCH_CACHE_TTL': '0',
+            'RECIPE_CACHE_TTL': '0',
+            'RECOGNITION_CACHE_ENABLED': 'False'
+        })
+    
+    for item in args.env:
+        name, _, value = item.partition('=')
+        env[name] = value
+    
+    return env
+
+def app_command(args, port):
+    """Build the command line serving the application."""
+    module = APP_MODULES[args.target]
+    
+    if args.server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                '--bind', f'127.0.0.1:{port}', module]
+    
+    return [sys.executable, '-m', 'loadtest.serve', module, '--port', str(port)]
+
+def make_images(count, size=(640, 480), seed=0):
+    """
+    Generate distinct JPEG images of random noise.
+    
+    Each image hashes differently, so recognition caches only help when an
+    image is uploaded again.
+    
+    Args:
+        count (int): Number of images
+        size (tuple): Width and height in pixels
+        seed (int): Random seed
+        
+    Returns:
+        list: JPEG bytes
+    """
+    rng = random.Random(seed)
+    images = []
+    
+    for _ in range(count):
+        image = Image.frombytes('RGB', size, rng.randbytes(size[0] * size[1] * 3))
+        output = BytesIO()
+        image.save(output, format='JPEG', quality=80)
+        images.append(output.getvalue())
+    
+    return images
+
+def seed_pantry(base_url, target):
+    """Add the pantry ingredients through the application's own routes."""
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        if target == 'app':
+            client.post('/ingredients/batch', json={'names': PANTRY}).raise_for_status()
+        else:
+            for name in PANTRY:
+                client.post('/ingredients/add', json={'name': name}).raise_for_status()
+
+def build_request(target, route, rng, images):
+    """
+    Build the keyword arguments of one request.
+    
+    Args:
+        target (str): 'app' or 'wsgi'
+        route (str): Route name
+        rng (random.Random): Random generator of the calling worker
+        images (list): JPEG bytes to upload
+        
+    Returns:
+        dict: Arguments for httpx.AsyncClient.request
+    """
+    method, path = ROUTES[target][route]
+    request = {'method': method, 'url': path}
+    
+    if route == 'fusion':
+        cuisines = rng.sample(CUISINES, 2)
+        if target == 'app':
+            request['json'] = {'cuisines': cuisines}
+        else:
+            request['json'] = {'ingredients': PANTRY, 'cuisine1': cuisines[0], 'cuisine2': cuisines[1]}
+    elif route == 'upload':
+        request['files'] = {'image': ('fridge.jpg', rng.choice(images), 'image/jpeg')}
+    
+    return request
+
+async def worker(client, args, routes, weights, images, started, stop_at, samples, seed):
+    """
+    Send requests back to back until the run ends.
+    
+    Args:
+        client (httpx.AsyncClient): Shared client
+        args (argparse.Namespace): Driver options
+        routes (list): Route names to choose from
+        weights (list): Relative weight of each route
+        images (list): JPEG bytes to upload
+        started (float): time.monotonic() value at which measurement starts
+        stop_at (float): time.monotonic() value at which the run ends
+        samples (list): (route, outcome, latency) tuples, appended to
+        seed (int): Seed of this worker's random generator
+    """
+    rng = random.Random(seed)
+    
+    while time.monotonic() < stop_at:
+        route = rng.choices(routes, weights)[0]
+        request = build_request(args.target, route, rng, images)
+        
+        start = time.monotonic()
+        try:
+            response = await client.request(**request)
+            outcome = response.status_code
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        latency = time.monotonic() - start
+        
+        # Requests that started during warm-up are not measured
+        if start >= started:
+            samples.append((route, outcome, latency))
+
+async def run_load(base_url, args, images):
+    """
+    Keep args.concurrency requests in flight for the warm-up and the duration.
+    
+    Returns:
+        tuple: Samples and the measured seconds
+    """
+    routes = list(args.routes)
+    weights = [args.weights.get(route, 1.0) for route in routes]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    samples = []
+    
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        now = time.monotonic()
+        started = now + args.warmup
+        stop_at = started + args.duration
+        await asyncio.gather(*(
+            worker(client, args, routes, weights, images, started, stop_at, samples, args.seed + index)
+            for index in range(args.concurrency)
+        ))
+    
+    return samples, args.duration
+
+def percentile(values, share):
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(round(share * len(values))) - 1))]
+
+def summarize(samples, seconds):
+    """
+    Summarize samples per route and overall.
+    
+    Args:
+        samples (list): (route, outcome, latency) tuples
+        seconds (float): Measured duration
+        
+    Returns:
+        dict: Request counts, errors, throughput and latency percentiles in milliseconds
+    """
+    groups = {'all': samples}
+    for sample in samples:
+        groups.setdefault(sample[0], []).append(sample)
+    
+    summary = {}
+    for name, group in groups.items():
+        latencies = sorted(latency * 1000 for _, _, latency in group)
+        outcomes = {}
+        for _, outcome, _ in group:
+            outcomes[str(outcome)] = outcomes.get(str(outcome), 0) + 1
+        
+        errors = sum(count for outcome, count in outcomes.items() if not outcome.isdigit() or int(outcome) >= 400)
+        summary[name] = {
+            'requests': len(group),
+            'errors': errors,
+            'throughput_rps': len(group) / seconds if seconds else None,
+            'p50_ms': percentile(latencies, 0.50),
+            'p95_ms': percentile(latencies, 0.95),
+            'p99_ms': percentile(latencies, 0.99),
+            'max_ms': latencies[-1] if latencies else None,
+            'outcomes': outcomes
+        }
+    
+    return summary
+
+def print_summary(summary):
+    """Print the summary as a table on stderr."""
+    def number(value):
+        return f"{value:9.1f}" if value is not None else f"{'-':>9}"
+    
+    print(f"\n{'route':10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  outcomes",
+          file=sys.stderr)
+    for name, row in summary.items():
+        print(f"{name:10} {row['requests']:>9} {row['errors']:>7} {number(row['throughput_rps'])} "
+              f"{number(row['p50_ms'])} {number(row['p95_ms'])} {number(row['p99_ms'])}  {row['outcomes']}",
+              file=sys.stderr)
+
+def parse_weights(values):
+    """Parse route=weight options."""
+    weights = {}
+    for value in values:
+        route, _, weight = value.partition('=')
+        weights[route] = float(weight)
+    return weights
+
+def parse_args(argv=None):
+    """Parse the driver's command line."""
+    parser = argparse.ArgumentParser(description='Load test FridgeToPlate against local upstream stand-ins.')
+    
+    load = parser.add_argument_group('load')
+    load.add_argument('--duration', type=float, default=30, help='Measured seconds (default: %(default)s)')
+    load.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds first (default: %(default)s)')
+    load.add_argument('--concurrency', type=int, default=50, help='Requests in flight (default: %(default)s)')
+    load.add_argument('--routes', nargs='+', choices=sorted(ROUTES['app']), default=['recipes', 'fusion', 'upload'])
+    load.add_argument('--weight', dest='weights', action='append', default=[], metavar='ROUTE=WEIGHT',
+                      help='Relative share of a route, 1 by default')
+    load.add_argument('--images', type=int, default=50, help='Distinct images to upload (default: %(default)s)')
+    load.add_argument('--timeout', type=float, default=60, help='Request timeout in seconds (default: %(default)s)')
+    load.add_argument('--seed', type=int, default=0)
+    
+    app = parser.add_argument_group('application')
+    app.add_argument('--target', choices=sorted(APP_MODULES), default='app',
+                     help='create_app() via run.py, or the standalone wsgi.py (default: %(default)s)')
+    app.add_argument('--server', choices=['gunicorn', 'werkzeug'], default='gunicorn')
+    app.add_argument('--workers', type=int, default=2)
+    app.add_argument('--worker-class', default='gthread')
+    app.add_argument('--threads', type=int, default=32)
+    app.add_argument('--worker-connections', type=int, default=1000)
+    app.add_argument('--cold', action='store_true', help='Disable recipe and recognition caches')
+    app.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                     help='Extra environment variable for the application')
+    app.add_argument('--app-url', help='Use an application that is already running at this URL')
+    
+    upstream = parser.add_argument_group('upstream stand-ins')
+    upstream.add_argument('--spoonacular-latency-ms', type=float, default=150)
+    upstream.add_argument('--spoonacular-jitter-ms', type=float, default=50)
+    upstream.add_argument('--spoonacular-error-rate', type=float, default=0.0)
+    upstream.add_argument('--vision-latency-ms', type=float, default=400)
+    upstream.add_argument('--vision-jitter-ms', type=float, default=100)
+    upstream.add_argument('--vision-error-rate', type=float, default=0.0)
+    upstream.add_argument('--spoonacular-port', type=int, default=None, help='Default: a free port')
+    upstream.add_argument('--vision-port', type=int, default=None, help='Default: a free port')
+    
+    parser.add_argument('--output', help='Write the settings and results as JSON to this file')
+    parser.add_argument('--log', help='Write helper process output to this file instead of discarding it')
+    
+    args = parser.parse_args(argv)
+    args.weights = parse_weights(args.weights)
+    return args
+
+def main(argv=None):
+    """Run a load test and report the results."""
+    args = parse_args(argv)
+    processes = []
+    log = open(args.log, 'ab') if args.log else subprocess.DEVNULL
+    
+    try:
+        with tempfile.TemporaryDirectory(prefix='fridgetoplate-loadtest-') as workdir:
+            spoonacular_port = args.spoonacular_port or free_port()
+            vision_port = args.vision_port or free_port()
+            
+            processes.append(start([
+                sys.executable, '-m', 'loadtest.fake_spoonacular', '--port', str(spoonacular_port),
+                *fault_arguments(args.spoonacular_latency_ms, args.spoonacular_jitter_ms, args.spoonacular_error_rate)
+            ], log=log))
+            wait_for_port(spoonacular_port, processes[-1])
+            
+            processes.append(start([
+                sys.executable, '-m', 'loadtest.fake_vision', '--port', str(vision_port),
+                *fault_arguments(args.vision_latency_ms, args.vision_jitter_ms, args.vision_error_rate)
+            ], log=log))
+            wait_for_port(vision_port, processes[-1])
+            
+            base_url = args.app_url
+            if base_url is None:
+                app_port = free_port()
+                env = app_environment(args, workdir, f'http://127.0.0.1:{spoonacular_port}', f'127.0.0.1:{vision_port}')
+                processes.append(start(app_command(args, app_port), env=env, log=log))
+                wait_for_port(app_port, processes[-1], timeout=60)
+                base_url = f'http://127.0.0.1:{app_port}'
+            
+            seed_pantry(base_url, args.target)
+            images = make_images(args.images, seed=args.seed)
+            
+            print(f"Driving {base_url} with {args.concurrency} concurrent requests for {args.duration}s "
+                  f"after {args.warmup}s of warm-up", file=sys.stderr)
+            samples, seconds = asyncio.run(run_load(base_url, args, images))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+        for process in reversed(processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if args.log:
+            log.close()
+    
+    summary = summarize(samples, seconds)
+    print_summary(summary)
+    
+    if args.output:
+        settings = {name: value for name, value in vars(args).items() if name not in ('output', 'log')}
+        with open(args.output, 'w') as output:
+            json.dump({'settings': settings, 'python': platform.python_version(), 'results': summary}, output, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Local Spoonacular stand-in for load tests.
+
+Serves findByIngredients, informationBulk, /recipes/{id}/information and
+complexSearch with deterministic recipes, so the same request always gets
+the same answer. Every call is delayed and may fail according to the
+configured faults.
+
+    python -m loadtest.fake_spoonacular --port 8081 --latency-ms 120 --error-rate 0.01
+"""
+import re
+import json
+import zlib
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from loadtest.faults import Faults
+
+INGREDIENTS = (
+    'tomato', 'onion', 'garlic', 'olive oil', 'pasta', 'rice', 'chicken', 'beef', 'carrot', 'potato',
+    'bell pepper', 'broccoli', 'cheese', 'egg', 'milk', 'butter', 'lemon', 'basil', 'ginger', 'soy sauce',
+    'beans', 'corn', 'lime', 'cilantro', 'avocado', 'yogurt', 'lentils', 'coconut milk', 'spinach', 'mushroom'
+)
+
+CUISINES = ('Italian', 'Mexican', 'Indian', 'Chinese', 'Japanese', 'Thai', 'French', 'American')
+
+# Points reported as left in the X-API-Quota-Left header; load tests should never run out
+QUOTA_LEFT = 1000000
+
+_INFORMATION_PATH = re.compile(r'^/recipes/(\d+)/information$')
+
+def make_recipe(recipe_id, cuisine=None):
+    """
+    Build the recipe information Spoonacular would return for an ID.
+    
+    Args:
+        recipe_id (int): Recipe ID
+        cuisine (str, optional): Cuisine the recipe belongs to
+        
+    Returns:
+        dict: Recipe information in Spoonacular's format
+    """
+    rng = random.Random(recipe_id)
+    ingredients = rng.sample(INGREDIENTS, rng.randint(4, 10))
+    cuisines = [cuisine] if cuisine else rng.sample(CUISINES, rng.randint(1, 2))
+    steps = [f"{number}. {rng.choice(('Chop', 'Simmer', 'Fry', 'Bake', 'Mix'))} the {ingredient}."
+             for number, ingredient in enumerate(ingredients[:5], 1)]
+    
+    return {
+        "id": recipe_id,
+        "title": f"{cuisines[0]} {ingredients[0].title()} Recipe {recipe_id}",
+        "image": f"https://example.com/recipes/{recipe_id}.jpg",
+        "sourceUrl": f"https://example.com/recipes/{recipe_id}",
+        "servings": rng.randint(1, 8),
+        "readyInMinutes": rng.randint(10, 90),
+        "instructions": " ".join(steps),
+        "summary": f"A stand-in recipe made with {', '.join(ingredients[:3])}.",
+        "cuisines": cuisines,
+        "extendedIngredients": [{"name": ingredient} for ingredient in ingredients]
+    }
+
+def _recipe_ids(key, count):
+    """Derive stable recipe IDs from a request key."""
+    base = zlib.crc32(key.encode('utf-8')) % 900000 + 1000
+    return [base + index for index in range(count)]
+
+class SpoonacularHandler(BaseHTTPRequestHandler):
+    """Answers Spoonacular API requests."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def do_GET(self):
+        """Route a GET request."""
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        
+        self.server.faults.sleep()
+        if self.server.faults.should_fail():
+            self._send(500, {"status": "failure", "message": "Injected error"})
+            return
+        
+        number = int(params.get('number', 10))
+        match = _INFORMATION_PATH.match(url.path)
+        
+        if url.path == '/recipes/findByIngredients':
+            ingredients = sorted(filter(None, params.get('ingredients', '').split(',')))
+            body = [
+                {"id": recipe_id, "title": make_recipe(recipe_id)["title"],
+                 "usedIngredientCount": len(ingredients), "missedIngredientCount": 0}
+                for recipe_id in _recipe_ids(','.join(ingredients), number)
+            ]
+        elif url.path == '/recipes/informationBulk':
+            body = [make_recipe(int(recipe_id)) for recipe_id in params.get('ids', '').split(',') if recipe_id]
+        elif url.path == '/recipes/complexSearch':
+            cuisine = params.get('cuisine') or None
+            recipe_ids = _recipe_ids(f"{cuisine}|{params.get('includeIngredients', '')}", number)
+            body = {
+                "results": [make_recipe(recipe_id, cuisine) for recipe_id in recipe_ids],
+                "offset": 0,
+                "number": number,
+                "totalResults": number
+            }
+        elif match:
+            body = make_recipe(int(match.group(1)))
+        else:
+            self._send(404, {"status": "failure", "message": "Unknown endpoint"})
+            return
+        
+        self._send(200, body)
+    
+    def _send(self, status, body):
+        """Send a JSON response with the quota header."""
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-API-Quota-Left', str(QUOTA_LEFT))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        """Keep request logs out of load test output."""
+
+class FakeSpoonacularServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering each request in its own thread."""
+    
+    daemon_threads = True
+    request_queue_size = 1024
+    
+    def __init__(self, address, faults):
+        """
+        Initialize the server.
+        
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free port
+            faults (Faults): Latency and error injection
+        """
+        self.faults = faults
+        super().__init__(address, SpoonacularHandler)
+
+def main(argv=None):
+    """Run the stand-in until interrupted."""
+    parser = argparse.ArgumentParser(description='Local Spoonacular stand-in.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    Faults.add_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    server = FakeSpoonacularServer((args.host, args.port), Faults.from_args(args))
+    print(f"Fake Spoonacular listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Local Google Cloud Vision stand-in for load tests.
+
+Implements the ImageAnnotator BatchAnnotateImages gRPC method, which the
+client library also uses for annotate_image and label_detection. Labels
+are chosen from a hash of the image bytes, so an image is always given the
+same labels. Every call is delayed and may fail according to the
+configured faults. Point the application at it with
+VISION_API_ENDPOINT=host:port and VISION_API_INSECURE=True.
+
+    python -m loadtest.fake_vision --port 50051 --latency-ms 300
+"""
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+from google.cloud import vision
+from loadtest.faults import Faults
+
+SERVICE = 'google.cloud.vision.v1.ImageAnnotator'
+
+# Label, and the broader category Vision would usually report alongside it
+LABELS = (
+    ('Tomato', 'Vegetable'), ('Onion', 'Vegetable'), ('Carrot', 'Vegetable'), ('Potato', 'Vegetable'),
+    ('Bell pepper', 'Vegetable'), ('Lettuce', 'Vegetable'), ('Cucumber', 'Vegetable'), ('Garlic', 'Vegetable'),
+    ('Apple', 'Fruit'), ('Banana', 'Fruit'), ('Lemon', 'Fruit'), ('Chicken breast', 'Meat'),
+    ('Ground beef', 'Meat'), ('Salmon', 'Seafood'), ('Cheddar cheese', 'Dairy'), ('Whole milk', 'Dairy'),
+    ('Egg', 'Food'), ('White rice', 'Grain'), ('Spaghetti', 'Grain'), ('Bread', 'Bakery')
+)
+
+# Labels that are not food, returned with every image as Vision does
+BACKGROUND_LABELS = ('Tableware', 'Kitchen', 'Countertop')
+
+class FakeImageAnnotator:
+    """Answers ImageAnnotator calls."""
+    
+    def __init__(self, faults):
+        """
+        Initialize the annotator.
+        
+        Args:
+            faults (Faults): Latency and error injection
+        """
+        self.faults = faults
+    
+    def batch_annotate_images(self, request, context):
+        """
+        Annotate a batch of images.
+        
+        Args:
+            request (vision.BatchAnnotateImagesRequest): The images and requested features
+            context (grpc.ServicerContext): Call context
+            
+        Returns:
+            vision.BatchAnnotateImagesResponse: One response per image
+        """
+        self.faults.sleep()
+        if self.faults.should_fail():
+            context.abort(grpc.StatusCode.UNAVAILABLE, 'Injected error')
+        
+        return vision.BatchAnnotateImagesResponse(
+            responses=[self._annotate(image_request) for image_request in request.requests]
+        )
+    
+    def _annotate(self, image_request):
+        """Build the labels and objects for one image."""
+        digest = hashlib.sha256(image_request.image.content).digest()
+        picks = [LABELS[byte % len(LABELS)] for byte in digest[:3]]
+        
+        labels = []
+        for index, (label, category) in enumerate(picks):
+            labels.append(vision.EntityAnnotation(description=label, score=0.95 - index * 0.05, topicality=0.9))
+            labels.append(vision.EntityAnnotation(description=category, score=0.9 - index * 0.05, topicality=0.8))
+        labels.extend(vision.EntityAnnotation(description=label, score=0.6) for label in BACKGROUND_LABELS)
+        
+        objects = [vision.LocalizedObjectAnnotation(name=label, score=0.8) for label, _ in picks]
+        
+        return vision.AnnotateImageResponse(label_annotations=labels, localized_object_annotations=objects)
+
+def create_server(address, faults, max_workers=64):
+    """
+    Create a gRPC server hosting the stand-in.
+    
+    Args:
+        address (str): host:port to listen on; port 0 picks a free port
+        faults (Faults): Latency and error injection
+        max_workers (int): Calls served at once
+        
+    Returns:
+        tuple: The unstarted grpc.Server and the port it listens on
+    """
+    annotator = FakeImageAnnotator(faults)
+    handler = grpc.method_handlers_generic_handler(SERVICE, {
+        'BatchAnnotateImages': grpc.unary_unary_rpc_method_handler(
+            annotator.batch_annotate_images,
+            request_deserializer=vision.BatchAnnotateImagesRequest.deserialize,
+            response_serializer=vision.BatchAnnotateImagesResponse.serialize
+        )
+    })
+    
+    server = grpc.server(ThreadPoolExecutor(max_workers=max_workers), maximum_concurrent_rpcs=None)
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port(address)
+    return server, port
+
+def main(argv=None):
+    """Run the stand-in until interrupted."""
+    parser = argparse.ArgumentParser(description='Local Google Cloud Vision stand-in.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=50051)
+    parser.add_argument('--max-workers', type=int, default=64, help='Calls served at once (default: %(default)s)')
+    Faults.add_arguments(parser)
+    args = parser.parse_args(argv)
+    
+    server, port = create_server(f"{args.host}:{args.port}", Faults.from_args(args), args.max_workers)
+    server.start()
+    print(f"Fake Vision listening on {args.host}:{port}", flush=True)
+    
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(grace=1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Latency and error injection shared by the upstream stand-ins.
+"""
+import time
+import random
+import threading
+
+class Faults:
+    """Delays each call by a jittered latency and fails a share of calls."""
+    
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, seed=None):
+        """
+        Initialize the fault model.
+        
+        Args:
+            latency (float): Mean delay per call in seconds
+            jitter (float): Maximum deviation from the mean delay in seconds
+            error_rate (float): Share of calls that fail, between 0 and 1
+            seed (int, optional): Random seed, for reproducible runs
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sleep(self):
+        """Wait for one call's delay."""
+        with self._lock:
+            delay = self._rng.uniform(self.latency - self.jitter, self.latency + self.jitter)
+        time.sleep(max(delay, 0.0))
+    
+    def should_fail(self):
+        """
+        Decide whether the current call fails.
+        
+        Returns:
+            bool: True if an error should be returned
+        """
+        with self._lock:
+            return self._rng.random() < self.error_rate
+    
+    @staticmethod
+    def add_arguments(parser):
+        """Add the fault options to an argument parser."""
+        parser.add_argument('--latency-ms', type=float, default=50, help='Mean delay per call (default: %(default)s)')
+        parser.add_argument('--jitter-ms', type=float, default=20, help='Maximum deviation from the mean (default: %(default)s)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of calls that fail (default: %(default)s)')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    
+    @classmethod
+    def from_args(cls, args):
+        """Build the fault model from parsed arguments."""
+        return cls(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.seed)
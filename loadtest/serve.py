@@ -0,0 +1,42 @@
+"""
+Serve a WSGI application with Werkzeug's threaded server.
+
+Used by the load driver when gunicorn is not available:
+
+    python -m loadtest.serve run:app --port 8000
+"""
+import argparse
+import importlib
+from werkzeug.serving import make_server
+
+def load_app(target):
+    """
+    Import a WSGI application from a module:attribute string.
+    
+    Args:
+        target (str): Application location, e.g. run:app
+        
+    Returns:
+        The WSGI application
+    """
+    module_name, _, attribute = target.partition(':')
+    return getattr(importlib.import_module(module_name), attribute or 'app')
+
+def main(argv=None):
+    """Serve the application until interrupted."""
+    parser = argparse.ArgumentParser(description='Serve a WSGI application with a thread per request.')
+    parser.add_argument('app', help='Application as module:attribute, e.g. run:app or wsgi:app')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args(argv)
+    
+    server = make_server(args.host, args.port, load_app(args.app), threaded=True)
+    print(f"Serving {args.app} on http://{args.host}:{args.port}", flush=True)
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
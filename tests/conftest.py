@@ -0,0 +1,17 @@
+"""
+Shared fixtures for the FridgeToPlate tests.
+"""
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    """An application on the testing configuration with a fresh in-memory database."""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
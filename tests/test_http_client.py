@@ -0,0 +1,98 @@
+"""
+Tests for the upstream HTTP client's circuit breaker.
+"""
+import time
+from unittest import mock
+
+import pytest
+import requests
+
+from app.services.http_client import CircuitBreaker, UpstreamClient, UpstreamUnavailable
+
+
+def _response(status_code):
+    """Build a response with the given status."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = 'http://upstream.test/path'
+    return response
+
+
+@pytest.fixture
+def client():
+    """A client whose breaker opens after one failure and is ready for a half-open probe."""
+    client = UpstreamClient('test', 'http://upstream.test', retries=0, failure_threshold=1, cooldown=30)
+    client.breaker.record_failure()
+    client.breaker.opened_at = time.monotonic() - 31
+    return client
+
+
+def test_open_breaker_rejects_calls(client):
+    client.breaker.opened_at = time.monotonic()
+
+    with mock.patch.object(client.session, 'request') as request:
+        with pytest.raises(UpstreamUnavailable):
+            client.get('/path')
+
+    request.assert_not_called()
+
+
+def test_successful_probe_closes_breaker(client):
+    with mock.patch.object(client.session, 'request', return_value=_response(200)):
+        client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    assert client.breaker.failures == 0
+
+
+def test_failed_probe_reopens_breaker(client):
+    with mock.patch.object(client.session, 'request', side_effect=requests.ConnectionError):
+        with pytest.raises(requests.ConnectionError):
+            client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+    assert not client.breaker.allow()
+
+
+def test_unretried_error_on_probe_reopens_breaker(client):
+    with mock.patch.object(client.session, 'request', side_effect=requests.exceptions.ChunkedEncodingError):
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.parametrize('error', [KeyboardInterrupt, SystemExit])
+def test_interrupted_probe_reopens_breaker(client, error):
+    with mock.patch.object(client.session, 'request', side_effect=error):
+        with pytest.raises(error):
+            client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_client_error_on_probe_closes_breaker(client):
+    with mock.patch.object(client.session, 'request', return_value=_response(404)):
+        with pytest.raises(requests.HTTPError):
+            client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_server_error_on_probe_reopens_breaker(client):
+    with mock.patch.object(client.session, 'request', return_value=_response(503)):
+        with pytest.raises(requests.HTTPError):
+            client.get('/path')
+
+    assert client.breaker.state == CircuitBreaker.OPEN
+
+
+def test_retried_failure_then_success_closes_breaker():
+    client = UpstreamClient('test', 'http://upstream.test', retries=1, backoff=0, failure_threshold=1)
+    responses = [requests.Timeout(), _response(200)]
+
+    with mock.patch.object(client.session, 'request', side_effect=responses) as request:
+        client.get('/path')
+
+    assert request.call_count == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
@@ -0,0 +1,88 @@
+"""
+Tests for the Ingredient model's bulk insert and pagination.
+"""
+from datetime import datetime, timedelta
+from unittest import mock
+
+import pytest
+
+from app import db
+from app.models.ingredient import Ingredient
+
+
+@pytest.fixture
+def race(app):
+    """Insert the given names from 'another worker' right after add_many looks up existing names."""
+    query = db.session.query
+
+    def patch(*names):
+        def racing_query(*args, **kwargs):
+            result = query(*args, **kwargs)
+            db.session.execute(db.insert(Ingredient), [{'name': name} for name in names])
+            return result
+        return mock.patch.object(db.session, 'query', side_effect=racing_query)
+
+    return patch
+
+
+def test_add_many_skips_duplicates_and_blanks(app):
+    assert Ingredient.add_many(['tomato', 'onion', 'tomato', '', None]) == ['tomato', 'onion']
+    db.session.commit()
+
+    assert sorted(Ingredient.names()) == ['onion', 'tomato']
+
+
+def test_add_many_skips_existing_names(app):
+    Ingredient.add_many(['onion'])
+    db.session.commit()
+
+    assert Ingredient.add_many(['onion', 'garlic']) == ['garlic']
+    assert Ingredient.add_many(['onion', 'garlic']) == []
+    assert Ingredient.add_many([]) == []
+
+
+def test_add_many_leaves_out_concurrent_inserts(app, race):
+    with race('basil'):
+        inserted = Ingredient.add_many(['basil', 'leek'])
+    db.session.commit()
+
+    assert inserted == ['leek']
+    assert sorted(Ingredient.names()) == ['basil', 'leek']
+
+
+def test_add_many_without_returning_counts_rows(app, race):
+    dialect = db.session.get_bind().dialect
+
+    with mock.patch.object(type(dialect), 'insert_returning', False), race('mint'):
+        inserted = Ingredient.add_many(['mint', 'sage'])
+    db.session.commit()
+
+    assert inserted == ['sage']
+    assert sorted(Ingredient.names()) == ['mint', 'sage']
+
+
+def test_page_walks_every_ingredient_once(app):
+    added = datetime(2024, 1, 1)
+    # Pairs share a timestamp, so the id breaks ties
+    db.session.add_all(Ingredient(name=f'item{i}', created_at=added + timedelta(seconds=i // 2)) for i in range(7))
+    db.session.commit()
+
+    names, after = [], None
+    while True:
+        page, after = Ingredient.page(after=after, limit=3, fields=('name',))
+        names.extend(ingredient['name'] for ingredient in page)
+        if after is None:
+            break
+
+    assert names == [f'item{i}' for i in range(7)]
+
+
+def test_page_returns_requested_fields(app):
+    Ingredient.add_many(['tomato'])
+    db.session.commit()
+
+    page, after = Ingredient.page(limit=5, fields=('name', 'created_at'))
+
+    assert after is None
+    assert list(page[0]) == ['name', 'created_at']
+    assert isinstance(page[0]['created_at'], str)
@@ -0,0 +1,46 @@
+"""
+Tests for the /metrics endpoint.
+"""
+from unittest import mock
+
+from app.services import recipe_service
+from app.services.quota import QuotaLimiter
+from app.services.shared_cache import SharedCache, SQLiteBackend
+
+
+def test_scrape_does_not_create_quota_limiter(app, monkeypatch):
+    monkeypatch.setattr(recipe_service, '_quota_limiter', None)
+
+    response = app.test_client().get('/metrics')
+
+    assert response.status_code == 200
+    assert recipe_service._quota_limiter is None
+    assert b'fridgetoplate_spoonacular_quota_points' not in response.data
+
+
+def test_scrape_reports_last_seen_quota_without_reading_it(app, monkeypatch, tmp_path):
+    limiter = QuotaLimiter(str(tmp_path / 'quota.db'), capacity=10, refill_per_second=0)
+    limiter.try_acquire('spoonacular', 3)
+    monkeypatch.setattr(recipe_service, '_quota_limiter', limiter)
+
+    with mock.patch.object(QuotaLimiter, '_connect') as connect:
+        response = app.test_client().get('/metrics')
+
+    connect.assert_not_called()
+    assert b'fridgetoplate_spoonacular_quota_points{worker=' in response.data
+    assert b'} 7.0\n' in response.data
+
+
+def test_shared_cache_stats_do_not_query_backend(app, tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.db'))
+    cache = SharedCache(backend, 'test')
+    cache.set('key', 'value')
+    cache.get('key')
+
+    with mock.patch.object(backend, 'size') as size:
+        stats = cache.stats()
+
+    size.assert_not_called()
+    assert stats['hits'] == 1
+    assert 'size' not in stats
+    assert cache.size() == 1
@@ -0,0 +1,90 @@
+"""
+Tests for the SQLite-backed upstream quota limiter.
+"""
+import sqlite3
+import time
+
+import pytest
+
+from app.services.quota import QuotaLimiter
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    """A limiter with ten tokens that does not refill."""
+    return QuotaLimiter(str(tmp_path / 'quota.db'), capacity=10, refill_per_second=0)
+
+
+@pytest.mark.parametrize('call', [
+    lambda limiter: limiter.try_acquire('spoonacular'),
+    lambda limiter: limiter.sync('spoonacular', 5)
+], ids=['try_acquire', 'sync'])
+def test_lock_timeout_is_raised_unmasked(limiter, monkeypatch, call):
+    holder = sqlite3.connect(limiter.path, isolation_level=None)
+    holder.execute('BEGIN IMMEDIATE')
+    monkeypatch.setattr(limiter, '_connect', lambda: sqlite3.connect(limiter.path, timeout=0, isolation_level=None))
+
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            call(limiter)
+    finally:
+        holder.execute('ROLLBACK')
+        holder.close()
+
+    assert limiter.available('spoonacular') == 10
+
+
+def test_try_acquire_until_empty(limiter):
+    assert limiter.try_acquire('spoonacular', 4)
+    assert limiter.try_acquire('spoonacular', 6)
+    assert not limiter.try_acquire('spoonacular', 1)
+
+    assert limiter.available('spoonacular') == 0
+    assert limiter.last_seen('spoonacular') == 0
+
+
+def test_failed_acquire_takes_nothing(limiter):
+    assert not limiter.try_acquire('spoonacular', 11)
+
+    assert limiter.available('spoonacular') == 10
+
+
+def test_buckets_are_separate(limiter):
+    limiter.try_acquire('spoonacular', 10)
+
+    assert limiter.try_acquire('vision', 10)
+
+
+def test_bucket_refills_over_time(tmp_path, monkeypatch):
+    limiter = QuotaLimiter(str(tmp_path / 'quota.db'), capacity=10, refill_per_second=2)
+    monkeypatch.setattr(time, 'time', lambda: 1000.0)
+    limiter.try_acquire('spoonacular', 10)
+
+    monkeypatch.setattr(time, 'time', lambda: 1002.0)
+    assert limiter.available('spoonacular') == 4
+
+    monkeypatch.setattr(time, 'time', lambda: 2000.0)
+    assert limiter.available('spoonacular') == 10
+
+
+def test_sync_only_lowers_the_bucket(limiter):
+    limiter.try_acquire('spoonacular', 4)
+
+    limiter.sync('spoonacular', 8)
+    assert limiter.available('spoonacular') == 6
+
+    limiter.sync('spoonacular', 2)
+    assert limiter.available('spoonacular') == 2
+
+    limiter.sync('spoonacular', -5)
+    assert limiter.available('spoonacular') == 0
+
+
+def test_limiters_share_the_file(limiter):
+    other = QuotaLimiter(limiter.path, capacity=10, refill_per_second=0)
+
+    other.try_acquire('spoonacular', 7)
+
+    assert not limiter.try_acquire('spoonacular', 4)
+    assert limiter.try_acquire('spoonacular', 3)
+    assert other.last_seen('spoonacular') == 3
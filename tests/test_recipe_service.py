@@ -0,0 +1,64 @@
+"""
+Tests for the recipe search cache.
+"""
+import pytest
+
+from app.services import recipe_service
+from app.services.recipe_service import (
+    get_recipes_by_ingredients, get_recipe_search_cache_stats, invalidate_recipe_search_cache
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_search_cache(app):
+    """Start every test with an empty search cache."""
+    invalidate_recipe_search_cache()
+
+
+def _search_counting_calls(monkeypatch, ingredients):
+    """Search twice, counting the searches that reached the backend."""
+    calls = []
+    search = recipe_service._mock_get_recipes
+    monkeypatch.setattr(recipe_service, '_mock_get_recipes', lambda *args: calls.append(args) or search(*args))
+    get_recipes_by_ingredients(ingredients)
+    get_recipes_by_ingredients(ingredients)
+    return len(calls)
+
+
+def test_repeated_search_is_cached(monkeypatch):
+    assert _search_counting_calls(monkeypatch, ['tomato', 'pasta']) == 1
+
+
+def test_plurals_share_a_cache_entry():
+    get_recipes_by_ingredients(['Tomatoes', 'pasta'])
+    hits = get_recipe_search_cache_stats()['hits']
+
+    get_recipes_by_ingredients(['pasta', 'tomato'])
+
+    assert get_recipe_search_cache_stats()['hits'] == hits + 1
+
+
+def test_invalidated_entry_is_searched_again(monkeypatch):
+    get_recipes_by_ingredients(['tomato', 'pasta'])
+    get_recipes_by_ingredients(['onion'])
+
+    invalidate_recipe_search_cache(['Pasta', 'tomatoes'])
+
+    assert _search_counting_calls(monkeypatch, ['tomato', 'pasta']) == 1
+    assert _search_counting_calls(monkeypatch, ['onion']) == 0
+
+
+def test_invalidating_other_backend_keeps_entry(monkeypatch):
+    get_recipes_by_ingredients(['tomato'])
+
+    invalidate_recipe_search_cache(['tomato'], backend='spoonacular')
+
+    assert _search_counting_calls(monkeypatch, ['tomato']) == 0
+
+
+def test_invalidating_everything(monkeypatch):
+    get_recipes_by_ingredients(['tomato'])
+
+    invalidate_recipe_search_cache()
+
+    assert _search_counting_calls(monkeypatch, ['tomato']) == 1
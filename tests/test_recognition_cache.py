@@ -0,0 +1,81 @@
+"""
+Tests for the recognition result cache.
+"""
+import random
+
+import pytest
+
+from app.services import recognition_cache
+from app.services.recognition_cache import ImageHashes
+
+
+@pytest.fixture(autouse=True)
+def fresh_result_cache(app):
+    """Give every test an empty exact-match cache."""
+    recognition_cache._result_cache = None
+    yield
+    recognition_cache._result_cache = None
+
+
+def _flip(value, bits):
+    """Flip the given bit positions of a 64-bit hash."""
+    for bit in bits:
+        value ^= 1 << bit
+    return value
+
+
+def test_exact_match_is_found():
+    recognition_cache.store(ImageHashes('a' * 64, 0x0123456789ABCDEF), ['tomato'])
+    recognition_cache._result_cache = None
+
+    assert recognition_cache.lookup('a' * 64) == ['tomato']
+    assert recognition_cache.lookup('b' * 64) is None
+
+
+def test_near_duplicates_within_threshold_are_found(app):
+    stored = 0xF0E1D2C3B4A59687
+    recognition_cache.store(ImageHashes('a' * 64, stored), ['tomato'])
+    threshold = app.config['RECOGNITION_CACHE_HAMMING_THRESHOLD']
+    rng = random.Random(0)
+
+    for _ in range(50):
+        nearby = _flip(stored, rng.sample(range(64), rng.randint(1, threshold)))
+        assert recognition_cache._find_nearest(nearby, threshold) is not None
+
+
+def test_hashes_beyond_threshold_miss(app):
+    stored = 0xF0E1D2C3B4A59687
+    recognition_cache.store(ImageHashes('a' * 64, stored), ['tomato'])
+    threshold = app.config['RECOGNITION_CACHE_HAMMING_THRESHOLD']
+
+    assert recognition_cache.lookup_similar(ImageHashes('b' * 64, _flip(stored, range(0, 64, 4)))) is None
+    assert recognition_cache._find_nearest(_flip(stored, range(threshold + 1)), threshold) is None
+
+
+def test_near_hit_stores_new_bytes_for_exact_hits():
+    stored = 0xF0E1D2C3B4A59687
+    recognition_cache.store(ImageHashes('a' * 64, stored), ['tomato'])
+
+    assert recognition_cache.lookup_similar(ImageHashes('b' * 64, _flip(stored, [3]))) == ['tomato']
+    assert recognition_cache.lookup('b' * 64) == ['tomato']
+
+
+def test_large_threshold_is_capped(app):
+    app.config['RECOGNITION_CACHE_HAMMING_THRESHOLD'] = 64
+    stored = 0xF0E1D2C3B4A59687
+    recognition_cache.store(ImageHashes('a' * 64, stored), ['tomato'])
+
+    far = _flip(stored, range(recognition_cache.MAX_HAMMING_THRESHOLD + 1))
+    assert recognition_cache.lookup_similar(ImageHashes('b' * 64, far)) is None
+
+
+def test_stats_count_lookups():
+    before = recognition_cache.get_recognition_cache_stats()
+    recognition_cache.store(ImageHashes('a' * 64, 1), ['tomato'])
+
+    recognition_cache.lookup('a' * 64)
+    recognition_cache.lookup_similar(ImageHashes('b' * 64, ~1 & 0xFFFFFFFFFFFFFFFF))
+
+    stats = recognition_cache.get_recognition_cache_stats()
+    assert stats['hits'] == before['hits'] + 1
+    assert stats['misses'] == before['misses'] + 1
@@ -0,0 +1,73 @@
+"""
+Tests for coalescing identical concurrent calls.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def _wait_for_waiters(group, count):
+    """Block until the given number of callers are waiting on an in-flight call."""
+    for _ in range(500):
+        if group.stats()['coalesced'] >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError('callers did not coalesce')
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'recipes': []}
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(group.do, 'key', slow)
+        started.wait(5)
+        waiters = [pool.submit(group.do, 'key', slow) for _ in range(3)]
+        _wait_for_waiters(group, 3)
+        release.set()
+        results = [leader.result(5)] + [waiter.result(5) for waiter in waiters]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {'executions': 1, 'coalesced': 3, 'in_flight': 0}
+
+
+def test_waiters_get_the_leaders_error():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError('upstream failed')
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(group.do, 'key', failing)
+        started.wait(5)
+        waiter = pool.submit(group.do, 'key', failing)
+        _wait_for_waiters(group, 1)
+        release.set()
+
+        for future in (leader, waiter):
+            with pytest.raises(ValueError, match='upstream failed'):
+                future.result(5)
+
+
+def test_later_calls_run_again():
+    group = SingleFlight()
+
+    assert group.do('key', lambda: 1) == 1
+    assert group.do('key', lambda: 2) == 2
+    assert group.do('other', lambda: 3) == 3
+    assert group.stats()['executions'] == 3
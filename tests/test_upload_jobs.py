@@ -0,0 +1,85 @@
+"""
+Tests for background upload recognition jobs.
+"""
+import io
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.recognition_job import RecognitionJob
+from app.services import upload_jobs
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(app):
+    """Give every test its own job pool and queue slots."""
+    app.config['UPLOAD_JOB_QUEUE_SIZE'] = 2
+    upload_jobs._reset_executor()
+    yield
+    upload_jobs._reset_executor()
+
+
+@pytest.fixture
+def blocked_jobs(monkeypatch):
+    """Make jobs wait until the returned event is set, without touching the database."""
+    release = threading.Event()
+    monkeypatch.setattr(upload_jobs, '_recognize_job', lambda *args: release.wait(5))
+    yield release
+    release.set()
+
+
+def _upload(client):
+    """Upload one image as a background job."""
+    data = {'image': (io.BytesIO(b'not really a jpeg'), 'tomato.jpg')}
+    return client.post('/ingredients/upload?async=1', data=data, content_type='multipart/form-data')
+
+
+def test_upload_is_queued_as_job(app, blocked_jobs):
+    response = _upload(app.test_client())
+
+    assert response.status_code == 202
+    assert response.get_json()['status'] == RecognitionJob.QUEUED
+
+
+def test_full_queue_rejects_uploads(app, blocked_jobs):
+    client = app.test_client()
+    assert [_upload(client).status_code for _ in range(2)] == [202, 202]
+
+    response = _upload(client)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(upload_jobs.RETRY_AFTER)
+    assert RecognitionJob.query.count() == 2
+
+
+def test_finished_jobs_free_their_slots(app, monkeypatch):
+    app.config['UPLOAD_JOB_WORKERS'] = 1
+    monkeypatch.setattr(upload_jobs, '_recognize_job', lambda *args: None)
+
+    for _ in range(4):
+        upload_jobs.submit_recognition_job([b'image'])
+        # The single pool thread runs tasks in order, so the job has finished once this has
+        upload_jobs._get_executor()[0].submit(lambda: None).result(timeout=5)
+
+    assert RecognitionJob.query.count() == 4
+
+
+def test_stale_job_is_reported_failed(app):
+    job = RecognitionJob(id='stale', status=RecognitionJob.RUNNING,
+                         updated_at=datetime.utcnow() - timedelta(seconds=app.config['UPLOAD_JOB_TIMEOUT'] + 1))
+    db.session.add(job)
+    db.session.commit()
+
+    job = upload_jobs.get_recognition_job('stale')
+
+    assert job.status == RecognitionJob.FAILED
+    assert job.error
+
+
+def test_recent_job_keeps_its_status(app):
+    db.session.add(RecognitionJob(id='recent', status=RecognitionJob.QUEUED))
+    db.session.commit()
+
+    assert upload_jobs.get_recognition_job('recent').status == RecognitionJob.QUEUED
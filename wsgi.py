@@ -5,7 +5,8 @@ All necessary imports and configurations are contained in this single file.
 import os
 import base64
 import json
-import tempfile
+import threading
+import time
 import uuid
 from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
@@ -80,10 +81,147 @@ class Recipe(db.Model):
 with app.app_context():
     db.create_all()
 
+# Google Cloud Vision client, created lazily once per worker process
+_vision_client = None
+_vision_client_pid = None
+_vision_client_lock = threading.Lock()
+
+def get_vision_client():
+    """
+    Get the Vision client for this worker, building credentials in memory on first use.
+    """
+    global _vision_client, _vision_client_pid
+    
+    pid = os.getpid()
+    if _vision_client is not None and _vision_client_pid == pid:
+        return _vision_client
+    
+    with _vision_client_lock:
+        # Never reuse a client (and its gRPC channel) inherited from the gunicorn master
+        if _vision_client is None or _vision_client_pid != pid:
+            from google.cloud import vision
+            
+            # Plaintext local stand-in (see loadtest/), which needs no credentials
+            endpoint = os.environ.get('VISION_API_ENDPOINT')
+            if endpoint and os.environ.get('VISION_API_INSECURE', 'False').lower() == 'true':
+                import grpc
+                from google.cloud.vision_v1.services.image_annotator.transports import ImageAnnotatorGrpcTransport
+                _vision_client = vision.ImageAnnotatorClient(
+                    transport=ImageAnnotatorGrpcTransport(channel=grpc.insecure_channel(endpoint))
+                )
+                _vision_client_pid = pid
+                return _vision_client
+            
+            # Get credentials from environment variable
+            credentials_base64 = os.environ.get('GOOGLE_CLOUD_CREDENTIALS_BASE64')
+            if not credentials_base64:
+                raise ValueError("Google Cloud credentials not found in environment variables")
+            
+            credentials_info = json.loads(base64.b64decode(credentials_base64).decode('utf-8'))
+            _vision_client = vision.ImageAnnotatorClient.from_service_account_info(
+                credentials_info, client_options={'api_endpoint': endpoint} if endpoint else None
+            )
+            _vision_client_pid = pid
+    
+    return _vision_client
+
+def _reset_vision_client():
+    global _vision_client, _vision_client_pid, _vision_client_lock
+    _vision_client = None
+    _vision_client_pid = None
+    _vision_client_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_vision_client)
+
+# Spoonacular HTTP session, created lazily once per worker process
+SPOONACULAR_BASE_URL = os.environ.get('SPOONACULAR_BASE_URL', 'https://api.spoonacular.com')
+SPOONACULAR_TIMEOUT = (3.05, 10)  # Connect and read timeouts in seconds
+SPOONACULAR_FAILURE_THRESHOLD = 5  # Consecutive failures before calls are skipped
+SPOONACULAR_COOLDOWN = 30  # Seconds to skip calls after the threshold is reached
+_http_session = None
+_http_session_pid = None
+_http_session_lock = threading.Lock()
+_spoonacular_lock = threading.Lock()
+_spoonacular_failures = 0
+_spoonacular_open_until = 0
+
+def get_http_session():
+    """
+    Get the pooled keep-alive session for this worker, retrying idempotent calls with backoff.
+    """
+    global _http_session, _http_session_pid
+    
+    pid = os.getpid()
+    if _http_session is not None and _http_session_pid == pid:
+        return _http_session
+    
+    with _http_session_lock:
+        if _http_session is None or _http_session_pid != pid:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            retry = Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET'}),
+                raise_on_status=False
+            )
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_maxsize=10, max_retries=retry))
+            _http_session = session
+            _http_session_pid = pid
+    
+    return _http_session
+
+def spoonacular_get(url, params):
+    """
+    GET a Spoonacular URL, skipping the call while the upstream keeps failing.
+    """
+    global _spoonacular_failures, _spoonacular_open_until
+    
+    with _spoonacular_lock:
+        if time.monotonic() < _spoonacular_open_until:
+            raise requests.ConnectionError("Spoonacular is unavailable, skipping call during cooldown")
+    
+    try:
+        response = get_http_session().get(url, params=params, timeout=SPOONACULAR_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        # Client errors are the caller's problem and do not count against the upstream
+        status = e.response.status_code if e.response is not None else None
+        if status is None or status == 429 or status >= 500:
+            with _spoonacular_lock:
+                _spoonacular_failures += 1
+                if _spoonacular_failures >= SPOONACULAR_FAILURE_THRESHOLD:
+                    _spoonacular_open_until = time.monotonic() + SPOONACULAR_COOLDOWN
+                    _spoonacular_failures = 0
+        raise
+    
+    with _spoonacular_lock:
+        _spoonacular_failures = 0
+    return response
+
+def _reset_http_session():
+    global _http_session, _http_session_pid, _http_session_lock, _spoonacular_lock
+    global _spoonacular_failures, _spoonacular_open_until
+    _http_session = None
+    _http_session_pid = None
+    _http_session_lock = threading.Lock()
+    _spoonacular_lock = threading.Lock()
+    _spoonacular_failures = 0
+    _spoonacular_open_until = 0
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_http_session)
+
 # Image recognition service
-def recognize_ingredients_from_image(image_path):
+def recognize_ingredients_from_image(image):
     """
     Recognize ingredients from an image using Google Cloud Vision API or mock data.
+    
+    The image may be a file path or the image bytes.
     """
     use_mock = os.environ.get('USE_MOCK_VISION', 'True').lower() == 'true'
     
@@ -101,51 +239,35 @@ def recognize_ingredients_from_image(image_path):
         # Use Google Cloud Vision API
         from google.cloud import vision
         
-        # Get credentials from environment variable
-        credentials_base64 = os.environ.get('GOOGLE_CLOUD_CREDENTIALS_BASE64')
-        if not credentials_base64:
-            raise ValueError("Google Cloud credentials not found in environment variables")
+        client = get_vision_client()
         
-        # Decode credentials
-        credentials_json = base64.b64decode(credentials_base64).decode('utf-8')
+        # Load image, unless it was passed in memory
+        if isinstance(image, bytes):
+            content = image
+        else:
+            with open(image, 'rb') as image_file:
+                content = image_file.read()
         
-        # Create a temporary file to store credentials
-        with tempfile.NamedTemporaryFile(delete=False) as temp:
-            temp.write(credentials_json.encode('utf-8'))
-            temp_path = temp.name
+        image = vision.Image(content=content)
         
-        try:
-            # Initialize Vision client with credentials
-            client = vision.ImageAnnotatorClient.from_service_account_json(temp_path)
-            
-            # Load image
-            with open(image_path, 'rb') as image_file:
-                content = image_file.read()
-            
-            image = vision.Image(content=content)
-            
-            # Perform label detection
-            response = client.label_detection(image=image)
-            labels = response.label_annotations
-            
-            # Filter for food-related labels
-            food_labels = []
-            food_keywords = ['food', 'vegetable', 'fruit', 'meat', 'ingredient', 'dish', 'cuisine']
-            
-            for label in labels:
-                description = label.description.lower()
-                # Check if it's likely a food item
-                if any(keyword in description for keyword in food_keywords) or label.score > 0.7:
-                    food_labels.append({
-                        'name': label.description,
-                        'confidence': label.score
-                    })
-            
-            return food_labels[:10]  # Return top 10 food-related labels
+        # Perform label detection
+        response = client.label_detection(image=image)
+        labels = response.label_annotations
         
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_path)
+        # Filter for food-related labels
+        food_labels = []
+        food_keywords = ['food', 'vegetable', 'fruit', 'meat', 'ingredient', 'dish', 'cuisine']
+        
+        for label in labels:
+            description = label.description.lower()
+            # Check if it's likely a food item
+            if any(keyword in description for keyword in food_keywords) or label.score > 0.7:
+                food_labels.append({
+                    'name': label.description,
+                    'confidence': label.score
+                })
+        
+        return food_labels[:10]  # Return top 10 food-related labels
     
     except Exception as e:
         print(f"Error recognizing ingredients: {str(e)}")
@@ -207,7 +329,7 @@ def get_recipes_by_ingredients(ingredients):
         ingredients_str = ','.join(ingredients)
         
         # Make API request
-        url = f"https://api.spoonacular.com/recipes/findByIngredients"
+        url = f"{SPOONACULAR_BASE_URL}/recipes/findByIngredients"
         params = {
             'apiKey': api_key,
             'ingredients': ingredients_str,
@@ -216,25 +338,32 @@ def get_recipes_by_ingredients(ingredients):
             'ignorePantry': True
         }
         
-        response = requests.get(url, params=params)
-        response.raise_for_status()
+        response = spoonacular_get(url, params)
         
         recipes_data = response.json()
         
-        # Get detailed information for each recipe
+        # Get detailed information for all recipes in a single request
+        recipe_ids = [recipe['id'] for recipe in recipes_data]
+        if not recipe_ids:
+            return []
+        
+        detail_url = f"{SPOONACULAR_BASE_URL}/recipes/informationBulk"
+        detail_params = {
+            'apiKey': api_key,
+            'ids': ','.join(str(recipe_id) for recipe_id in recipe_ids),
+            'includeNutrition': False
+        }
+        
+        detail_response = spoonacular_get(detail_url, detail_params)
+        
+        # Keep the ranking from findByIngredients, the bulk endpoint may reorder
+        details_by_id = {details.get('id'): details for details in detail_response.json()}
+        
         detailed_recipes = []
-        for recipe in recipes_data:
-            recipe_id = recipe['id']
-            detail_url = f"https://api.spoonacular.com/recipes/{recipe_id}/information"
-            detail_params = {
-                'apiKey': api_key,
-                'includeNutrition': False
-            }
-            
-            detail_response = requests.get(detail_url, params=detail_params)
-            detail_response.raise_for_status()
-            
-            recipe_details = detail_response.json()
+        for recipe_id in recipe_ids:
+            recipe_details = details_by_id.get(recipe_id)
+            if not recipe_details:
+                continue
             
             # Extract ingredients
             ingredients_list = []
@@ -376,12 +505,17 @@ def capture():
             return redirect(request.url)
         
         if file:
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(file_path)
+            content = file.read()
+            
+            # Only keep a copy on disk when asked to
+            if os.environ.get('PERSIST_UPLOADS', 'False').lower() == 'true':
+                filename = secure_filename(file.filename)
+                file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                with open(file_path, 'wb') as upload_file:
+                    upload_file.write(content)
             
-            # Recognize ingredients
-            ingredients = recognize_ingredients_from_image(file_path)
+            # Recognize ingredients from memory
+            ingredients = recognize_ingredients_from_image(content)
             
             # Store in session
             session['recognized_ingredients'] = ingredients